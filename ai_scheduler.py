@@ -0,0 +1,96 @@
+# ai_scheduler.py
+# Decides which enemies think on a given tick. Each enemy gets an update
+# interval from its state and its distance to its target: attackers and
+# close chasers every tick, distant chasers every other tick, idle enemies
+# every few ticks. An enemy that skipped ticks catches up by moving for all
+# of them at once. Updates are staggered so idle enemies spawned together
+# don't all think on the same tick, and an optional per-tick time budget
+# defers the least urgent work to the next tick, most overdue first. Enemies
+# the player can't see think at the idle rate unless attacking.
+import time
+
+
+class AIScheduler:
+    """Runs Enemy.update at state- and distance-based rates.
+
+    ``budget`` is seconds of enemy updates per tick; once it is spent, the
+    remaining due enemies wait for the next tick (attackers are never
+    deferred). ``budget=None`` never defers, which keeps seeded headless
+    runs deterministic.
+    """
+
+    def __init__(self, budget=None, near_distance=150, idle_interval=8, max_catch_up=8):
+        self.budget = budget
+        self.near_distance = near_distance
+        self.idle_interval = idle_interval
+        self.max_catch_up = max_catch_up  # Most ticks one update can make up for
+        self.reset()
+
+    def reset(self):
+        """Start over for a new run, so its update phases don't depend on
+        earlier runs."""
+        self.tick = 0
+        self.serial = 0  # Spreads first updates of enemies across ticks
+
+        # Last tick's numbers, for the debug overlay
+        self.updated = 0
+        self.deferred = 0
+        self.elapsed = 0.0
+
+    def interval(self, enemy, target, in_view=None):
+        """Ticks until an enemy needs to think again."""
+        if enemy.state == "attack":
+            return 1
+        if target is None or (in_view is not None and not in_view(enemy)):
+            return self.idle_interval
+        distance_sq = (enemy.x - target.x) ** 2 + (enemy.y - target.y) ** 2
+        if enemy.state == "chase":
+            return 1 if distance_sq < self.near_distance ** 2 else 2
+        # Idle enemies near the edge of chase range look again sooner
+        if distance_sq < (enemy.chase_range * 1.25) ** 2:
+            return max(1, self.idle_interval // 2)
+        return self.idle_interval
+
+    def update(self, enemies, target_for, in_view=None):
+        """Advance one tick, updating every enemy that is due.
+
+        ``target_for(enemy)`` returns the player an enemy should act on;
+        ``in_view(enemy)``, if given, whether the player can see it.
+        """
+        self.tick += 1
+        tick = self.tick
+        started = time.perf_counter()
+
+        due = [enemy for enemy in enemies
+               if enemy.next_update_tick <= tick and enemy.active]
+        deadline = None
+        if self.budget is not None:
+            deadline = started + self.budget
+            # Attackers first, then the longest-waiting, so deferral never
+            # starves anyone
+            due.sort(key=lambda enemy: (enemy.state != "attack", enemy.next_update_tick))
+
+        interval_of = self.interval
+        max_catch_up = self.max_catch_up
+        updated = 0
+        for enemy in due:
+            if (deadline is not None and updated and enemy.state != "attack"
+                    and time.perf_counter() > deadline):
+                break
+            target = target_for(enemy)
+            last = enemy.last_update_tick
+            enemy.update(target, 1 if last is None else min(tick - last, max_catch_up))
+            enemy.last_update_tick = tick
+
+            interval = interval_of(enemy, target, in_view)
+            if enemy.next_update_tick == 0:
+                # First update: offset the phase so batches spread out
+                self.serial += 1
+                enemy.next_update_tick = tick + 1 + self.serial % interval
+            else:
+                enemy.next_update_tick = tick + interval
+            updated += 1
+
+        self.updated = updated
+        self.deferred = len(due) - updated
+        self.elapsed = time.perf_counter() - started
@@ -0,0 +1,201 @@
+# asset_cache.py
+# On-disk cache of pre-decoded assets for fast cold starts. Surfaces are stored
+# as raw pixels already in the layout convert_alpha produces on this display,
+# sounds as PCM in the mixer's format, each behind a small header. Entries are
+# mapped back in with mmap, so a warm start skips PNG/MP3 decoding entirely.
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import pygame
+
+CACHE_DIR = os.environ.get("CODEBREAK_ASSET_CACHE", ".asset_cache")
+CACHE_MAGIC = b"CBAC"
+CACHE_VERSION = 1
+
+KIND_SURFACE = 1
+KIND_SOUND = 2
+
+# magic, version, kind, width or frequency, height or channels, format tag
+HEADER = struct.Struct("<4sHHII16s")
+
+# Raw pixel layouts pygame.image.tobytes/frombuffer understand
+PIXEL_LAYOUTS = ("RGBA", "ARGB", "BGRA", "ABGR")
+
+# Raw layout matching convert_alpha on the current display (None = unknown)
+_surface_layout = None
+# Cleared after the first failed write, e.g. on a read-only install
+_writable = True
+# Maps backing cached surfaces; frombuffer shares their memory
+_mapped = []
+
+
+def detect_surface_layout():
+    """Work out the raw pixel layout convert_alpha produces on this display.
+
+    Must be called from the main thread after the display mode is set.
+    Returns None (and leaves surfaces uncached) if it has no raw equivalent.
+    """
+    global _surface_layout
+    if pygame.display.get_surface() is None:
+        return None
+
+    probe = pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha()
+    if probe.get_bytesize() != 4:
+        _surface_layout = None
+        return None
+
+    # Order the channels by their byte position in memory
+    positions = []
+    for channel, mask in zip("RGBA", probe.get_masks()):
+        byte = ((mask & -mask).bit_length() - 1) // 8
+        if sys.byteorder == "big":
+            byte = 3 - byte
+        positions.append((byte, channel))
+    layout = "".join(channel for _, channel in sorted(positions))
+
+    _surface_layout = layout if layout in PIXEL_LAYOUTS else None
+    return _surface_layout
+
+
+def surface_layout():
+    """Raw pixel layout cached surfaces use, or None if not detected yet."""
+    return _surface_layout
+
+
+def sound_format():
+    """Tag describing the mixer's PCM format, or None if there is no mixer."""
+    mixer = pygame.mixer.get_init()
+    if not mixer:
+        return None
+    frequency, size, channels = mixer
+    return f"{frequency}/{size}/{channels}"
+
+
+def cache_path(source_path, kind, fmt):
+    """Return (prefix, path) of the cache entry for a source file.
+
+    The prefix identifies the source file; the rest of the name changes with
+    its mtime, size and the target format, so stale entries are never read.
+    """
+    stat = os.stat(source_path)
+    prefix = hashlib.sha1(os.path.abspath(source_path).encode()).hexdigest()[:16]
+    state = f"{stat.st_mtime_ns}|{stat.st_size}|{kind}|{fmt}|{CACHE_VERSION}"
+    suffix = hashlib.sha1(state.encode()).hexdigest()[:16]
+    return prefix, os.path.join(CACHE_DIR, f"{prefix}-{suffix}.bin")
+
+
+def read_entry(path, kind, fmt):
+    """Map a cache entry; returns (a, b, payload view, map) or None on a miss."""
+    try:
+        with open(path, "rb") as f:
+            # Copy-on-write, since frombuffer needs a writable buffer
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    except (OSError, ValueError):
+        return None
+
+    if len(mapped) < HEADER.size:
+        mapped.close()
+        return None
+    magic, version, entry_kind, a, b, tag = HEADER.unpack_from(mapped)
+    if (magic != CACHE_MAGIC or version != CACHE_VERSION or entry_kind != kind
+            or tag.rstrip(b"\0").decode("ascii", "replace") != fmt):
+        mapped.close()
+        return None
+    return a, b, memoryview(mapped)[HEADER.size:], mapped
+
+
+def write_entry(source_path, kind, fmt, a, b, payload):
+    """Write a cache entry atomically and drop older entries for the source."""
+    global _writable
+    if not _writable:
+        return
+
+    prefix, path = cache_path(source_path, kind, fmt)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(CACHE_MAGIC, CACHE_VERSION, kind, a, b,
+                                fmt.encode("ascii")))
+            f.write(payload)
+        os.replace(temp_path, path)
+    except OSError as e:
+        _writable = False
+        print(f"Warning: Asset cache disabled, could not write {CACHE_DIR}: {e}")
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return
+
+    # Entries for older versions of this file can never be read again
+    for name in os.listdir(CACHE_DIR):
+        stale = os.path.join(CACHE_DIR, name)
+        if name.startswith(prefix) and name.endswith(".bin") and stale != path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+def load_surface(source_path):
+    """Return a cached display-format surface for an image, or None."""
+    if _surface_layout is None:
+        return None
+    try:
+        _, path = cache_path(source_path, KIND_SURFACE, _surface_layout)
+    except OSError:
+        return None
+
+    entry = read_entry(path, KIND_SURFACE, _surface_layout)
+    if entry is None:
+        return None
+    width, height, pixels, mapped = entry
+    if len(pixels) != width * height * 4:
+        mapped.close()
+        return None
+
+    _mapped.append(mapped)
+    return pygame.image.frombuffer(pixels, (width, height), _surface_layout)
+
+
+def store_surface(source_path, surface):
+    """Cache a surface that has already been through convert_alpha."""
+    if _surface_layout is None:
+        return
+    width, height = surface.get_size()
+    pixels = pygame.image.tobytes(surface, _surface_layout)
+    write_entry(source_path, KIND_SURFACE, _surface_layout, width, height, pixels)
+
+
+def load_sound(source_path):
+    """Return a Sound built from cached PCM, or None."""
+    fmt = sound_format()
+    if fmt is None:
+        return None
+    try:
+        _, path = cache_path(source_path, KIND_SOUND, fmt)
+    except OSError:
+        return None
+
+    entry = read_entry(path, KIND_SOUND, fmt)
+    if entry is None:
+        return None
+    _, _, samples, mapped = entry
+    try:
+        # Sound copies the samples, so the map can be released straight away
+        return pygame.mixer.Sound(buffer=samples)
+    finally:
+        samples.release()
+        mapped.close()
+
+
+def store_sound(source_path, sound):
+    """Cache the decoded PCM of a Sound."""
+    fmt = sound_format()
+    if fmt is None:
+        return
+    frequency, _, channels = pygame.mixer.get_init()
+    write_entry(source_path, KIND_SOUND, fmt, frequency, channels, sound.get_raw())
@@ -0,0 +1,243 @@
+# assets.py
+# Asset manifest and background loader. Files are decoded on a worker thread;
+# anything that needs the display (convert_alpha) is finished on the main thread.
+# Decoded surfaces and sounds are also kept in an on-disk cache (asset_cache.py)
+# so later launches can skip decoding.
+import os
+import threading
+import time
+import pygame
+
+import asset_cache
+
+# Every sprite, sheet, font and sound the game uses
+ASSET_MANIFEST = {
+    # Fonts fall back to the default font when the file is missing. Preloaded
+    # fonts are needed by the very first menu frame.
+    "font_title": {"kind": "font", "path": "fonts/cyberpunk.ttf", "size": 60, "preload": True},
+    "font_button": {"kind": "font", "path": "fonts/cyberpunk.ttf", "size": 40, "preload": True},
+    "font_info": {"kind": "font", "path": "fonts/cyberpunk.ttf", "size": 24, "preload": True},
+    "font_xl": {"kind": "font", "path": "fonts/cyber.ttf", "size": 48, "preload": True},
+    "font_lg": {"kind": "font", "path": "fonts/cyber.ttf", "size": 36, "preload": True},
+    "font_md": {"kind": "font", "path": "fonts/cyber.ttf", "size": 24, "preload": True},
+    "font_sm": {"kind": "font", "path": "fonts/cyber.ttf", "size": 18, "preload": True},
+
+    # Sprite sheets (4 frames x 6 animation rows of 48x48)
+    "player_sheet": {"kind": "sheet", "path": "spritesheets/player-spritesheet.png",
+                     "frame_size": (48, 48), "grid": (4, 6)},
+    "enemy_sheet": {"kind": "sheet", "path": "spritesheets/enemy-spritesheet.png",
+                    "frame_size": (48, 48), "grid": (4, 6)},
+
+    # Single sprites
+    "code_fragments": {"kind": "sprite", "path": "spritesheets/resources/code_fragments.png",
+                       "size": (48, 48)},
+    "energy_cores": {"kind": "sprite", "path": "spritesheets/resources/energy_cores.png",
+                     "size": (48, 48)},
+    "data_shards": {"kind": "sprite", "path": "spritesheets/resources/data_shards.png",
+                    "size": (48, 48)},
+
+    # Sounds, named after the GameEffects sound they back
+    "sound_attack": {"kind": "sound", "path": "sound_effects/sword.wav"},
+    "sound_hit": {"kind": "sound", "path": "sound_effects/laser.wav"},
+    "sound_collect": {"kind": "sound", "path": "sound_effects/collection_sound.wav"},
+    "sound_level_up": {"kind": "sound", "path": "sound_effects/health_recharge.wav"},
+    "sound_menu_select": {"kind": "sound", "path": "sound_effects/laser.wav"},
+    "sound_game_over": {"kind": "sound", "path": "sound_effects/hurt_man.mp3"},
+}
+
+# Finished assets, kept for the lifetime of the process so restarts reuse them
+_cache = {}
+# Assets decoded on a worker, as (asset, finished) pairs, waiting to be moved
+# into _cache on the main thread
+_decoded = {}
+# Names a worker is currently responsible for
+_in_flight = set()
+_lock = threading.Lock()
+# Font paths already reported as missing
+_missing_fonts = set()
+
+
+def decode_asset(entry):
+    """Decode one manifest entry; safe to call from a worker thread.
+
+    Returns (asset, finished). ``finished`` is False for surfaces that still
+    need finish_asset on the main thread. The asset is None when the file is
+    missing or cannot be decoded, so callers can fall back to placeholders.
+    """
+    kind = entry["kind"]
+    path = entry.get("path")
+
+    if kind == "font":
+        try:
+            if path and os.path.exists(path):
+                return pygame.font.Font(path, entry["size"]), True
+            if path not in _missing_fonts:
+                _missing_fonts.add(path)
+                print(f"Warning: Could not load font {path}, using system font")
+        except Exception as e:
+            print(f"Error loading font: {path}, {e}")
+        return pygame.font.Font(None, entry["size"]), True
+
+    if not path or not os.path.exists(path):
+        print(f"Warning: Asset file not found: {path}")
+        return None, True
+
+    try:
+        if kind in ("sprite", "sheet"):
+            # Cached pixels are already in the display format
+            cached = asset_cache.load_surface(path)
+            if cached is not None:
+                return cached, True
+            return pygame.image.load(path), False
+        if kind == "sound":
+            if not pygame.mixer.get_init():
+                return None, True
+            # Sounds with the same file share one decoded buffer
+            for name, other in ASSET_MANIFEST.items():
+                if other is not entry and other.get("path") == path:
+                    shared = _cache.get(name, _decoded.get(name, (None,))[0])
+                    if shared is not None:
+                        return shared, True
+            sound = asset_cache.load_sound(path)
+            if sound is None:
+                sound = pygame.mixer.Sound(path)
+                asset_cache.store_sound(path, sound)
+            return sound, True
+    except Exception as e:
+        print(f"Error loading asset: {path}, {e}")
+    return None, True
+
+
+def finish_asset(entry, asset, finished=False):
+    """Finish a decoded asset on the main thread (pixel format conversion).
+
+    Converted surfaces are written to the on-disk cache for the next launch.
+    """
+    if finished or asset is None or entry["kind"] not in ("sprite", "sheet"):
+        return asset
+    if pygame.display.get_surface() is None:
+        return asset
+
+    asset = asset.convert_alpha()
+    asset_cache.store_surface(entry["path"], asset)
+    return asset
+
+
+def get_asset(name):
+    """Return a loaded asset by manifest name.
+
+    Returns None while a background loader is still decoding it. Names no
+    loader is working on are loaded synchronously on first use.
+    """
+    with _lock:
+        if name in _cache:
+            return _cache[name]
+        if name in _decoded:
+            asset = finish_asset(ASSET_MANIFEST[name], *_decoded.pop(name))
+            _cache[name] = asset
+            return asset
+        if name in _in_flight:
+            return None
+
+    load_assets([name])
+    return _cache.get(name)
+
+
+def is_loaded(name):
+    """Check if an asset is ready without triggering a load."""
+    return name in _cache or name in _decoded
+
+
+def load_assets(names):
+    """Decode and finish assets synchronously on the calling (main) thread."""
+    if asset_cache.surface_layout() is None:
+        asset_cache.detect_surface_layout()
+    for name in names:
+        if name in _cache:
+            continue
+        entry = ASSET_MANIFEST[name]
+        asset = finish_asset(entry, *decode_asset(entry))
+        with _lock:
+            _cache[name] = asset
+
+
+def preload_names():
+    """Names of assets needed before the first frame."""
+    return [name for name, entry in ASSET_MANIFEST.items() if entry.get("preload")]
+
+
+class AssetLoader:
+    """Decodes every manifest asset on a worker thread.
+
+    Progress callbacks are called as ``callback(name, loaded, total)`` from
+    the worker thread, so they should only record state. Call ``finish`` from
+    the main thread (once per frame is fine) to convert decoded surfaces.
+    """
+
+    def __init__(self, manifest=None, on_progress=None):
+        self.manifest = manifest or ASSET_MANIFEST
+        self.progress_callbacks = [on_progress] if on_progress else []
+        self.total = len(self.manifest)
+        self.loaded = 0
+        self.done = threading.Event()
+        self.thread = None
+        self.started_at = None
+        self.finished_at = None
+
+    def add_progress_callback(self, callback):
+        """Register another progress callback."""
+        self.progress_callbacks.append(callback)
+
+    @property
+    def progress(self):
+        """Fraction of the manifest that has been decoded (0.0 to 1.0)."""
+        return self.loaded / self.total if self.total else 1.0
+
+    def start(self):
+        """Start decoding on a daemon worker thread."""
+        # The worker needs the display's pixel layout to find cached surfaces
+        if asset_cache.surface_layout() is None:
+            asset_cache.detect_surface_layout()
+        with _lock:
+            for name in self.manifest:
+                if name not in _cache and name not in _decoded:
+                    _in_flight.add(name)
+
+        self.started_at = time.perf_counter()
+        self.thread = threading.Thread(target=self._run, name="asset-loader", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        """Worker thread body."""
+        for name, entry in self.manifest.items():
+            if not is_loaded(name):
+                decoded = decode_asset(entry)
+                with _lock:
+                    _decoded[name] = decoded
+            with _lock:
+                _in_flight.discard(name)
+
+            self.loaded += 1
+            for callback in self.progress_callbacks:
+                callback(name, self.loaded, self.total)
+
+        self.done.set()
+
+    def finish(self):
+        """Convert decoded assets on the main thread; True once all are ready."""
+        with _lock:
+            ready = list(_decoded.items())
+            _decoded.clear()
+        for name, (asset, finished) in ready:
+            _cache[name] = finish_asset(ASSET_MANIFEST[name], asset, finished)
+
+        if self.done.is_set() and not _decoded:
+            if self.finished_at is None:
+                self.finished_at = time.perf_counter()
+            return True
+        return False
+
+    def wait(self, timeout=None):
+        """Block until the worker is done, then finish on this thread."""
+        self.done.wait(timeout)
+        return self.finish()
@@ -0,0 +1,124 @@
+# background.py
+# Animated menu background built from pre-rendered layers. The scrolling
+# horizontal grid is a tileable strip blitted at an offset, the perspective fan
+# and the grid's trapezoid outline are one static overlay, and the floating
+# particles are pre-rendered dots drawn with a single blits() call.
+import math
+import random
+import pygame
+
+# Colour key for transparent pixels in the pre-rendered layers
+TRANSPARENT = (255, 0, 255)
+
+
+class MenuBackground:
+    """Scrolling perspective grid with floating data particles."""
+
+    def __init__(self, width, height, bg_color, line_color, particle_colors,
+                 grid_spacing=30, scroll_speed=30, fan_lines=20, max_particles=50):
+        self.width = width
+        self.height = height
+        self.grid_spacing = grid_spacing
+        self.scroll_speed = scroll_speed
+        self.max_particles = max_particles
+        self.offset = 0
+
+        self.strip = self.build_strip(bg_color, line_color)
+        self.overlay = self.build_overlay(bg_color, line_color, fan_lines)
+
+        # One pre-rendered dot per (color, size); particles only hold a reference
+        self.particle_sprites = []
+        for color in particle_colors:
+            for size in range(2, 7):
+                dot = pygame.Surface((size * 2 + 1, size * 2 + 1))
+                dot.fill(TRANSPARENT)
+                pygame.draw.circle(dot, color, (size, size), size)
+                self.particle_sprites.append((self.prepare(dot, keyed=True), size))
+
+        # Each particle is [x, y, vx, vy, sprite, radius]
+        self.particles = []
+
+    def prepare(self, surface, keyed=False):
+        """Convert a layer to the display format when a display exists, and
+        make TRANSPARENT pixels see-through for keyed layers."""
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        if keyed:
+            surface.set_colorkey(TRANSPARENT, pygame.RLEACCEL)
+        return surface
+
+    def build_strip(self, bg_color, line_color):
+        """Render one grid period taller than the screen, so any scroll offset
+        is a plain blit that covers the whole screen."""
+        strip = pygame.Surface((self.width, self.height + self.grid_spacing))
+        strip.fill(bg_color)
+        for y in range(0, strip.get_height(), self.grid_spacing):
+            # Lines thicken towards the bottom of the screen; judged from
+            # where the line sits mid-scroll
+            screen_y = min(max(y - self.grid_spacing // 2, 0), self.height)
+            line_width = max(1, int(3 * (screen_y / self.height)))
+            pygame.draw.line(strip, line_color, (0, y), (self.width, y), line_width)
+        return self.prepare(strip)
+
+    def build_overlay(self, bg_color, line_color, fan_lines):
+        """Render the static layer: background outside the grid's perspective
+        trapezoid, plus the fan of lines from the vanishing point."""
+        overlay = pygame.Surface((self.width, self.height))
+        overlay.fill(TRANSPARENT)
+
+        # Horizontal lines only span the trapezoid, so cover either side of it
+        center_x = self.width // 2
+        for y in range(self.height):
+            perspective = 0.3 + 0.7 * (y / self.height)
+            half_width = int(self.width * 0.5 * perspective)
+            if center_x - half_width > 0:
+                pygame.draw.line(overlay, bg_color, (0, y), (center_x - half_width - 1, y))
+                pygame.draw.line(overlay, bg_color, (center_x + half_width + 1, y), (self.width, y))
+
+        vanishing_point = (center_x, self.height // 2)
+        for i in range(fan_lines):
+            angle = i * (math.pi / fan_lines)
+            end = (vanishing_point[0] + int(self.width * math.cos(angle)),
+                   vanishing_point[1] + int(self.height * math.sin(angle)))
+            pygame.draw.line(overlay, line_color, vanishing_point, end, 1)
+
+        return self.prepare(overlay, keyed=True)
+
+    def spawn_particle(self):
+        """Add a particle with its velocity worked out once, up front."""
+        sprite, radius = random.choice(self.particle_sprites)
+        speed = random.uniform(10, 30)
+        direction = random.uniform(0, 2 * math.pi)
+        self.particles.append([random.randint(0, self.width), random.randint(0, self.height),
+                               speed * math.cos(direction), speed * math.sin(direction),
+                               sprite, radius])
+
+    def set_particle_limit(self, max_particles):
+        """Change the particle cap, dropping any particles beyond it."""
+        self.max_particles = max_particles
+        del self.particles[max_particles:]
+
+    def update(self, dt):
+        """Scroll the grid and move the particles."""
+        self.offset = (self.offset + self.scroll_speed * dt) % self.grid_spacing
+
+        if len(self.particles) < self.max_particles and random.random() < 0.1:
+            self.spawn_particle()
+
+        width, height = self.width, self.height
+        alive = []
+        for particle in self.particles:
+            particle[0] += particle[2] * dt
+            particle[1] += particle[3] * dt
+            if 0 <= particle[0] <= width and 0 <= particle[1] <= height:
+                alive.append(particle)
+        self.particles = alive
+
+    def draw(self, surface, dt):
+        """Advance the animation and draw the full background."""
+        self.update(dt)
+
+        surface.blit(self.strip, (0, int(self.offset) - self.grid_spacing))
+        surface.blit(self.overlay, (0, 0))
+        surface.blits([(sprite, (int(x) - radius, int(y) - radius))
+                       for x, y, _, _, sprite, radius in self.particles], False)
@@ -0,0 +1,118 @@
+# combat.py
+# Area queries for attacks: which live enemies a melee arc (sector), a blast
+# (circle) or a beam (line) touches. Enemy centres are bucketed in a
+# SpatialGrid, so a query only tests the enemies in the cells its shape
+# overlaps, and each query returns all of its hits at once so damage,
+# knockback and effects can be applied in one pass. The grid is rebuilt
+# lazily, at most once per game-clock tick and only on ticks that query it.
+import math
+
+from spatial import SpatialGrid
+
+
+class CombatIndex:
+    """Spatial index of live enemies for attack queries.
+
+    ``live_enemies()`` returns the current enemy list and ``clock`` is the
+    game's SimClock. Enemies are hit as circles of ``hit_radius`` around
+    their sprite centre. Hits come back in enemy-list order (lines: nearest
+    first), so seeded runs repeat.
+    """
+
+    def __init__(self, live_enemies, clock, cell_size=96, hit_radius=24):
+        self.live_enemies = live_enemies
+        self.clock = clock
+        self.hit_radius = hit_radius
+        self.grid = SpatialGrid(cell_size)
+        self.enemies = []  # Grid key -> enemy, as of the last rebuild
+        self.centers = []  # Grid key -> enemy centre
+        self.keys = {}  # id(enemy) -> grid key
+        self.built_at = None  # Game-clock ms of the last rebuild
+
+        # Last query's numbers, for profiling
+        self.tested = 0
+        self.hits = 0
+
+    def invalidate(self):
+        """Force a rebuild on the next query (e.g. after the enemy list was
+        replaced within a tick)."""
+        self.built_at = None
+
+    def refresh(self):
+        """Rebuild the grid if enemies may have moved since the last one."""
+        if self.built_at == self.clock.ms:
+            return
+        self.enemies = list(self.live_enemies())
+        self.centers = [(enemy.x + enemy.sprite_width / 2, enemy.y + enemy.sprite_height / 2)
+                        for enemy in self.enemies]
+        self.keys = {id(enemy): key for key, enemy in enumerate(self.enemies)}
+        self.grid.load((key, x, y) for key, (x, y) in enumerate(self.centers))
+        self.built_at = self.clock.ms
+
+    def moved(self, enemy):
+        """Keep the index in step with an enemy moved by an attack."""
+        key = self.keys.get(id(enemy))
+        if key is not None and self.built_at == self.clock.ms:
+            self.centers[key] = center(enemy)
+            self.grid.move(key, *self.centers[key])
+
+    def candidates(self, keys):
+        """Live enemies for grid keys, with their centres."""
+        self.tested = len(keys)
+        for key in keys:
+            enemy = self.enemies[key]
+            if enemy.active and enemy.health > 0:
+                yield enemy, self.centers[key]
+
+    def circle(self, x, y, radius):
+        """Enemies touching a circle."""
+        self.refresh()
+        reach = radius + self.hit_radius
+        hits = [enemy for enemy, _ in self.candidates(self.grid.query_radius(x, y, reach))]
+        self.hits = len(hits)
+        return hits
+
+    def sector(self, x, y, facing, radius, arc):
+        """Enemies touching a sector (a pie slice) of ``arc`` degrees centred
+        on the ``facing`` (dx, dy) direction. Enemies overlapping the origin
+        are always hit."""
+        self.refresh()
+        fx, fy = facing
+        length = math.hypot(fx, fy) or 1.0
+        fx, fy = fx / length, fy / length
+        cos_half = math.cos(math.radians(arc) / 2)
+        reach = radius + self.hit_radius
+
+        hits = []
+        for enemy, (ex, ey) in self.candidates(self.grid.query_radius(x, y, reach)):
+            dx, dy = ex - x, ey - y
+            distance = math.hypot(dx, dy)
+            if distance <= self.hit_radius or dx * fx + dy * fy >= cos_half * distance:
+                hits.append(enemy)
+        self.hits = len(hits)
+        return hits
+
+    def line(self, x0, y0, x1, y1, width=0):
+        """Enemies touching a segment ``width`` wide, nearest to (x0, y0)
+        first."""
+        self.refresh()
+        reach = width / 2 + self.hit_radius
+        keys = self.grid.query_rect(min(x0, x1) - reach, min(y0, y1) - reach,
+                                    max(x0, x1) + reach, max(y0, y1) + reach)
+        dx, dy = x1 - x0, y1 - y0
+        length_sq = dx * dx + dy * dy
+
+        hits = []
+        for enemy, (ex, ey) in self.candidates(keys):
+            # Closest point of the segment to the enemy centre
+            t = 0.0 if not length_sq else max(0.0, min(1.0, ((ex - x0) * dx + (ey - y0) * dy) / length_sq))
+            if (x0 + t * dx - ex) ** 2 + (y0 + t * dy - ey) ** 2 <= reach * reach:
+                hits.append((t, self.keys[id(enemy)], enemy))
+        hits.sort(key=lambda hit: hit[:2])
+        self.hits = len(hits)
+        return [enemy for _, _, enemy in hits]
+
+
+def center(enemy):
+    """An enemy's sprite centre."""
+    return enemy.x + enemy.sprite_width / 2, enemy.y + enemy.sprite_height / 2
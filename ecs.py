@@ -0,0 +1,275 @@
+# ecs.py
+# Archetype-based entity store: entities that share a component set live in
+# the same archetype, and every component field is a typed, packed column.
+import operator
+from array import array
+from itertools import repeat
+
+# Component layouts - each component is a group of (field, array typecode)
+COMPONENTS = {
+    "position": (("x", "f"), ("y", "f")),
+    "velocity": (("vx", "f"), ("vy", "f")),
+    "size": (("width", "H"), ("height", "H")),
+    "health": (("health", "f"), ("max_health", "f")),
+    "lifetime": (("born", "d"), ("duration", "f")),  # Game-clock ms, seconds
+    "sprite": (("sprite", "H"),),  # Index into the archetype's sprite table
+    "pulse": (("pulse", "f"), ("pulse_dir", "b")),
+    "pickup": (("value", "H"),),
+}
+
+# Gameplay archetypes and the components each one carries
+ARCHETYPES = {
+    "projectile": ("position", "velocity", "size", "sprite"),
+    "resource": ("position", "sprite", "pulse", "pickup"),
+    "power_up": ("position", "sprite", "lifetime"),
+    "explosion": ("position", "lifetime"),
+}
+
+
+class Archetype:
+    """Packed column storage for every entity sharing one component set."""
+
+    def __init__(self, name, components):
+        self.name = name
+        self.components = frozenset(components)
+        self.columns = {}
+        for component in components:
+            for field, typecode in COMPONENTS[component]:
+                self.columns[field] = array(typecode)
+        self.entity_ids = array("I")
+
+    def __len__(self):
+        return len(self.entity_ids)
+
+    def has(self, *components):
+        """Check if this archetype carries all of the given components."""
+        return self.components.issuperset(components)
+
+    def append(self, entity_id, values):
+        """Append a row for an entity and return its row index."""
+        for field in values:
+            if field not in self.columns:
+                raise KeyError(f"Archetype '{self.name}' has no field '{field}'")
+
+        for field, column in self.columns.items():
+            column.append(values.get(field, 0))
+        self.entity_ids.append(entity_id)
+        return len(self.entity_ids) - 1
+
+    def swap_remove(self, row):
+        """Remove a row by moving the last row into its slot.
+
+        Returns the id of the entity that moved into ``row``, or None if the
+        removed row was the last one.
+        """
+        last = len(self.entity_ids) - 1
+        for column in self.columns.values():
+            column[row] = column[last]
+            column.pop()
+
+        moved = self.entity_ids[last]
+        self.entity_ids[row] = moved
+        self.entity_ids.pop()
+        return moved if row != last else None
+
+    def clear(self):
+        """Remove every row."""
+        for field, column in self.columns.items():
+            self.columns[field] = array(column.typecode)
+        self.entity_ids = array("I")
+
+
+class EntityStore:
+    """Registry of archetypes plus an entity id -> (archetype, row) index.
+
+    Archetypes can also be tracked by a spatial index (see spatial.py),
+    which the store keeps in step with spawns, moves and despawns.
+    """
+
+    def __init__(self, archetypes=None):
+        self.archetypes = {}
+        for name, components in (archetypes or ARCHETYPES).items():
+            self.archetypes[name] = Archetype(name, components)
+
+        self.locations = {}  # entity id -> (archetype, row)
+        self.next_id = 1
+        self.spatial = {}  # archetype name -> SpatialGrid
+
+    def track(self, archetype_name, grid):
+        """Keep an archetype's positions in a spatial grid from now on."""
+        self.spatial[archetype_name] = grid
+        archetype = self.archetypes[archetype_name]
+        xs = archetype.columns["x"]
+        ys = archetype.columns["y"]
+        for row, entity_id in enumerate(archetype.entity_ids):
+            grid.insert(entity_id, xs[row], ys[row])
+
+    def spawn(self, archetype_name, **values):
+        """Create an entity in an archetype and return its id."""
+        archetype = self.archetypes[archetype_name]
+        entity_id = self.next_id
+        self.next_id += 1
+
+        row = archetype.append(entity_id, values)
+        self.locations[entity_id] = (archetype, row)
+
+        grid = self.spatial.get(archetype_name)
+        if grid is not None:
+            # Index the stored (column-precision) position
+            grid.insert(entity_id, archetype.columns["x"][row], archetype.columns["y"][row])
+        return entity_id
+
+    def despawn(self, entity_id):
+        """Remove an entity; returns False if it was already gone."""
+        location = self.locations.get(entity_id)
+        if location is None:
+            return False
+        self.despawn_row(*location)
+        return True
+
+    def despawn_row(self, archetype, row):
+        """Remove the entity stored at a row of an archetype.
+
+        Systems that remove while iterating should walk rows from last to
+        first, since the last row is swapped into the removed slot.
+        """
+        entity_id = archetype.entity_ids[row]
+        moved = archetype.swap_remove(row)
+        del self.locations[entity_id]
+        if moved is not None:
+            self.locations[moved] = (archetype, row)
+
+        grid = self.spatial.get(archetype.name)
+        if grid is not None:
+            grid.remove(entity_id)
+
+    def alive(self, entity_id):
+        """Check if an entity still exists."""
+        return entity_id in self.locations
+
+    def get(self, entity_id, field):
+        """Read one field of an entity."""
+        archetype, row = self.locations[entity_id]
+        return archetype.columns[field][row]
+
+    def set(self, entity_id, field, value):
+        """Write one field of an entity."""
+        archetype, row = self.locations[entity_id]
+        archetype.columns[field][row] = value
+
+    def move(self, entity_id, x, y):
+        """Write an entity's position, updating its spatial index."""
+        archetype, row = self.locations[entity_id]
+        columns = archetype.columns
+        columns["x"][row] = x
+        columns["y"][row] = y
+
+        grid = self.spatial.get(archetype.name)
+        if grid is not None:
+            grid.move(entity_id, columns["x"][row], columns["y"][row])
+
+    def archetype_of(self, entity_id):
+        """Return the archetype name of an entity."""
+        return self.locations[entity_id][0].name
+
+    def query(self, *components):
+        """Return the non-empty archetypes that carry all given components."""
+        return [archetype for archetype in self.archetypes.values()
+                if len(archetype) and archetype.has(*components)]
+
+    def count(self, archetype_name=None):
+        """Count entities in one archetype, or in the whole store."""
+        if archetype_name is not None:
+            return len(self.archetypes[archetype_name])
+        return len(self.locations)
+
+    def clear(self):
+        """Remove every entity."""
+        for archetype in self.archetypes.values():
+            archetype.clear()
+        self.locations = {}
+        for grid in self.spatial.values():
+            grid.clear()
+
+    def reindex(self):
+        """Rebuild the id index and spatial indexes after columns were
+        replaced wholesale (e.g. by loading a save)."""
+        self.locations = {}
+        for archetype in self.archetypes.values():
+            for row, entity_id in enumerate(archetype.entity_ids):
+                self.locations[entity_id] = (archetype, row)
+        for grid in self.spatial.values():
+            grid.clear()  # A grid may be shared by several archetypes
+        for name, grid in self.spatial.items():
+            self.track(name, grid)
+
+
+# Systems - each one touches only the columns it needs. Column-wide updates
+# go through map() so the per-entity loop runs in C rather than in Python.
+
+def movement_system(store, dt):
+    """Integrate velocity into position for every moving entity."""
+    for archetype in store.query("position", "velocity"):
+        columns = archetype.columns
+        for axis, velocity in (("x", "vx"), ("y", "vy")):
+            position = columns[axis]
+            step = map(operator.mul, columns[velocity], repeat(dt))
+            position[:] = array("f", map(operator.add, position, step))
+
+
+def pulse_system(store, step=0.05):
+    """Bounce every pulse value between 0 and 1."""
+    for archetype in store.query("pulse"):
+        pulses = archetype.columns["pulse"]
+        directions = archetype.columns["pulse_dir"]
+        for row in range(len(archetype)):
+            pulse = pulses[row] + step * directions[row]
+            if pulse >= 1.0:
+                pulse = 1.0
+                directions[row] = -1
+            elif pulse <= 0.0:
+                pulse = 0.0
+                directions[row] = 1
+            pulses[row] = pulse
+
+
+def cull_system(store, bounds, archetype_name):
+    """Despawn entities of an archetype whose position left a rect."""
+    archetype = store.archetypes[archetype_name]
+    xs = archetype.columns["x"]
+    ys = archetype.columns["y"]
+    for row in range(len(archetype) - 1, -1, -1):
+        if not (bounds.left <= xs[row] <= bounds.right and
+                bounds.top <= ys[row] <= bounds.bottom):
+            store.despawn_row(archetype, row)
+
+
+def collect_sprites(store, sprite_tables, out, names=None):
+    """Append a (surface, position) pair to ``out`` for every entity that has
+    a position and a sprite ref, ready for Surface.blits.
+
+    ``sprite_tables`` maps an archetype name to a list indexed by sprite ref.
+    Each entry is a list of (surface, (offset_x, offset_y)) frames; entities
+    with a pulse component pick the frame matching their pulse value.
+    ``names`` optionally limits collection to some archetypes, for layering.
+    """
+    for archetype in store.query("position", "sprite"):
+        if names is not None and archetype.name not in names:
+            continue
+        table = sprite_tables.get(archetype.name)
+        if not table:
+            continue
+
+        xs = archetype.columns["x"]
+        ys = archetype.columns["y"]
+        refs = archetype.columns["sprite"]
+        pulses = archetype.columns.get("pulse")
+        append = out.append
+        for row in range(len(archetype)):
+            frames = table[refs[row]]
+            if pulses is not None:
+                frame, offset = frames[int(pulses[row] * (len(frames) - 1) + 0.5)]
+            else:
+                frame, offset = frames[0]
+            append((frame, (xs[row] - offset[0], ys[row] - offset[1])))
+    return out
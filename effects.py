@@ -1,11 +1,21 @@
 import pygame
 import random
 import math
-import os
+
+from assets import get_asset, is_loaded
+
+# Sound effect names; each one is backed by a "sound_<name>" asset
+SOUND_NAMES = ("attack", "hit", "collect", "level_up", "menu_select", "game_over")
 
 class GameEffects:
-    def __init__(self, volume=0.7):
-        self.volume = volume
+    # Sounds are shared assets, so their volume is shared by every instance
+    volume = 0.7
+    # Share of requested particles actually created (set by the quality governor)
+    particle_scale = 1.0
+
+    def __init__(self, volume=None):
+        if volume is not None:
+            GameEffects.volume = max(0.0, min(1.0, volume))
         
         # Initialize Pygame mixer if not already initialized
         if not pygame.mixer.get_init():
@@ -20,48 +30,36 @@ class GameEffects:
         self.text_effects = []
 
     def load_sounds(self):
-        """Load all sound effects."""
-        sound_files = {
-            "attack": "sound_effects/sword.wav",
-            "hit": "sound_effects/laser.wav",
-            "collect": "sound_effects/collection_sound.wav",
-            "level_up": "sound_effects/health_recharge.wav",
-            "menu_select": "sound_effects/laser.wav",
-            "game_over": "sound_effects/hurt_man.mp3"
-        }
-        
-        # Try to load each sound
-        for name, path in sound_files.items():
-            try:
-                if os.path.exists(path):
-                    sound = pygame.mixer.Sound(path)
-                    sound.set_volume(self.volume)
-                    self.sounds[name] = sound
-                else:
-                    print(f"Warning: Sound file not found: {path}")
-            except Exception as e:
-                print(f"Error loading sound: {path}, {e}")
-                
-        # If no sounds were loaded, add empty dummy sounds
-        if not self.sounds:
-            print("Warning: No sounds loaded, using dummy sounds")
-            dummy_sound = pygame.mixer.Sound(buffer=bytearray(100))
-            dummy_sound.set_volume(0)
-            for name in sound_files.keys():
-                self.sounds[name] = dummy_sound
+        """Collect the sound effects that are already loaded."""
+        # Sounds still decoding in the background are picked up on first play
+        for name in SOUND_NAMES:
+            if is_loaded(f"sound_{name}"):
+                self.resolve_sound(name)
+
+    def resolve_sound(self, sound_name):
+        """Look up a sound in the asset cache; None if it isn't ready."""
+        sound = get_asset(f"sound_{sound_name}")
+        if sound is not None:
+            sound.set_volume(GameEffects.volume)
+            self.sounds[sound_name] = sound
+        return sound
 
     def set_volume(self, volume):
         """Set volume for all sound effects."""
-        self.volume = max(0.0, min(1.0, volume))
+        GameEffects.volume = max(0.0, min(1.0, volume))
         
-        # Update volume for all loaded sounds
-        for sound in self.sounds.values():
-            sound.set_volume(self.volume)
+        # Sounds are shared, so update every loaded one, not just ours
+        for name in SOUND_NAMES:
+            if is_loaded(f"sound_{name}"):
+                self.resolve_sound(name)
 
     def play_sound(self, sound_name):
         """Play a sound by name."""
-        if sound_name in self.sounds:
-            self.sounds[sound_name].play()
+        sound = self.sounds.get(sound_name)
+        if sound is None and sound_name in SOUND_NAMES:
+            sound = self.resolve_sound(sound_name)
+        if sound is not None:
+            sound.play()
 
     def play_attack_sound(self):
         """Play the attack sound."""
@@ -77,6 +75,7 @@ class GameEffects:
 
     def create_particles(self, x, y, color, count=10, speed=3, size_range=(1, 3), lifetime=30):
         """Create particle effect at the specified position."""
+        count = round(count * GameEffects.particle_scale)
         for _ in range(count):
             angle = random.uniform(0, 2 * 3.14159)
             speed_val = random.uniform(1, speed)
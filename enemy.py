@@ -2,9 +2,16 @@ import pygame
 import random
 from typing import Dict  # Import for type annotations
 from effects import GameEffects  # Import GameEffects
+import simclock
 
 class Enemy:
-    def __init__(self, sprite_sheet, x, y):
+    # Sprite sheet -> animation frames, so spawning doesn't re-slice the sheet
+    animation_cache = {}
+
+    def __init__(self, sprite_sheet, x, y, clock=None):
+        # Game clock that attack cooldowns run on
+        self.clock = clock if clock is not None else simclock.SimClock()
+        
         # Position and movement
         self.x = x
         self.y = y
@@ -23,7 +30,14 @@ class Enemy:
         # State
         self.active = True
         self.state = "idle"  # "idle", "chase", or "attack"
-        self.last_attack_time = 0
+        self.last_attack_time = -self.attack_cooldown  # Can attack as soon as in range
+        self.attack_ready = True  # Cleared while the attack cooldown timer runs
+        
+        self.weight = 1  # Enemies this one stands for (elites: several merged)
+        
+        # AI scheduler bookkeeping (ticks)
+        self.next_update_tick = 0
+        self.last_update_tick = None
         
         # Sprite and animation
         self.sprite_width = 48
@@ -33,7 +47,22 @@ class Enemy:
         self.frame_counter = 0
         self.sprite = None
         
-        # Load animations from 4x6 spritesheet
+        # Animation frames, sliced once per sprite sheet and shared
+        (self.walk_right, self.walk_left, self.walk_up, self.walk_down,
+         self.idle_frames, self.attack_frames) = self.load_animations(sprite_sheet)
+        
+        self.sprite = self.idle_frames[0]  # Initial sprite
+        
+        # Effects
+        self.effects = GameEffects()
+
+    def load_animations(self, sprite_sheet):
+        """Walk (right, left, up, down), idle and attack frames for a sheet."""
+        animations = Enemy.animation_cache.get(sprite_sheet)
+        if animations is not None:
+            return animations
+        
+        # Slice the 4x6 spritesheet
         if sprite_sheet.get_width() >= self.sprite_width * 4 and sprite_sheet.get_height() >= self.sprite_height * 6:
             # Full spritesheet format (4x6)
             self.walk_right = [self.get_frame(sprite_sheet, i, 0) for i in range(4)]
@@ -54,10 +83,10 @@ class Enemy:
             self.idle_frames = [fallback] * 4
             self.attack_frames = [fallback] * 4
         
-        self.sprite = self.idle_frames[0]  # Initial sprite
-        
-        # Effects
-        self.effects = GameEffects()
+        animations = (self.walk_right, self.walk_left, self.walk_up, self.walk_down,
+                      self.idle_frames, self.attack_frames)
+        Enemy.animation_cache[sprite_sheet] = animations
+        return animations
 
     def get_frame(self, sheet, frame, row):
         """Extract a single frame from a sprite sheet."""
@@ -68,8 +97,12 @@ class Enemy:
             self.sprite_height
         ))
 
-    def update(self, player):
-        """Update enemy behavior based on player position."""
+    def update(self, player, steps=1):
+        """Update enemy behavior based on player position.
+
+        ``steps`` is how many ticks this update stands for; an enemy the AI
+        scheduler only updates every few ticks moves that much further.
+        """
         if not self.active or not player:
             return
             
@@ -84,38 +117,46 @@ class Enemy:
         elif distance < self.chase_range:
             self.state = "chase"
             # Chase the player
-            self.chase_player(player)
+            self.chase_player(player, steps)
         else:
             self.state = "idle"
 
-    def chase_player(self, player):
-        """Move towards the player."""
+    def chase_player(self, player, steps=1):
+        """Move towards the player (for ``steps`` ticks, without overshooting)."""
         # Determine direction to player
         dx = player.x - self.x
         dy = player.y - self.y
         
         # Normalize the vector (maintain constant speed regardless of direction)
         distance = max(0.1, ((dx ** 2) + (dy ** 2)) ** 0.5)
-        dx = dx / distance * self.speed
-        dy = dy / distance * self.speed
+        step = min(self.speed * steps, distance)
+        dx = dx / distance * step
+        dy = dy / distance * step
         
         # Update position
         self.x += dx
         self.y += dy
 
     def attack_player(self, player):
-        """Attack the player if cooldown has elapsed."""
-        current_time = pygame.time.get_ticks() / 1000.0  # Convert to seconds
-        
-        # Check if attack cooldown has elapsed
-        if current_time - self.last_attack_time >= self.attack_cooldown:
+        """Attack the player unless the attack is cooling down."""
+        if self.attack_ready:
             # Deal damage
             if player.decrease_health(self.damage):
                 # Only play sound if damage was actually dealt
                 self.effects.play_attack_sound()
             
             # Reset cooldown
-            self.last_attack_time = current_time
+            self.last_attack_time = self.clock.get_ticks() / 1000.0  # Convert to seconds
+            self.start_attack_cooldown()
+
+    def start_attack_cooldown(self):
+        """Wait out the cooldown since the last attack on a game-clock timer."""
+        self.attack_ready = False
+        self.clock.at((self.last_attack_time + self.attack_cooldown) * 1000.0, self.ready_attack)
+
+    def ready_attack(self):
+        """Attack cooldown timer callback."""
+        self.attack_ready = True
 
     def animate(self):
         """Update animation based on current state."""
@@ -161,21 +202,11 @@ class Enemy:
         player_rect = pygame.Rect(player.x, player.y, player.width, player.height)
         return enemy_rect.colliderect(player_rect)
 
-    def collides_with(self, projectile):
+    def collides_with(self, projectile_rect):
         """Check if enemy collides with a projectile."""
         # Create enemy rectangle
         enemy_rect = pygame.Rect(self.x, self.y, self.sprite_width, self.sprite_height)
         
-        # Create projectile rectangle
-        projectile_width = projectile.get("width", 5)
-        projectile_height = projectile.get("height", 5)
-        projectile_rect = pygame.Rect(
-            projectile["x"], 
-            projectile["y"], 
-            projectile_width, 
-            projectile_height
-        )
-        
         # Check collision
         if enemy_rect.colliderect(projectile_rect):
             # Take damage
@@ -192,9 +223,9 @@ class Enemy:
     def decrease_player_health(self, player):
         """Decrease the player's health incrementally."""
         if not hasattr(self, "last_health_decrease_time"):
-            self.last_health_decrease_time = pygame.time.get_ticks()
+            self.last_health_decrease_time = self.clock.get_ticks()
 
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.get_ticks()
         if current_time - self.last_health_decrease_time >= 1000:  # Decrease health every 1 second
             player.health -= 10  # Decrease player's health by 10
             if player.health < 0:
@@ -0,0 +1,370 @@
+# env.py
+# Reinforcement-learning style environments around the headless game.
+# CodebreakEnv offers reset(seed)/step(action) with fixed-size observation
+# vectors (and optional downscaled pixels); VectorEnv steps many of them in
+# worker processes that exchange actions and observations through
+# shared-memory buffers, so a batch step costs one message per worker.
+# Needs numpy (pip install numpy); the game itself does not.
+import multiprocessing
+import os
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+import pygame
+
+import headless
+from game import WIDTH, HEIGHT
+
+# Discrete actions: movement (headless.MOVES) x fire (F) x use tool (E)
+MOVE_COUNT = len(headless.MOVES)
+ACTION_COUNT = MOVE_COUNT * 4
+
+# Entities included in an observation, nearest first
+MAX_ENEMIES = 16
+MAX_RESOURCES = 8
+MAX_POWER_UPS = 3
+
+# Observation layout: player block, then fixed slots per entity kind
+PLAYER_FEATURES = 11  # x, y, health, energy, shield, facing (4), wave, time
+ENEMY_FEATURES = 4  # dx, dy, health fraction, present
+PICKUP_FEATURES = 3  # dx, dy, present
+OBS_SIZE = (PLAYER_FEATURES + MAX_ENEMIES * ENEMY_FEATURES
+            + MAX_RESOURCES * PICKUP_FEATURES + MAX_POWER_UPS * PICKUP_FEATURES)
+
+FACINGS = ("up", "down", "left", "right")
+
+
+def action_keys(action):
+    """Turn a discrete action into the keys the game sees as held."""
+    move, buttons = divmod(int(action), 4)
+    if not 0 <= move < MOVE_COUNT:
+        raise ValueError(f"Action {action} is outside 0..{ACTION_COUNT - 1}")
+    held = set(headless.MOVES[move][0])
+    if buttons & 1:
+        held.add(pygame.K_f)
+    if buttons & 2:
+        held.add(pygame.K_e)
+    return headless.BotKeys(held)
+
+
+def nearest_pickups(archetype, px, py, count, out):
+    """Write the nearest rows of a pickup archetype into out[count, 3]."""
+    rows = len(archetype)
+    if not rows:
+        return
+    # Temporary zero-copy views; the columns can't grow while these exist
+    xs = np.frombuffer(archetype.columns["x"], dtype=np.float32)
+    ys = np.frombuffer(archetype.columns["y"], dtype=np.float32)
+    dx = (xs - px) / WIDTH
+    dy = (ys - py) / HEIGHT
+    del xs, ys
+    order = np.argsort(dx * dx + dy * dy)[:count]
+    n = len(order)
+    out[:n, 0] = dx[order]
+    out[:n, 1] = dy[order]
+    out[:n, 2] = 1.0
+
+
+class CodebreakEnv:
+    """One headless game driven one action at a time.
+
+    ``reset(seed)`` returns ``(observation, info)`` and ``step(action)``
+    returns ``(observation, reward, terminated, truncated, info)``. The
+    reward is the score gained during the step; an episode terminates when
+    the player dies and is truncated after ``max_time`` game seconds. Each
+    action is held for ``frame_skip`` simulation steps of ``dt`` seconds.
+
+    With ``pixels=(width, height)`` the observation is a dict with the
+    ``state`` vector and a ``pixels`` array of shape (height, width, 3).
+
+    Each environment's game has its own clock and random generator, so any
+    number of them can share a process (as in a VectorEnv worker).
+    """
+
+    def __init__(self, difficulty="Normal", balance=None, frame_skip=4, dt=1/60,
+                 max_time=600.0, pixels=None):
+        self.difficulty = difficulty
+        self.balance = balance
+        self.frame_skip = frame_skip
+        self.dt = dt
+        self.max_time = max_time
+        self.pixels = pixels
+        self.game = headless.create_game()
+        self.seed = None
+
+    def reset(self, seed=None):
+        """Start a new episode; the same seed always replays the same way."""
+        self.seed = seed if seed is not None else (self.seed or 0) + 1
+        headless.start_session(self.game, self.seed, self.difficulty, self.balance)
+        return self.observation(), self.info()
+
+    def step(self, action):
+        """Hold an action for frame_skip steps."""
+        game = self.game
+        keys = action_keys(action)
+        score = game.score
+        with headless.quiet():
+            for _ in range(self.frame_skip):
+                game.update_simulation(keys, self.dt)
+                if game.player.health <= 0:
+                    break
+        terminated = game.player.health <= 0
+        truncated = not terminated and game.survival_time >= self.max_time
+        return (self.observation(), float(game.score - score), terminated, truncated,
+                self.info())
+
+    def info(self):
+        game = self.game
+        return {"score": game.score, "survival_time": game.survival_time,
+                "wave": game.wave_number, "seed": self.seed}
+
+    def observation(self, state=None, pixels=None):
+        """Build the current observation, optionally into given buffers."""
+        if state is None:
+            state = np.empty(OBS_SIZE, dtype=np.float32)
+        self.write_state(state)
+        if self.pixels is None:
+            return state
+        if pixels is None:
+            pixels = np.empty((self.pixels[1], self.pixels[0], 3), dtype=np.uint8)
+        self.write_pixels(pixels)
+        return {"state": state, "pixels": pixels}
+
+    def write_state(self, out):
+        """Fill a float32 vector of OBS_SIZE with the game state."""
+        game = self.game
+        player = game.player
+        out[:] = 0.0
+        px = player.x + player.width / 2
+        py = player.y + player.height / 2
+
+        out[0] = px / WIDTH
+        out[1] = py / HEIGHT
+        out[2] = player.health / player.max_health
+        out[3] = player.energy / player.max_energy
+        out[4] = player.shield / 100.0
+        if player.direction in FACINGS:
+            out[5 + FACINGS.index(player.direction)] = 1.0
+        out[9] = game.wave_number / 10.0
+        out[10] = game.survival_time / self.max_time
+
+        start = PLAYER_FEATURES
+        enemies = out[start:start + MAX_ENEMIES * ENEMY_FEATURES].reshape(MAX_ENEMIES, ENEMY_FEATURES)
+        nearby = [((enemy.x + enemy.sprite_width / 2 - px) / WIDTH,
+                   (enemy.y + enemy.sprite_height / 2 - py) / HEIGHT,
+                   enemy.health / max(enemy.max_health, 1))
+                  for enemy in game.enemies if enemy.active]
+        nearby.sort(key=lambda enemy: enemy[0] * enemy[0] + enemy[1] * enemy[1])
+        for slot, (dx, dy, health) in zip(enemies, nearby):
+            slot[:] = (dx, dy, health, 1.0)
+
+        start += MAX_ENEMIES * ENEMY_FEATURES
+        resources = out[start:start + MAX_RESOURCES * PICKUP_FEATURES].reshape(MAX_RESOURCES, PICKUP_FEATURES)
+        nearest_pickups(game.entities.archetypes["resource"], px, py, MAX_RESOURCES, resources)
+
+        start += MAX_RESOURCES * PICKUP_FEATURES
+        power_ups = out[start:].reshape(MAX_POWER_UPS, PICKUP_FEATURES)
+        nearest_pickups(game.entities.archetypes["power_up"], px, py, MAX_POWER_UPS, power_ups)
+
+    def write_pixels(self, out):
+        """Render the game world and write it downscaled into out[h, w, 3]."""
+        game = self.game
+        game.draw_gameplay_elements()
+        frame = pygame.transform.smoothscale(game.screen, self.pixels)
+        # surfarray is indexed (x, y); observations are row-major (y, x)
+        out[:] = pygame.surfarray.pixels3d(frame).transpose(1, 0, 2)
+
+
+def _worker(connection, names, num_envs, indices, env_kwargs):
+    """Worker process: step a slice of the environments on command.
+
+    Replies True after each command, or a traceback string if it failed.
+    """
+    # Asset paths are relative to the game directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    blocks = {name: shared_memory.SharedMemory(name=block) for name, block in names.items()}
+    buffers = VectorEnv.views(blocks, num_envs, env_kwargs.get("pixels"))
+    envs = {}
+    seeds = {}
+
+    def observe(index):
+        pixels = buffers["pixels"][index] if "pixels" in buffers else None
+        envs[index].observation(buffers["obs"][index], pixels)
+
+    def run(command, payload):
+        if command == "reset":
+            for index in indices:
+                if index not in envs:
+                    envs[index] = CodebreakEnv(**env_kwargs)
+                seeds[index] = payload[index]
+                envs[index].reset(seeds[index])
+                observe(index)
+        elif command == "step":
+            for index in indices:
+                env = envs[index]
+                _, reward, terminated, truncated, info = env.step(buffers["actions"][index])
+                buffers["rewards"][index] = reward
+                buffers["terminated"][index] = terminated
+                buffers["truncated"][index] = truncated
+                buffers["scores"][index] = info["score"]
+                buffers["times"][index] = info["survival_time"]
+                if terminated or truncated:
+                    # Auto-reset; seeds advance by the batch size so they never repeat
+                    seeds[index] += payload
+                    env.reset(seeds[index])
+                observe(index)
+
+    try:
+        while True:
+            command, payload = connection.recv()
+            if command == "close":
+                break
+            try:
+                run(command, payload)
+            except Exception:
+                connection.send(traceback.format_exc())
+            else:
+                connection.send(True)
+    finally:
+        # The views must be released before the blocks can be closed
+        buffers.clear()
+        for block in blocks.values():
+            block.close()
+        connection.close()
+
+
+class VectorEnv:
+    """Many CodebreakEnvs stepped in parallel worker processes.
+
+    Actions, observations, rewards and done flags live in shared memory, so
+    ``step`` only sends one small message per worker. Environments that
+    finish are reset straight away (with a fresh seed) and the observation
+    returned for them is the first one of the new episode; ``scores`` and
+    ``times`` still hold the final values of the finished episode.
+
+    Use it as a context manager, or call ``close`` to stop the workers.
+    """
+
+    def __init__(self, num_envs, num_workers=None, **env_kwargs):
+        self.num_envs = num_envs
+        self.num_workers = max(1, min(num_workers or multiprocessing.cpu_count(), num_envs))
+        self.pixels = env_kwargs.get("pixels")
+
+        sizes = self.buffer_sizes(num_envs, self.pixels)
+        self.blocks = {name: shared_memory.SharedMemory(create=True, size=size)
+                       for name, size in sizes.items()}
+        self.buffers = self.views(self.blocks, num_envs, self.pixels)
+
+        # Spawned workers start without this process's pygame/SDL state
+        context = multiprocessing.get_context("spawn")
+        self.connections = []
+        self.workers = []
+        names = {name: block.name for name, block in self.blocks.items()}
+        for worker in range(self.num_workers):
+            indices = list(range(worker, num_envs, self.num_workers))
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker,
+                                      args=(child, names, num_envs, indices, env_kwargs),
+                                      daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.workers.append(process)
+        self.closed = False
+
+    @staticmethod
+    def buffer_sizes(num_envs, pixels):
+        sizes = {
+            "obs": num_envs * OBS_SIZE * 4,
+            "actions": num_envs * 4,
+            "rewards": num_envs * 4,
+            "terminated": num_envs,
+            "truncated": num_envs,
+            "scores": num_envs * 8,
+            "times": num_envs * 8,
+        }
+        if pixels is not None:
+            sizes["pixels"] = num_envs * pixels[0] * pixels[1] * 3
+        return sizes
+
+    @staticmethod
+    def views(blocks, num_envs, pixels):
+        """Numpy arrays over the shared-memory blocks."""
+        def view(name, shape, dtype):
+            return np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf)
+
+        buffers = {
+            "obs": view("obs", (num_envs, OBS_SIZE), np.float32),
+            "actions": view("actions", (num_envs,), np.int32),
+            "rewards": view("rewards", (num_envs,), np.float32),
+            "terminated": view("terminated", (num_envs,), np.bool_),
+            "truncated": view("truncated", (num_envs,), np.bool_),
+            "scores": view("scores", (num_envs,), np.int64),
+            "times": view("times", (num_envs,), np.float64),
+        }
+        if pixels is not None:
+            buffers["pixels"] = view("pixels", (num_envs, pixels[1], pixels[0], 3), np.uint8)
+        return buffers
+
+    def _broadcast(self, command, payload=None):
+        """Send a command to every worker and wait for all of them."""
+        for connection in self.connections:
+            connection.send((command, payload))
+        errors = []
+        for connection in self.connections:
+            try:
+                reply = connection.recv()
+            except EOFError:
+                reply = "worker process exited"
+            if reply is not True:
+                errors.append(reply)
+        if errors:
+            raise RuntimeError(f"VectorEnv {command} failed in a worker:\n{errors[0]}")
+
+    def observations(self):
+        """Copy of the current observations (dict with pixels if enabled)."""
+        state = self.buffers["obs"].copy()
+        if self.pixels is None:
+            return state
+        return {"state": state, "pixels": self.buffers["pixels"].copy()}
+
+    def reset(self, seed=0):
+        """Reset every environment; environment i uses seed + i."""
+        self._broadcast("reset", [seed + index for index in range(self.num_envs)])
+        return self.observations()
+
+    def step(self, actions):
+        """Step every environment with one action each.
+
+        Returns (observations, rewards, terminated, truncated) as arrays.
+        """
+        self.buffers["actions"][:] = actions
+        self._broadcast("step", self.num_envs)
+        return (self.observations(), self.buffers["rewards"].copy(),
+                self.buffers["terminated"].copy(), self.buffers["truncated"].copy())
+
+    def close(self):
+        """Stop the workers and free the shared memory."""
+        if self.closed:
+            return
+        self.closed = True
+        for connection in self.connections:
+            try:
+                connection.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.buffers = None
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -4,15 +4,30 @@ import sys
 import random
 import math
 import time
-import os
-import json
-from player import Player
+from player import Player, DIRECTION_VECTORS
 from enemy import Enemy
 from effects import GameEffects
+from background import MenuBackground
+from ui import CachedLayer, Label, Widget, WidgetTree
+from render import SpriteBatch, HealthBarSprites
+from ai_scheduler import AIScheduler
+from waves import WavePlan, WaveSpawner
+from combat import CombatIndex, center
+from governor import LoadGovernor, QualityGovernor
+from lighting import Lighting
+from minimap import Minimap
+from spatial import SpatialGrid
+from visibility import FogLayer, Visibility
+from placement import SpawnPlacer
+import simclock
 from world import WorldGenerator
 from worldObject import WorldObjects
-
-pygame.init()
+from ecs import (EntityStore, movement_system, pulse_system,
+                 cull_system, collect_sprites)
+from settings_store import SettingsStore
+from leaderboard import Leaderboard, DIFFICULTIES
+import savegame
+from assets import AssetLoader, ASSET_MANIFEST, get_asset, load_assets, preload_names
 
 # Game window settings
 SCREEN_WIDTH, SCREEN_HEIGHT = 800, 600
@@ -20,18 +35,6 @@ WIDTH, HEIGHT = SCREEN_WIDTH, SCREEN_HEIGHT
 TILE_SIZE = 32  # Define TILE_SIZE here
 BG_COLOR = (10, 10, 25)  # Dark blue background
 
-# Fonts for UI elements
-
-try:
-    title_font = pygame.font.Font("fonts/cyberpunk.ttf", 60)
-    button_font = pygame.font.Font("fonts/cyberpunk.ttf", 40)
-    info_font = pygame.font.Font("fonts/cyberpunk.ttf", 24)
-except:
-    print("Warning: Could not load cyberpunk font, using system font")
-    title_font = pygame.font.Font(None, 60)
-    button_font = pygame.font.Font(None, 40)
-    info_font = pygame.font.Font(None, 24)
-
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -48,205 +51,296 @@ NEON_PINK = (255, 41, 117)
 NEON_RED = (255, 49, 49)
 NEON_PURPLE = (190, 0, 255)  # Adding missing NEON_PURPLE color
 
-class Button:
+# Pickup types - the index of a type is its sprite ref in the entity store
+RESOURCE_TYPES = ("code_fragments", "energy_cores", "data_shards")
+RESOURCE_VALUES = {"code_fragments": 1, "energy_cores": 2, "data_shards": 5}
+POWER_UP_TYPES = ("health", "energy", "shield", "damage")
+PULSE_FRAMES = 21  # Resource pulse moves in 0.05 steps between 0 and 1
+
+# Light colours, in RESOURCE_TYPES and POWER_UP_TYPES order
+RESOURCE_LIGHTS = ((0, 255, 255), (255, 255, 0), (255, 0, 255))
+POWER_UP_LIGHTS = ((255, 0, 0), (0, 255, 255), (255, 255, 0), (255, 0, 255))
+PLAYER_LIGHT = (200, 220, 255)
+
+# Balance knobs for the wave, enemy-scaling, resource-spawn and crafting
+# logic. Each Game copies these into self.balance; simulate.py sweeps them.
+BALANCE_DEFAULTS = {
+    "difficulty_multipliers": {"Easy": 0.7, "Normal": 1.0, "Hard": 2.0},  # Enemies per wave
+    "wave_factor": 0.1,  # Enemy health gained per wave
+    "wave_speed_factor": 0.05,  # Enemy speed gained per wave
+    "resource_weights": (0.5, 0.3, 0.2),  # World spawns, in RESOURCE_TYPES order
+    "drop_weights": (0.6, 0.3, 0.1),  # Enemy drops, in RESOURCE_TYPES order
+    "drop_chance": 0.7,  # Chance a defeated enemy drops a resource
+    "craft_cost_scale": 1.0,  # Multiplier on every crafting recipe cost
+    "map_style": "scatter",  # Arena layout: "scatter" blocks or "caves" (needs numpy)
+}
+
+class Button(Widget):
     def __init__(self, x, y, width, height, text, callback):
-        self.rect = pygame.Rect(x, y, width, height)
+        super().__init__((x, y, width, height))
         self.text = text
         self.callback = callback
-        self.hovered = False
-        
-    def draw(self, surface, font):
+
+    def render(self, font, state):
         # Colors
         base_color = NEON_BLUE
         hover_color = NEON_PINK
         text_color = WHITE
-        
+
+        surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        rect = surface.get_rect()
+
         # Draw button background
-        color = hover_color if self.hovered else base_color
-        pygame.draw.rect(surface, color, self.rect, border_radius=5)
-        pygame.draw.rect(surface, WHITE, self.rect, 2, border_radius=5)  # Border
-        
+        color = hover_color if state == "hover" else base_color
+        pygame.draw.rect(surface, color, rect, border_radius=5)
+        pygame.draw.rect(surface, WHITE, rect, 2, border_radius=5)  # Border
+
         # Draw text
         text_surf = font.render(self.text, True, text_color)
-        text_rect = text_surf.get_rect(center=self.rect.center)
+        text_rect = text_surf.get_rect(center=rect.center)
         surface.blit(text_surf, text_rect)
-    
-    def update(self, mouse_pos):
-        # Update hover state
-        self.hovered = self.rect.collidepoint(mouse_pos)
-        
+        return surface, self.rect.topleft
+
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            if self.hovered:
+            if self.hovered or self.rect.collidepoint(event.pos):
                 self.callback()
                 return True
         return False
 
 
-class Slider:
+class Slider(Widget):
     def __init__(self, x, y, width, height, label, value, callback):
-        self.rect = pygame.Rect(x, y, width, height)
+        super().__init__((x, y, width, height))
         self.label = label
         self.value = value  # 0.0 to 1.0
         self.callback = callback
         self.active = False
         self.handle_width = 15
-        
-    def draw(self, surface, font):
-        # Draw label
+
+    def state(self):
+        return "active" if self.active else super().state()
+
+    def cache_key(self):
+        # Looks the same hovered or dragged; the value change marks it dirty
+        return "normal"
+
+    def render(self, font, state):
         label_surf = font.render(f"{self.label}: {int(self.value * 100)}%", True, WHITE)
         label_rect = label_surf.get_rect(bottomleft=(self.rect.x, self.rect.y - 5))
-        surface.blit(label_surf, label_rect)
-        
+        handle_area = self.rect.inflate(self.handle_width, 4)
+        bounds = label_rect.union(handle_area)
+        surface = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        offset = (-bounds.x, -bounds.y)
+        rect = self.rect.move(offset)
+
+        # Draw label
+        surface.blit(label_surf, label_rect.move(offset))
+
         # Draw slider background
-        pygame.draw.rect(surface, GRAY, self.rect, border_radius=3)
-        
+        pygame.draw.rect(surface, GRAY, rect, border_radius=3)
+
         # Draw slider fill
-        fill_rect = pygame.Rect(self.rect.x, self.rect.y, 
-                               int(self.rect.width * self.value), self.rect.height)
+        fill_rect = pygame.Rect(rect.x, rect.y,
+                               int(rect.width * self.value), rect.height)
         pygame.draw.rect(surface, NEON_BLUE, fill_rect, border_radius=3)
-        
+
         # Draw handle
-        handle_x = self.rect.x + int(self.rect.width * self.value) - self.handle_width // 2
-        handle_rect = pygame.Rect(handle_x, self.rect.y - 2, 
-                                 self.handle_width, self.rect.height + 4)
+        handle_x = rect.x + int(rect.width * self.value) - self.handle_width // 2
+        handle_rect = pygame.Rect(handle_x, rect.y - 2,
+                                 self.handle_width, rect.height + 4)
         pygame.draw.rect(surface, WHITE, handle_rect, border_radius=3)
-    
-    def update(self, mouse_pos):
-        # Check if mouse is over the slider
-        self.hovered = self.rect.collidepoint(mouse_pos)
-        
+        return surface, bounds.topleft
+
+    def set_value(self, value):
+        if value != self.value:
+            self.value = value
+            self.mark_dirty()
+
+    def on_mouse_move(self, mouse_pos):
         # If active, update value based on mouse position
         if self.active:
-            # Calculate value based on mouse x position
             rel_x = max(0, min(mouse_pos[0] - self.rect.x, self.rect.width))
-            self.value = rel_x / self.rect.width
-            # Call the callback with the new value
-            self.callback(self.value)
-    
+            value = rel_x / self.rect.width
+            if value != self.value:
+                self.set_value(value)
+                self.callback(self.value)
+
+    def update(self, mouse_pos):
+        super().update(mouse_pos)
+        self.on_mouse_move(mouse_pos)
+
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            if self.hovered:
+            if self.hovered or self.rect.collidepoint(event.pos):
                 self.active = True
+                # Keep receiving the drag even once the mouse leaves the bar
+                self.capture()
                 return True
         elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
             if self.active:
                 self.active = False
+                self.release()
                 return True
         return False
 
 
-class Toggle:
+class Toggle(Widget):
     def __init__(self, x, y, label, value, callback):
-        self.rect = pygame.Rect(x, y, 50, 25)
+        super().__init__((x, y, 50, 25))
         self.label = label
         self.value = value  # Boolean
         self.callback = callback
-        self.hovered = False
-        
-    def draw(self, surface, font):
-        # Draw label
+
+    def cache_key(self):
+        return "normal"
+
+    def render(self, font, state):
         label_surf = font.render(self.label, True, WHITE)
         label_rect = label_surf.get_rect(bottomleft=(self.rect.x, self.rect.y - 5))
-        surface.blit(label_surf, label_rect)
-        
+        bounds = label_rect.union(self.rect)
+        surface = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        offset = (-bounds.x, -bounds.y)
+        rect = self.rect.move(offset)
+
+        # Draw label
+        surface.blit(label_surf, label_rect.move(offset))
+
         # Draw toggle background
         bg_color = NEON_BLUE if self.value else GRAY
-        pygame.draw.rect(surface, bg_color, self.rect, border_radius=12)
-        
+        pygame.draw.rect(surface, bg_color, rect, border_radius=12)
+
         # Draw toggle switch
-        switch_x = self.rect.x + 25 if self.value else self.rect.x + 5
-        switch_rect = pygame.Rect(switch_x, self.rect.y + 2, 20, 20)
+        switch_x = rect.x + 25 if self.value else rect.x + 5
+        switch_rect = pygame.Rect(switch_x, rect.y + 2, 20, 20)
         pygame.draw.rect(surface, WHITE, switch_rect, border_radius=10)
-    
-    def update(self, mouse_pos):
-        self.hovered = self.rect.collidepoint(mouse_pos)
+        return surface, bounds.topleft
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            if self.hovered:
+            if self.hovered or self.rect.collidepoint(event.pos):
                 self.value = not self.value
+                self.mark_dirty()
                 self.callback(self.value)
                 return True
         return False
 
 
-class Dropdown:
+class Dropdown(Widget):
     def __init__(self, x, y, width, height, label, options, current_value, callback):
-        self.rect = pygame.Rect(x, y, width, height)
+        super().__init__((x, y, width, height))
         self.label = label
         self.options = options
         self.current_value = current_value
         self.callback = callback
-        self.hovered = False
         self.expanded = False
+        self.hovered_option = None
         self.option_height = height
-        
+
         # Create option rects
         self.option_rects = []
         for i in range(len(options)):
             option_rect = pygame.Rect(x, y + (i + 1) * height, width, height)
             self.option_rects.append(option_rect)
-    
-    def draw(self, surface, font):
-        # Draw label
+
+    def state(self):
+        return "active" if self.expanded else super().state()
+
+    def cache_key(self):
+        # The closed box doesn't react to hover; the open list highlights one option
+        return ("open", self.hovered_option) if self.expanded else "closed"
+
+    def hit_rect(self):
+        if self.expanded:
+            return self.rect.unionall(self.option_rects)
+        return self.rect
+
+    def render(self, font, state):
         label_surf = font.render(self.label, True, WHITE)
         label_rect = label_surf.get_rect(bottomleft=(self.rect.x, self.rect.y - 5))
-        surface.blit(label_surf, label_rect)
-        
+        bounds = label_rect.union(self.hit_rect())
+        surface = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        offset = (-bounds.x, -bounds.y)
+        rect = self.rect.move(offset)
+
+        # Draw label
+        surface.blit(label_surf, label_rect.move(offset))
+
         # Draw dropdown
-        pygame.draw.rect(surface, NEON_BLUE, self.rect, border_radius=5)
-        pygame.draw.rect(surface, WHITE, self.rect, 2, border_radius=5)  # Border
-        
+        pygame.draw.rect(surface, NEON_BLUE, rect, border_radius=5)
+        pygame.draw.rect(surface, WHITE, rect, 2, border_radius=5)  # Border
+
         # Draw current value
         value_surf = font.render(self.current_value, True, WHITE)
-        value_rect = value_surf.get_rect(midleft=(self.rect.x + 10, self.rect.centery))
+        value_rect = value_surf.get_rect(midleft=(rect.x + 10, rect.centery))
         surface.blit(value_surf, value_rect)
-        
+
         # Draw arrow
         arrow_points = [
-            (self.rect.right - 20, self.rect.centery - 5),
-            (self.rect.right - 10, self.rect.centery + 5),
-            (self.rect.right - 30, self.rect.centery + 5)
+            (rect.right - 20, rect.centery - 5),
+            (rect.right - 10, rect.centery + 5),
+            (rect.right - 30, rect.centery + 5)
         ]
         pygame.draw.polygon(surface, WHITE, arrow_points)
-        
+
         # Draw options if expanded
         if self.expanded:
             for i, option_rect in enumerate(self.option_rects):
+                option_rect = option_rect.move(offset)
                 # Draw option background
-                hover_color = NEON_PINK if option_rect.collidepoint(pygame.mouse.get_pos()) else NEON_BLUE
+                hover_color = NEON_PINK if i == self.hovered_option else NEON_BLUE
                 pygame.draw.rect(surface, hover_color, option_rect, border_radius=5)
                 pygame.draw.rect(surface, WHITE, option_rect, 2, border_radius=5)  # Border
-                
+
                 # Draw option text
                 option_surf = font.render(self.options[i], True, WHITE)
                 option_rect_center = option_surf.get_rect(midleft=(option_rect.x + 10, option_rect.centery))
                 surface.blit(option_surf, option_rect_center)
-    
-    def update(self, mouse_pos):
-        self.hovered = self.rect.collidepoint(mouse_pos)
-    
+        return surface, bounds.topleft
+
+    def set_expanded(self, expanded):
+        self.expanded = expanded
+        self.hovered_option = None
+        # The open list takes clicks too, so the hit area changes size
+        self.reindex()
+        if expanded:
+            self.focus()
+        self.request_redraw()
+
+    def on_mouse_move(self, mouse_pos):
+        hovered_option = None
+        if self.expanded:
+            for i, option_rect in enumerate(self.option_rects):
+                if option_rect.collidepoint(mouse_pos):
+                    hovered_option = i
+                    break
+        if hovered_option != self.hovered_option:
+            self.hovered_option = hovered_option
+            self.request_redraw()
+
+    def blur(self):
+        # Close if clicked elsewhere
+        if self.expanded:
+            self.set_expanded(False)
+
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             # Toggle expanded state
-            if self.hovered:
-                self.expanded = not self.expanded
+            if self.rect.collidepoint(event.pos):
+                self.set_expanded(not self.expanded)
                 return True
-                
+
             # Check if clicked on an option
             if self.expanded:
                 for i, option_rect in enumerate(self.option_rects):
                     if option_rect.collidepoint(event.pos):
                         self.current_value = self.options[i]
+                        self.mark_dirty()
+                        self.set_expanded(False)
                         self.callback(self.current_value)
-                        self.expanded = False
                         return True
-                        
-            # Close if clicked elsewhere
-            if self.expanded:
-                self.expanded = False
-                
+                self.blur()
+
         return False
 
 class Menu:
@@ -255,6 +349,14 @@ class Menu:
         self.background = pygame.Surface((WIDTH, HEIGHT))
         self.generate_cyberpunk_background()
         
+        # Grid overlay strip, one line spacing taller than the screen so it
+        # can be scrolled by blitting at an offset
+        self.grid_strip = pygame.Surface((WIDTH, HEIGHT + 20))
+        self.grid_strip.fill((255, 0, 255))
+        for y in range(0, HEIGHT + 20, 20):
+            pygame.draw.line(self.grid_strip, (0, 150, 255), (0, y), (WIDTH, y), 1)
+        self.grid_strip.set_colorkey((255, 0, 255), pygame.RLEACCEL)
+        
         # Title animation properties
         self.title_y = -100
         self.title_target_y = 100
@@ -353,12 +455,7 @@ class Menu:
         screen.blit(self.background, (0, 0))
         
         # Draw animated grid overlay
-        grid_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        for y in range(int(-self.grid_offset), HEIGHT, 20):
-            alpha = int(100 * (1 - (abs(y - HEIGHT/2) / (HEIGHT/2))))
-            line_color = (0, 150, 255)  # Removed alpha channel
-            pygame.draw.line(grid_surface, line_color, (0, y), (WIDTH, y), 1)
-        screen.blit(grid_surface, (0, 0))
+        screen.blit(self.grid_strip, (0, -(int(self.grid_offset) % 20)))
         
         # Draw data particles
         for particle in self.data_particles:
@@ -367,8 +464,8 @@ class Menu:
                              particle["size"])
         
         # Draw title with glowing effect
-        title = title_font.render("CODEBREAK", True, NEON_BLUE)
-        subtitle = info_font.render("A Digital Survival Game", True, (180, 180, 255, self.subtitle_alpha))
+        title = self.game.title_font.render("CODEBREAK", True, NEON_BLUE)
+        subtitle = self.game.info_font.render("A Digital Survival Game", True, (180, 180, 255, self.subtitle_alpha))
         
         # Add glow effect to title
         glow_surf = pygame.Surface((title.get_width() + 20, title.get_height() + 20), pygame.SRCALPHA)
@@ -386,10 +483,10 @@ class Menu:
         
         # Draw buttons
         for button in self.buttons:
-            button.draw(screen, button_font)
+            button.draw(screen, self.game.button_font)
         
         # Draw version info
-        version_text = info_font.render("v1.0", True, (100, 100, 150))
+        version_text = self.game.info_font.render("v1.0", True, (100, 100, 150))
         screen.blit(version_text, (WIDTH - version_text.get_width() - 10, HEIGHT - version_text.get_height() - 10))
 
     def handle_events(self, events):
@@ -418,14 +515,32 @@ class Menu:
         sys.exit()
 
 class Game:
-    def __init__(self):
-        """Initialize the game state."""
+    def __init__(self, headless=False):
+        """Initialize the game state.
+
+        Headless games (batch simulations) keep settings in memory and have
+        no leaderboard, so they never touch the player's files.
+        """
+        self.headless = headless
+        
+        # Startup timing (time-to-interactive-menu, time-to-first-gameplay-frame)
+        self.boot_started = time.perf_counter()
+        self.gameplay_requested = None
+        self.startup_metrics = {}
+        
         pygame.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("CodeBreak")
-        self.clock = pygame.time.Clock()
+        self.frame_clock = pygame.time.Clock()
         self.FPS = 60
         
+        # Game time; gameplay timers are scheduled on it
+        self.clock = simclock.SimClock()
+        
+        # Gameplay randomness (world layout, spawns, drops); cosmetic effects
+        # use the random module, so they never change a seeded run
+        self.rng = random.Random()
+        
         # Game state
         self.current_state = "menu"
         self.previous_state = None
@@ -436,19 +551,30 @@ class Game:
         self.next_state = None
         self.show_crafting = False  # New flag for crafting UI
         
-        # Settings
-        self.settings = {
-            "sound_volume": 0.7,
-            "music_volume": 0.5,
-            "screen_shake": True,
-            "show_damage": True,
-            "difficulty": "Normal"
-        }
-        
-        # Load settings if available
-        self.load_settings()
+        # Settings (loaded from settings.json, saved in the background)
+        self.settings = SettingsStore(None if headless else "settings.json")
+        self.balance = dict(BALANCE_DEFAULTS)
+        # The current run's difficulty: the preference when the run started,
+        # or the saved one after a quick-load (which leaves settings alone)
+        self.difficulty = self.settings["difficulty"]
+        
+        # Local leaderboard; runs are recorded at game over
+        self.leaderboard = None if headless else Leaderboard("leaderboard.db")
+        self.leaderboard_by = "score"  # "score" or "time"
+        self.leaderboard_difficulty = None  # None shows every difficulty
+        
+        # Quick-save slot (F5 saves, F9 loads), written in the background
+        self.save_writer = None if headless else savegame.SaveWriter("quicksave.sav")
+        
+        # Initialize game assets. Fonts are needed by the first menu frame;
+        # everything else decodes on a worker thread while the menu animates.
+        load_assets(preload_names())
+        self.asset_loader = AssetLoader(on_progress=self.on_asset_progress)
+        self.loading_label = ""
+        self.assets_ready = False
+        self.sprites_loaded = False
+        self.asset_loader.start()
         
-        # Initialize game assets
         self.load_fonts()
         self.load_colors()
         self.load_sounds()
@@ -456,11 +582,22 @@ class Game:
         
         # Create game objects
         self.player = None
+        self.allies = []  # Co-op teammates (netplay); enemies target them too
         self.enemies = []
-        self.resources = []
-        self.power_ups = []
-        self.projectiles = []
-        self.effects_list = []  # For visual effects
+        self.entities = EntityStore()  # Projectiles, resources, power-ups, explosions
+        
+        # Proximity index for pickups, for collection and spawn placement
+        self.proximity = SpatialGrid(TILE_SIZE * 2)
+        self.entities.track("resource", self.proximity)
+        self.entities.track("power_up", self.proximity)
+        
+        # Enemy AI runs at state/distance-based rates; a frame spends at most
+        # 2 ms on it. Headless runs never defer, so seeded runs repeat exactly.
+        self.ai_scheduler = AIScheduler(budget=None if headless else 0.002)
+        
+        # Melee arcs and tool blasts find their targets through a spatial index
+        self.combat = CombatIndex(lambda: self.enemies, self.clock)
+        self.effects_list = []  # For text effects
         
         # Camera and effects
         self.camera_offset_x = 0
@@ -472,23 +609,49 @@ class Game:
         self.score = 0
         self.survival_time = 0
         
-        # Wave system
+        # Wave system; spawns and wave breaks run on game-clock timers.
+        # Enemies are pre-built ahead of their wave and arrive from that pool,
+        # at most 1 ms of spawning work a frame (none deferred headless).
         self.wave_number = 0
-        self.enemies_to_spawn = 0
-        self.spawn_timer = 0
-        self.next_wave_timer = 0
+        self.enemies_to_spawn = 0  # Still to arrive this wave
+        self.wave_timer = None
+        self.wave_spawner = WaveSpawner(self.build_enemy, self.spawn_wave_enemy,
+                                        budget=None if headless else 0.001)
+        # Arrivals wait (and, if kept waiting, arrive merged into elites)
+        # while enemy and projectile updates would take over 4 ms a tick.
+        # Headless games measure nothing and are never throttled.
+        self.load = LoadGovernor(budget=None if headless else 0.004)
+        
+        # Power-ups
+        self.power_up_timer = None
+        self.power_up_spawn_interval = 45.0  # Spawn every 45 seconds
+        self.power_up_spawn_chance = 0.7     # 70% chance to spawn when timer is up
+        self.max_power_ups = 3               # Maximum number of power-ups at once
         
         # World generation
         self.world_generator = None
+        self.visibility = None  # Player's field of view over the world's tiles
+        self.fog = None
+        self.minimap = None
+        self.spawn_placer = None  # Pickup spawn spots for the current world
         self.object_sprites = {}
         self.resource_sprites = {}
         self.power_up_sprites = {}
+        self.entity_sprites = {}  # Archetype name -> sprite table for collect_sprites
         self.enemy_sprite_sheet = None
         self.player_sprite_sheet = None
         
-        # Initialize background elements
-        self.bg_particles = []
-        self.grid_offset_y = 0
+        # Batched gameplay drawing, in back-to-front layer order
+        self.sprite_batch = SpriteBatch(("objects", "pickups", "enemies", "health_bars",
+                                         "players", "projectiles"))
+        self.health_bars = HealthBarSprites(40, 5, RED, GREEN)
+        self.lighting = Lighting((WIDTH, HEIGHT))
+        self.object_blits = []
+        self.object_blits_world = None  # World the object blit list was built for
+        
+        # Initialize background elements (pre-rendered layers)
+        self.menu_background = MenuBackground(WIDTH, HEIGHT, BG_COLOR, NEON_BLUE,
+                                              (NEON_BLUE, NEON_PINK, NEON_GREEN))
         
         # Last frame time for delta time calculation
         self.last_frame_time = pygame.time.get_ticks()
@@ -498,32 +661,29 @@ class Game:
         
         # Game effects
         self.effects = GameEffects()
+        
+        # Visual quality follows frame-time headroom. Only the interactive
+        # loop records frames, so headless games stay at the top level.
+        self.quality = QualityGovernor(budget=1 / self.FPS)
+        self.pulse_frames = 0  # Frames since the last resource pulse step
+        self.effect_fonts = {}  # Text effect size -> font
 
     def load_fonts(self):
-        """Load fonts for the game."""
-        # Try to load custom font, fall back to system font
-        try:
-            pygame.font.init()
-            # Check if font file exists
-            if os.path.exists("fonts/cyber.ttf"):
-                self.font_xl = pygame.font.Font("fonts/cyber.ttf", 48)
-                self.font_lg = pygame.font.Font("fonts/cyber.ttf", 36)
-                self.font_md = pygame.font.Font("fonts/cyber.ttf", 24)
-                self.font_sm = pygame.font.Font("fonts/cyber.ttf", 18)
-            else:
-                # Use default font
-                print("Warning: Could not load cyberpunk font, using system font")
-                self.font_xl = pygame.font.Font(None, 48)
-                self.font_lg = pygame.font.Font(None, 36)
-                self.font_md = pygame.font.Font(None, 24)
-                self.font_sm = pygame.font.Font(None, 18)
-        except Exception as e:
-            print(f"Error loading fonts: {e}")
-            # Fallback to system font
-            self.font_xl = pygame.font.Font(None, 48)
-            self.font_lg = pygame.font.Font(None, 36)
-            self.font_md = pygame.font.Font(None, 24)
-            self.font_sm = pygame.font.Font(None, 18)
+        """Load fonts for the game from the asset cache."""
+        # The asset manifest falls back to the system font for missing files
+        self.font_xl = get_asset("font_xl")
+        self.font_lg = get_asset("font_lg")
+        self.font_md = get_asset("font_md")
+        self.font_sm = get_asset("font_sm")
+        
+        # Fonts for the menu, pause, leaderboard and settings screens
+        self.title_font = get_asset("font_title")
+        self.button_font = get_asset("font_button")
+        self.info_font = get_asset("font_info")
+
+    def on_asset_progress(self, name, loaded, total):
+        """Record loader progress (called from the asset loader thread)."""
+        self.loading_label = name
 
     def load_colors(self):
         """Initialize color schemes."""
@@ -544,8 +704,9 @@ class Game:
         
         self.menu_buttons = [
             Button(button_x, 250, button_width, button_height, "START GAME", lambda: self.transition_to("gameplay")),
-            Button(button_x, 320, button_width, button_height, "SETTINGS", lambda: self.transition_to("settings")),
-            Button(button_x, 390, button_width, button_height, "QUIT", pygame.quit)
+            Button(button_x, 320, button_width, button_height, "LEADERBOARD", self.show_leaderboard),
+            Button(button_x, 390, button_width, button_height, "SETTINGS", lambda: self.transition_to("settings")),
+            Button(button_x, 460, button_width, button_height, "QUIT", pygame.quit)
         ]
         
         # Create pause menu buttons
@@ -561,6 +722,12 @@ class Game:
             Button(button_x, 420, button_width, button_height, "QUIT TO MENU", lambda: self.transition_to("menu"))
         ]
         
+        # Leaderboard back button
+        self.leaderboard_back_button = Button(WIDTH // 2 - 75, HEIGHT - 80, 150, 40, "BACK",
+                                              lambda: self.transition_to("menu"))
+        self.settings_back_button = Button(WIDTH // 2 - 125, HEIGHT - 80, 250, 50, "SAVE & RETURN",
+                                           lambda: self.transition_to("menu"))
+        
         # Create settings controls
         self.settings_controls = []
         
@@ -598,6 +765,34 @@ class Game:
                     self.settings["difficulty"], 
                     lambda val: self.update_setting("difficulty", val))
         )
+        
+        # Each menu screen is a retained widget tree: widgets keep their renders,
+        # the tree recomposes only when one changes, and clicks are routed
+        # through its hit-test index instead of looping over every control
+        self.menu_ui = WidgetTree([
+            Label((WIDTH // 2 + 3, 100 + 3), "CODEBREAK", self.font_xl, NEON_PINK, "midtop"),
+            Label((WIDTH // 2, 100), "CODEBREAK", self.font_xl, NEON_BLUE, "midtop"),
+            Label((WIDTH // 2, 160), "CYBER SURVIVAL", self.font_md, WHITE, "midtop"),
+            Label((WIDTH - 10, HEIGHT - 10), "v0.1", self.font_sm, GRAY, "bottomright"),
+        ] + self.menu_buttons, self.font_md)
+        self.pause_ui = WidgetTree(self.pause_buttons, self.font_md)
+        self.game_over_score = Label((WIDTH // 2, 220), "", self.font_md, WHITE, "midtop")
+        self.game_over_time = Label((WIDTH // 2, 260), "", self.font_md, WHITE, "midtop")
+        self.game_over_ui = WidgetTree([
+            Label((WIDTH // 2, 150), "GAME OVER", self.font_xl, NEON_RED, "midtop"),
+            self.game_over_score,
+            self.game_over_time,
+        ] + self.game_over_buttons, self.font_md)
+        self.leaderboard_ui = WidgetTree([self.leaderboard_back_button], self.button_font)
+        self.settings_ui = WidgetTree(
+            [Label((WIDTH // 2, 80), "SETTINGS", self.font_lg, NEON_BLUE, "midtop")]
+            + self.settings_controls, self.font_md)
+        
+        # Static screens are composed once and only rebuilt when their data changes
+        self.leaderboard_layer = CachedLayer(self.build_leaderboard_layer)
+        self.settings_backdrop = CachedLayer(self.build_settings_backdrop)
+        self.pause_layer = CachedLayer(self.build_pause_layer)
+        self.pause_snapshot = None  # Last gameplay frame before pausing
 
     def handle_gameplay(self, events=None, dt=1/60):
         """Handle gameplay state."""
@@ -626,6 +821,16 @@ class Game:
                     else:
                         self.transition_to("pause")
                 
+                # Quick-save and quick-load
+                elif event.key == pygame.K_F5:
+                    self.quick_save()
+                elif event.key == pygame.K_F9:
+                    self.quick_load()
+                
+                # Debug overlay toggle
+                elif event.key == pygame.K_F3:
+                    self.debug_mode = not self.debug_mode
+                
                 # Crafting selection (only when menu is open)
                 elif self.show_crafting and event.key in [pygame.K_1, pygame.K_2, pygame.K_3]:
                     craft_index = event.key - pygame.K_1  # Convert to 0-based index
@@ -644,17 +849,64 @@ class Game:
         
         # Handle continuous gameplay actions when crafting menu is closed
         if not self.show_crafting:
-            # Process movement
-            moving = self.player.move(keys, self.world_generator)
-            
-            # Handle tool usage with E key
-            if keys[pygame.K_e] and self.player.equipped_tool:
-                self.player.use_tool()
+            self.update_simulation(keys, dt)
+        
+        # Update camera shake
+        if self.screen_shake_duration > 0:
+            self.screen_shake_duration -= 1
+            if self.screen_shake_duration <= 0:
+                self.camera_offset_x = 0
+                self.camera_offset_y = 0
+            elif self.settings["screen_shake"] and self.quality.level.screen_shake:
+                self.camera_offset_x = random.randint(-2, 2)
+                self.camera_offset_y = random.randint(-2, 2)
+        
+        # Advance power-up particles
+        self.effects.update()
+        
+        # Draw game world
+        self.draw_gameplay_elements()
+        
+        # Draw crafting UI on top if active
+        if self.show_crafting:
+            self.draw_crafting_ui()
+        
+        # Always draw UI
+        self.draw_gameplay_ui()
+        
+        # Record the run and end the game once the player is defeated
+        if self.player.health <= 0 and not self.fading_out:
+            self.handle_player_defeat()
+
+    def update_simulation(self, keys, dt):
+        """Advance gameplay by one step from held keys, without drawing.
+
+        ``keys`` is anything indexable by key constants, like the result of
+        pygame.key.get_pressed(); headless runs pass a scripted stand-in.
+        """
+        # Gameplay timers run on game time, which only moves in this step
+        self.clock.advance(dt)
+        
+        self.update_player(keys)
+        
+        # Update game world
+        self.update_game_world(dt)
+
+    def update_player(self, keys):
+        """Move, use tools and animate self.player from held keys."""
+        # Process movement
+        moving = self.player.move(keys, self.world_generator)
+        
+        # Handle tool usage with E key
+        if keys[pygame.K_e] and self.player.equipped_tool:
+            # Read the tool first; it may break when used
+            tool = self.player.equipped_tool
+            tool_name = tool["name"]
+            if self.player.use_tool():
                 self.play_sound("level_up")
                 print("Using equipped tool")  # Debug print
                 
                 # Add visual effect to show tool was used
-                tool_name = self.player.equipped_tool["name"]
                 if tool_name == "data_shield":
                     effect_text = "Shield activated!"
                     effect_color = CYAN
@@ -679,32 +931,67 @@ class Game:
                     self.add_effect("explosion", self.player.x, self.player.y)
                 elif tool_name == "hack_tool":
                     self.start_screen_shake(5, 0.5)
-            
-            # Update player animation
-            self.player.animate(moving, keys, self.enemies)
-            
-            # Update game world
-            self.update_game_world(dt)  # Pass the proper dt value
-        
-        # Update camera shake
-        if self.screen_shake_duration > 0:
-            self.screen_shake_duration -= 1
-            if self.screen_shake_duration <= 0:
-                self.camera_offset_x = 0
-                self.camera_offset_y = 0
-            else:
-                self.camera_offset_x = random.randint(-2, 2)
-                self.camera_offset_y = random.randint(-2, 2)
-        
-        # Draw game world
-        self.draw_gameplay_elements()
-        
-        # Draw crafting UI on top if active
-        if self.show_crafting:
-            self.draw_crafting_ui()
-        
-        # Always draw UI
-        self.draw_gameplay_ui()
+                    self.hack_blast(tool["stats"])
+        
+        # Update player animation; a new Space swing hits what is in front
+        was_attacking = self.player.attacking
+        self.player.animate(moving, keys, self.enemies)
+        if self.player.attacking and not was_attacking:
+            self.melee_swing()
+        return moving
+
+    def melee_swing(self):
+        """Hit the enemies in the arc in front of the player."""
+        player = self.player
+        x, y = player.x + player.width / 2, player.y + player.height / 2
+        facing = DIRECTION_VECTORS.get(player.direction, (0, 1))
+        hits = self.combat.sector(x, y, facing, player.melee_range, player.melee_arc)
+        self.apply_hits(hits, player.damage, player.melee_knockback, x, y)
+
+    def hack_blast(self, stats):
+        """Hit every enemy within the hack tool's range."""
+        player = self.player
+        x, y = player.x + player.width / 2, player.y + player.height / 2
+        hits = self.combat.circle(x, y, stats["range"])
+        self.apply_hits(hits, stats.get("damage", 0), stats.get("knockback", 0), x, y)
+
+    def apply_hits(self, hits, damage, knockback, x, y):
+        """Apply one attack to all the enemies it hit: damage, knockback away
+        from (x, y) and a damage number each, and a single hit sound."""
+        if not hits:
+            return
+        for enemy in hits:
+            enemy.health -= damage
+            if knockback:
+                ex, ey = center(enemy)
+                distance = math.hypot(ex - x, ey - y)
+                if distance > 0:
+                    enemy.x += (ex - x) / distance * knockback
+                    enemy.y += (ey - y) / distance * knockback
+                    self.combat.moved(enemy)
+            self.add_effect("text", enemy.x + enemy.sprite_width // 2, enemy.y - 10,
+                            text=f"-{damage}", color=RED, size=16, duration=0.5)
+        self.play_sound("hit")
+
+    def quick_save(self):
+        """Copy the run and hand it to the background save writer."""
+        if self.save_writer is None or self.player.health <= 0:
+            return
+        self.save_writer.save(savegame.snapshot(self))
+        self.add_effect("text", WIDTH // 2, 100, text="Game saved",
+                        color=NEON_GREEN, size=24, duration=1.5)
+
+    def quick_load(self):
+        """Replace the run with the quick-save, if there is one."""
+        if self.save_writer is None:
+            return
+        # A save still in flight must land before it is read back
+        self.save_writer.flush()
+        if savegame.load(self, self.save_writer.path):
+            text, color = "Game loaded", NEON_GREEN
+        else:
+            text, color = "No quick-save to load", RED
+        self.add_effect("text", WIDTH // 2, 100, text=text, color=color, size=24, duration=1.5)
 
     def draw_crafting_ui(self):
         """Draw the crafting interface."""
@@ -820,7 +1107,10 @@ class Game:
         self.update_wave_spawning(dt)
         
         # Update enemies
+        enemy_count = len(self.enemies)
+        started = time.perf_counter()
         self.update_enemies(dt)
+        self.load.measure("enemy", enemy_count, time.perf_counter() - started)
         
         # Update resources
         self.update_resources(dt)
@@ -829,63 +1119,99 @@ class Game:
         self.update_power_ups(dt)
         
         # Update projectiles
+        projectile_count = self.entities.count("projectile")
+        started = time.perf_counter()
         self.update_projectiles(dt)
+        self.load.measure("projectile", projectile_count, time.perf_counter() - started)
         
-        # Update visual effects
-        self.update_visual_effects(dt)
+        # Timed entities and visual effects expire on game-clock timers
 
     def update_enemies(self, dt):
         """Update all enemy entities."""
+        # Enemy logic, for the enemies that are due this tick. Enemies out of
+        # sight think less often (not in co-op, where each player sees a
+        # different part of the map).
+        if self.player:
+            self.update_visibility()
+            in_view = self.enemy_in_view if self.visibility and not self.allies else None
+            self.ai_scheduler.update(self.enemies, self.enemy_target, in_view)
+        
         # Use a copy of the list for safe iteration
         for enemy in self.enemies[:]:
             if enemy.active:
-                # Update enemy logic
-                if self.player:
-                    enemy.update(self.player)
-                
                 # Check if enemy is defeated
                 if enemy.health <= 0:
-                    # Spawn resources at enemy position
-                    if random.random() < 0.7:  # 70% chance to drop resources
-                        self.spawn_resource_at(enemy.x, enemy.y)
+                    # Spawn resources at enemy position (an elite drops
+                    # for each enemy merged into it)
+                    for _ in range(enemy.weight):
+                        if self.rng.random() < self.balance["drop_chance"]:
+                            self.spawn_resource_at(enemy.x, enemy.y)
                     
                     # Remove from active enemies
                     self.enemies.remove(enemy)
                     
                     # Update score
-                    self.score += 100 * self.wave_number
+                    self.score += 100 * self.wave_number * enemy.weight
                     
                     # Add effect
                     self.add_effect("explosion", enemy.x, enemy.y)
 
+    def update_visibility(self):
+        """Recompute the field of view if the player moved to another tile."""
+        if self.visibility and self.player:
+            self.visibility.update(self.player.x + self.player.width / 2,
+                                   self.player.y + self.player.height / 2)
+
+    def enemy_in_view(self, enemy):
+        """Check if the player can see an enemy."""
+        return self.visibility.can_see(*center(enemy))
+
+    def enemy_target(self, enemy):
+        """Return the player an enemy goes after: in co-op, the nearest
+        living one (None once everyone is down)."""
+        if not self.allies:
+            return self.player
+        players = [player for player in [self.player, *self.allies] if player.health > 0]
+        if not players:
+            return None
+        return min(players, key=lambda player: (player.x - enemy.x) ** 2 + (player.y - enemy.y) ** 2)
+
     def update_resources(self, dt):
         """Update all resource entities."""
-        # Remove collected resources
-        self.resources = [r for r in self.resources if not r["collected"]]
-        
-        # Update resource animations
-        for resource in self.resources:
-            # Pulse animation
-            resource["pulse"] += 0.05 * resource["pulse_dir"]
-            if resource["pulse"] >= 1.0:
-                resource["pulse"] = 1.0
-                resource["pulse_dir"] = -1
-            elif resource["pulse"] <= 0.0:
-                resource["pulse"] = 0.0
-                resource["pulse_dir"] = 1
+        # Update resource pulse animations (in bigger, rarer steps at lower
+        # quality; not at all at the lowest)
+        interval = self.quality.level.pulse_interval
+        if interval:
+            self.pulse_frames += 1
+            if self.pulse_frames >= interval:
+                self.pulse_frames = 0
+                pulse_system(self.entities, step=0.05 * interval)
         
         # Check collection
         self.check_resource_collection()
         
         # Spawn new resources if needed
         min_resources = 5 + self.wave_number // 2  # Scale with wave number
-        if len(self.resources) < min_resources:
-            self.spawn_resources(min_resources - len(self.resources))
+        resource_count = self.entities.count("resource")
+        if resource_count < min_resources:
+            self.spawn_resources(min_resources - resource_count)
 
     def update_projectiles(self, dt):
-        """Update all projectiles."""
-        # No implementation needed - handled in player.animate()
-        pass
+        """Move projectiles, cull those off screen and resolve enemy hits."""
+        movement_system(self.entities, dt)
+        cull_system(self.entities, self.screen.get_rect(), "projectile")
+        
+        # Check collisions with enemies
+        projectiles = self.entities.archetypes["projectile"]
+        columns = projectiles.columns
+        for row in range(len(projectiles) - 1, -1, -1):
+            projectile_rect = pygame.Rect(columns["x"][row], columns["y"][row],
+                                          columns["width"][row], columns["height"][row])
+            for enemy in self.enemies:
+                if enemy.collides_with(projectile_rect):
+                    # Remove projectile
+                    self.entities.despawn_row(projectiles, row)
+                    break
 
     def update_wave_spawning(self, dt):
         """Handle enemy wave spawning."""
@@ -894,30 +1220,45 @@ class Game:
             self.start_new_wave()
             return
         
-        # If still spawning enemies for current wave
+        # Queued enemies arrive as far as the simulation load allows; the
+        # rest of the spawning budget pre-builds the remainder of this wave
+        # and all of the next
+        spawner = self.wave_spawner
+        count, weight = self.load.admit(spawner.arrivals, len(self.enemies),
+                                        self.entities.count("projectile"))
+        spawner.update(self.enemies_to_spawn + self.wave_plan(self.wave_number + 1).total,
+                       limit=count, weight=weight)
+        
+        # Once the wave is spawned and defeated, pause 3 seconds before the next
+        if (self.wave_timer is None and self.enemies_to_spawn <= 0 and not spawner.arrivals
+                and not self.enemies):
+            self.wave_timer = self.clock.after(3.0, self.wave_timer_due)
+
+    def wave_plan(self, number):
+        """The spawn plan of a wave: enemy count from wave and difficulty."""
+        base_enemies = 3 + number
+        difficulty_mult = self.balance["difficulty_multipliers"]
+        difficulty_factor = difficulty_mult.get(self.difficulty, 1.0)
+        return WavePlan(number, int(base_enemies * difficulty_factor))
+
+    def wave_timer_due(self):
+        """Wave timer callback: send in the next enemy of the wave (one per
+        interval), or start the next wave after a wave break."""
+        self.wave_timer = None
         if self.enemies_to_spawn > 0:
-            self.spawn_timer += dt
-            if self.spawn_timer >= 1.0:  # Spawn every second
-                self.spawn_timer = 0
-                self.spawn_wave_enemy()
-        # If all enemies are defeated, start new wave
-        elif len(self.enemies) == 0:
-            self.next_wave_timer += dt
-            if self.next_wave_timer >= 3.0:  # 3 second pause between waves
-                self.next_wave_timer = 0
-                self.start_new_wave()
+            self.enemies_to_spawn -= 1
+            self.wave_spawner.arrive()
+            if self.enemies_to_spawn > 0:
+                interval = self.wave_plan(self.wave_number).interval
+                self.wave_timer = self.clock.after(interval, self.wave_timer_due)
+        else:
+            self.start_new_wave()
 
     def start_new_wave(self):
         """Start a new enemy wave."""
         self.wave_number += 1
-        
-        # Calculate enemies based on wave and difficulty
-        base_enemies = 3 + self.wave_number
-        difficulty_mult = {"Easy": 0.7, "Normal": 1.0, "Hard": 2.0}
-        difficulty_factor = difficulty_mult.get(self.settings["difficulty"], 1.0)
-        
-        self.enemies_to_spawn = int(base_enemies * difficulty_factor)
-        self.spawn_timer = 0
+        plan = self.wave_plan(self.wave_number)
+        self.enemies_to_spawn = plan.total
         
         # Show wave notification
         self.add_effect("text", WIDTH // 2, HEIGHT // 2, 
@@ -932,101 +1273,102 @@ class Game:
         # Start screen shake
         self.start_screen_shake(20, 0.5)
         
-        # Spawn initial enemies immediately
-        initial_spawn = min(3, self.enemies_to_spawn)
-        for _ in range(initial_spawn):
-            self.spawn_wave_enemy()
-            self.enemies_to_spawn -= 1
-
-    def spawn_wave_enemy(self):
-        """Spawn a single enemy for the current wave."""
-        if self.enemies_to_spawn <= 0:
-            return
+        # The first few arrive right away (activated from the pre-built pool)
+        self.enemies_to_spawn -= plan.initial
+        self.wave_spawner.arrive(plan.initial)
         
+        # The rest arrive one per interval
+        self.clock.cancel(self.wave_timer)
+        self.wave_timer = None
+        if self.enemies_to_spawn > 0:
+            self.wave_timer = self.clock.after(plan.interval, self.wave_timer_due)
+
+    def build_enemy(self):
+        """Construct an inactive enemy for the wave spawner's pool."""
+        enemy = Enemy(self.enemy_sprite_sheet, 0, 0, clock=self.clock)
+        enemy.active = False
+        return enemy
+
+    def spawn_wave_enemy(self, enemy, weight=1):
+        """Bring a pre-built enemy into the current wave, as an elite standing
+        for ``weight`` enemies if more than one."""
         # Always spawn at screen edge
-        side = random.randint(0, 3)  # 0: top, 1: right, 2: bottom, 3: left
+        side = self.rng.randint(0, 3)  # 0: top, 1: right, 2: bottom, 3: left
         if side == 0:  # Top
-            x = random.randint(50, WIDTH - 50)
+            x = self.rng.randint(50, WIDTH - 50)
             y = -50
         elif side == 1:  # Right
             x = WIDTH + 50
-            y = random.randint(50, HEIGHT - 50)
+            y = self.rng.randint(50, HEIGHT - 50)
         elif side == 2:  # Bottom
-            x = random.randint(50, WIDTH - 50)
+            x = self.rng.randint(50, WIDTH - 50)
             y = HEIGHT + 50
         else:  # Left
             x = -50
-            y = random.randint(50, HEIGHT - 50)
+            y = self.rng.randint(50, HEIGHT - 50)
         
-        # Create enemy
-        enemy = Enemy(self.enemy_sprite_sheet, x, y)
+        enemy.x = enemy.last_x = x
+        enemy.y = enemy.last_y = y
         enemy.active = True
         
         # Scale stats based on wave
-        wave_factor = 1.0 + (self.wave_number - 1) * 0.1
+        wave_factor = 1.0 + (self.wave_number - 1) * self.balance["wave_factor"]
         enemy.health = int(50 * wave_factor)
         enemy.max_health = enemy.health
-        enemy.speed = int(2 * (1 + (self.wave_number - 1) * 0.05))
+        enemy.speed = int(2 * (1 + (self.wave_number - 1) * self.balance["wave_speed_factor"]))
+        if weight > 1:
+            enemy.weight = weight
+            enemy.health *= weight
+            enemy.max_health = enemy.health
+            enemy.damage *= weight
+            self.load.merged_arrival(weight)
         
         self.enemies.append(enemy)
-        self.enemies_to_spawn -= 1
 
     def spawn_resources(self, count):
         """Spawn resources in the world."""
-        resource_types = ["code_fragments", "energy_cores", "data_shards"]
-        weights = [0.5, 0.3, 0.2]  # Rarity weights
+        resource_types = list(RESOURCE_TYPES)
+        weights = self.balance["resource_weights"]  # Rarity weights
+        player_pos = (self.player.x, self.player.y) if self.player else None
         
         for _ in range(count):
-            # Determine position
-            x = random.randint(100, WIDTH - 100)
-            y = random.randint(100, HEIGHT - 100)
-            
-            # Ensure not too close to player
-            if self.player:
-                while ((x - self.player.x) ** 2 + (y - self.player.y) ** 2) < 150**2:
-                    x = random.randint(100, WIDTH - 100)
-                    y = random.randint(100, HEIGHT - 100)
+            # A free spot on reachable ground, outside the player's safe zone
+            spot = self.spawn_placer.sample(player_pos, occupied=self.pickup_near)
+            if spot is None:
+                break  # Crowded; update_resources tops up later
+            x, y = spot
             
             # Select resource type
-            resource_type = random.choices(resource_types, weights=weights, k=1)[0]
+            resource_type = self.rng.choices(resource_types, weights=weights, k=1)[0]
             
             # Create resource
-            self.resources.append({
-                "type": resource_type,
-                "x": x,
-                "y": y,
-                "collected": False,
-                "pulse": 0,
-                "pulse_dir": 1,
-                "value": 1 if resource_type == "code_fragments" else 
-                         2 if resource_type == "energy_cores" else
-                         5 if resource_type == "data_shards" else 10
-            })
+            self.create_resource(resource_type, x, y)
 
     def spawn_resource_at(self, x, y):
         """Spawn a resource at a specific location."""
-        resource_types = ["code_fragments", "energy_cores", "data_shards"]
-        weights = [0.6, 0.3, 0.1]  # Adjusted weights to match number of resource types
+        resource_types = list(RESOURCE_TYPES)
+        weights = self.balance["drop_weights"]
         
-        # Random offset
-        x += random.randint(-10, 10)
-        y += random.randint(-10, 10)
+        # Random offset, kept on reachable ground (enemies walk over blocks)
+        x += self.rng.randint(-10, 10)
+        y += self.rng.randint(-10, 10)
+        x, y = self.spawn_placer.snap(x, y)
         
         # Select resource type
-        resource_type = random.choices(resource_types, weights=weights, k=1)[0]
+        resource_type = self.rng.choices(resource_types, weights=weights, k=1)[0]
         
         # Create resource
-        self.resources.append({
-            "type": resource_type,
-            "x": x,
-            "y": y,
-            "collected": False,
-            "pulse": 0,
-            "pulse_dir": 1,
-            "value": 1 if resource_type == "code_fragments" else 
-                     2 if resource_type == "energy_cores" else
-                     5 if resource_type == "data_shards" else 10
-        })
+        self.create_resource(resource_type, x, y)
+
+    def create_resource(self, resource_type, x, y):
+        """Add a resource entity to the entity store."""
+        return self.entities.spawn("resource",
+                                   x=x,
+                                   y=y,
+                                   sprite=RESOURCE_TYPES.index(resource_type),
+                                   pulse=0,
+                                   pulse_dir=1,
+                                   value=RESOURCE_VALUES.get(resource_type, 10))
 
     def check_resource_collection(self):
         """Check if player has collected resources."""
@@ -1036,41 +1378,45 @@ class Game:
         # Collection radius
         collection_radius = TILE_SIZE * 1.5
         
-        # Check each resource
-        for resource in self.resources:
-            if not resource["collected"]:
-                # Calculate distance
-                dist = ((self.player.x - resource["x"]) ** 2 + 
-                       (self.player.y - resource["y"]) ** 2) ** 0.5
-                
-                if dist < collection_radius:
-                    # Mark as collected
-                    resource["collected"] = True
-                    
-                    # Update player stats
-                    if resource["type"] == "code_fragments":
-                        self.player.energy = min(self.player.max_energy, 
-                                                self.player.energy + resource["value"])
-                    
-                    # Update player inventory
-                    if not hasattr(self.player, "inventory"):
-                        self.player.inventory = {}
-                    if resource["type"] not in self.player.inventory:
-                        self.player.inventory[resource["type"]] = 0
-                    self.player.inventory[resource["type"]] += resource["value"]
-                    
-                    # Update score
-                    self.score += resource["value"] * 10
-                    
-                    # Play sound
-                    self.play_sound("collect")
-                    
-                    # Add effect
-                    self.add_effect("text", resource["x"], resource["y"] - 20, 
-                                    text=f"+{resource['value']}", 
-                                    color=WHITE, 
-                                    size=16, 
-                                    duration=1.0)
+        # Check resources within reach, from the proximity grid
+        store = self.entities
+        resources = store.archetypes["resource"]
+        columns = resources.columns
+        for entity_id in self.proximity.query_radius(self.player.x, self.player.y, collection_radius):
+            archetype, row = store.locations[entity_id]
+            if archetype is not resources:
+                continue
+            resource_type = RESOURCE_TYPES[columns["sprite"][row]]
+            value = columns["value"][row]
+            x, y = columns["x"][row], columns["y"][row]
+            
+            # Remove the collected resource
+            store.despawn(entity_id)
+            
+            # Update player stats
+            if resource_type == "code_fragments":
+                self.player.energy = min(self.player.max_energy, 
+                                        self.player.energy + value)
+            
+            # Update player inventory
+            if not hasattr(self.player, "inventory"):
+                self.player.inventory = {}
+            if resource_type not in self.player.inventory:
+                self.player.inventory[resource_type] = 0
+            self.player.inventory[resource_type] += value
+            
+            # Update score
+            self.score += value * 10
+            
+            # Play sound
+            self.play_sound("collect")
+            
+            # Add effect
+            self.add_effect("text", x, y - 20, 
+                            text=f"+{value}", 
+                            color=WHITE, 
+                            size=16, 
+                            duration=1.0)
 
     def update_camera_shake(self, dt):
         """Update screen shake effect."""
@@ -1096,6 +1442,12 @@ class Game:
             self.camera_offset_x = 0
             self.camera_offset_y = 0
 
+    def apply_quality(self):
+        """Push the quality governor's current level to what it scales."""
+        level = self.quality.level
+        GameEffects.particle_scale = level.particle_scale
+        self.menu_background.set_particle_limit(level.menu_particles)
+
     def start_screen_shake(self, amount, duration):
         """Start screen shake effect."""
         self.screen_shake_amount = amount
@@ -1103,20 +1455,20 @@ class Game:
         
     def add_effect(self, effect_type, x, y, **kwargs):
         """Add a visual effect to the game."""
+        # Explosions are plain timed entities in the entity store
+        if effect_type == "explosion":
+            self.spawn_timed("explosion", 0.5, x=x, y=y)
+            return
+        
         effect = {
             "type": effect_type,
             "x": x,
             "y": y,
-            "timer": 0
+            "born": self.clock.ms
         }
         
         # Add type-specific properties
-        if effect_type == "explosion":
-            effect["radius"] = 0
-            effect["max_radius"] = 20
-            effect["color"] = NEON_RED
-            effect["duration"] = 0.5
-        elif effect_type == "text":
+        if effect_type == "text":
             effect["text"] = kwargs.get("text", "")
             effect["color"] = kwargs.get("color", WHITE)
             effect["size"] = kwargs.get("size", 20)
@@ -1125,23 +1477,20 @@ class Game:
             effect["fade_out"] = kwargs.get("fade_out", True)
         
         self.effects_list.append(effect)
+        self.clock.after(effect.get("duration", 1.0), self.remove_effect, effect)
+
+    def remove_effect(self, effect):
+        """Effect expiry timer callback."""
+        if effect in self.effects_list:
+            self.effects_list.remove(effect)
+
+    def spawn_timed(self, archetype_name, duration, **values):
+        """Spawn an entity that despawns after ``duration`` seconds of game time."""
+        entity_id = self.entities.spawn(archetype_name, born=self.clock.ms,
+                                        duration=duration, **values)
+        self.clock.after(duration, self.entities.despawn, entity_id, name=f"expire {archetype_name}")
+        return entity_id
 
-    def update_visual_effects(self, dt):
-        """Update all visual effects."""
-        # Update each effect
-        for effect in self.effects_list[:]:
-            # Increment timer
-            effect["timer"] += dt
-            
-            # Check if expired
-            if effect["timer"] >= effect.get("duration", 1.0):
-                self.effects_list.remove(effect)
-                continue
-                
-            # Update type-specific logic
-            if effect["type"] == "explosion":
-                effect["radius"] = (effect["timer"] / effect["duration"]) * effect["max_radius"]
-            
     def draw_gameplay_elements(self):
         """Draw all gameplay elements."""
         # Create world surface
@@ -1152,79 +1501,83 @@ class Game:
         if self.world_generator:
             self.world_generator.draw_map(world_surface)
         
-        # Draw world objects
-        if self.world_generator:
-            for obj in self.world_generator.objects:
-                sprite = self.object_sprites.get(obj.type)
-                if sprite:
-                    world_surface.blit(sprite, (obj.x, obj.y))
-        
-        # Draw resources with pulse effect
-        for resource in self.resources:
-            if not resource["collected"]:
-                sprite = self.resource_sprites.get(resource["type"])
-                if sprite:
-                    # Apply pulse effect
-                    base_size = 48
-                    pulse_scale = 1.0 + resource["pulse"] * 0.2
-                    scaled_size = int(base_size * pulse_scale)
-                    
-                    # Scale the sprite
-                    scaled_sprite = pygame.transform.scale(sprite, (scaled_size, scaled_size))
-                    
-                    # Center the scaled sprite
-                    offset = (scaled_size - base_size) // 2
-                    world_surface.blit(scaled_sprite, (resource["x"] - offset, resource["y"] - offset))
-        
-        # Draw power-ups
-        for power_up in self.power_ups:
-            sprite = self.power_up_sprites.get(power_up["type"])
-            if sprite:
-                world_surface.blit(sprite, (power_up["x"], power_up["y"]))
+        # Sprites are queued per layer and drawn with one blits() per layer
+        batch = self.sprite_batch
         
-        # Draw enemies
+        # World objects never move; their blit list is built once per world
+        if self.world_generator:
+            if self.object_blits_world is not self.world_generator:
+                self.object_blits = [(self.object_sprites[obj.type], (obj.x, obj.y))
+                                     for obj in self.world_generator.objects
+                                     if self.object_sprites.get(obj.type)]
+                self.object_blits_world = self.world_generator
+            batch.layer("objects").extend(self.object_blits)
+        
+        # Resources (pre-scaled pulse frames) and power-ups
+        collect_sprites(self.entities, self.entity_sprites, batch.layer("pickups"),
+                        names=("resource", "power_up"))
+        
+        # Enemies the player can see, with a pre-rendered health bar once
+        # damaged
+        self.update_visibility()
+        in_view = self.enemy_in_view if self.visibility else None
+        enemy_sprites = batch.layer("enemies")
+        health_bars = batch.layer("health_bars")
+        show_health_bars = self.quality.level.health_bars
         for enemy in self.enemies:
-            if enemy.active and enemy.sprite:
-                # Draw enemy sprite
-                world_surface.blit(enemy.sprite, (enemy.x, enemy.y))
-                
-                # Draw health bar if damaged
-                if enemy.health < enemy.max_health:
-                    bar_width = 40
-                    health_percent = enemy.health / enemy.max_health
-                    pygame.draw.rect(world_surface, RED, 
-                                     (enemy.x + 4, enemy.y - 8, bar_width, 5))
-                    pygame.draw.rect(world_surface, GREEN, 
-                                     (enemy.x + 4, enemy.y - 8, 
-                                      int(bar_width * health_percent), 5))
-        
-        # Draw player
+            if enemy.active and enemy.sprite and (in_view is None or in_view(enemy)):
+                enemy_sprites.append((enemy.sprite, (enemy.x, enemy.y)))
+                if show_health_bars and enemy.health < enemy.max_health:
+                    health_bars.append((self.health_bars.get(enemy.health, enemy.max_health),
+                                        (enemy.x + 4, enemy.y - 8)))
+        
+        # Co-op teammates, then the player on top
+        for ally in self.allies:
+            if ally.health > 0 and ally.sprite:
+                batch.submit("players", ally.sprite, (ally.x, ally.y))
         if self.player and self.player.sprite:
-            world_surface.blit(self.player.sprite, (self.player.x, self.player.y))
+            batch.submit("players", self.player.sprite, (self.player.x, self.player.y))
+        
+        # Projectiles
+        collect_sprites(self.entities, self.entity_sprites, batch.layer("projectiles"),
+                        names=("projectile",))
+        
+        batch.flush(world_surface)
+        
+        # Draw explosions, growing with their age
+        now = self.clock.ms
+        explosions = self.entities.archetypes["explosion"]
+        columns = explosions.columns
+        for row in range(len(explosions)):
+            radius = (now - columns["born"][row]) / (columns["duration"][row] * 1000.0) * 20
+            pygame.draw.circle(
+                world_surface, 
+                NEON_RED, 
+                (columns["x"][row], columns["y"][row]), 
+                int(radius)
+            )
         
-        # Draw projectiles
-        if self.player:
-            for projectile in self.player.projectiles:
-                pygame.draw.circle(
-                    world_surface, 
-                    NEON_BLUE, 
-                    (projectile["x"], projectile["y"]), 
-                    5
-                )
-        
-        # Draw effects
-        for effect in self.effects_list:
-            if effect["type"] == "explosion":
-                pygame.draw.circle(
-                    world_surface, 
-                    effect["color"], 
-                    (effect["x"], effect["y"]), 
-                    int(effect["radius"])
-                )
-            elif effect["type"] == "text":
+        # Neon lighting (off at the lowest quality level)
+        lighting = self.quality.level.lighting
+        if lighting:
+            self.collect_lights(now)
+            self.lighting.apply(world_surface, smooth=lighting > 1)
+        
+        # Power-up particles
+        self.effects.draw(world_surface)
+        
+        # Fog of war over everything the player can't see
+        if self.fog:
+            self.fog.draw(world_surface)
+        
+        # Draw effects; lower quality levels draw only the newest few
+        limit = self.quality.level.max_text_effects
+        text_effects = self.effects_list if limit is None else self.effects_list[-limit:]
+        for effect in text_effects:
+            if effect["type"] == "text":
                 # Calculate alpha based on fade
                 duration = effect.get("duration", 1.0)
-                progress = effect["timer"] / duration
+                progress = (now - effect["born"]) / (duration * 1000.0)
                 alpha = 255
                 
                 if effect.get("fade_in") and progress < 0.3:
@@ -1232,8 +1585,10 @@ class Game:
                 elif effect.get("fade_out") and progress > 0.7:
                     alpha = int(255 * (1 - (progress - 0.7) / 0.3))
                 
-                # Render text
-                font = pygame.font.Font(None, effect["size"])
+                # Render text (fonts are cached per size)
+                font = self.effect_fonts.get(effect["size"])
+                if font is None:
+                    font = self.effect_fonts[effect["size"]] = pygame.font.Font(None, effect["size"])
                 text = font.render(effect["text"], True, effect["color"])
                 text.set_alpha(alpha)
                 
@@ -1247,6 +1602,34 @@ class Game:
         # Draw UI elements on top of the world
         self.draw_gameplay_ui()
 
+    def collect_lights(self, now):
+        """Queue this frame's light sources: players, projectiles, explosions
+        and pickups."""
+        add_light = self.lighting.add
+        for player in [self.player, *self.allies]:
+            if player and player.health > 0:
+                add_light(player.x + player.width / 2, player.y + player.height / 2, 160, PLAYER_LIGHT)
+        
+        archetypes = self.entities.archetypes
+        columns = archetypes["projectile"].columns
+        for x, y in zip(columns["x"], columns["y"]):
+            add_light(x, y, 48, NEON_BLUE)
+        
+        # Explosions flare up and fade as they grow
+        columns = archetypes["explosion"].columns
+        for x, y, born, duration in zip(columns["x"], columns["y"], columns["born"], columns["duration"]):
+            progress = (now - born) / (duration * 1000.0)
+            add_light(x, y, 60 + 80 * progress, NEON_RED, 1.0 - progress)
+        
+        # Resources glow with their pulse
+        columns = archetypes["resource"].columns
+        for x, y, sprite, pulse in zip(columns["x"], columns["y"], columns["sprite"], columns["pulse"]):
+            add_light(x + 24, y + 24, 64, RESOURCE_LIGHTS[sprite], 0.6 + 0.4 * pulse)
+        
+        columns = archetypes["power_up"].columns
+        for x, y, sprite in zip(columns["x"], columns["y"], columns["sprite"]):
+            add_light(x + TILE_SIZE / 2, y + TILE_SIZE / 2, 64, POWER_UP_LIGHTS[sprite])
+
     def draw_gameplay_ui(self):
         """Draw the gameplay UI elements."""
         if not self.player:
@@ -1379,70 +1762,74 @@ class Game:
         
         # Draw FPS in top right if enabled
         if self.settings.get("show_fps", True):
-            fps = int(self.clock.get_fps())
+            fps = int(self.frame_clock.get_fps())
             fps_text = self.font_sm.render(f"FPS: {fps}", True, WHITE)
             self.screen.blit(fps_text, (WIDTH - fps_text.get_width() - 10, 110))
+        
+        # Minimap below the status texts
+        if self.minimap:
+            self.minimap.draw(self.screen, (WIDTH - self.minimap.size[0] - 10, 135))
+        
+        # Debug overlay (F3)
+        if self.debug_mode:
+            self.draw_debug_overlay()
+
+    def draw_debug_overlay(self):
+        """Draw quality level, timer queue, AI scheduler, wave spawner,
+        simulation load and field of view internals below the status bars."""
+        timers = self.clock.timers
+        ai = self.ai_scheduler
+        spawner = self.wave_spawner
+        quality = self.quality
+        load = self.load
+        room = load.room(len(self.enemies), self.entities.count("projectile"))
+        lines = [
+            f"Quality: {quality.level.name} ({quality.average * 1000:.1f} ms of "
+            f"{quality.budget * 1000:.1f} ms, {quality.changes} changes), "
+            f"{self.lighting.drawn} lights",
+            f"Clock: {self.clock.ms / 1000:.2f}s",
+            f"Timers: {len(timers)} pending, {timers.fired} fired ({timers.fired_total} total)",
+            f"AI: {ai.updated} updated, {ai.deferred} deferred, {ai.elapsed * 1000:.2f} ms",
+            f"Spawns: {len(spawner.pool)} pooled, {spawner.arrivals} queued, {spawner.cold} cold, "
+            f"{spawner.mean_build_time() * 1e6:.0f} us/build, "
+            f"{spawner.frame_time * 1e6:.0f} us (peak {spawner.peak_frame_time * 1e6:.0f})",
+            f"Load: {load.costs.get('enemy', 0.0) * 1e6:.1f} us/enemy, "
+            f"{load.costs.get('projectile', 0.0) * 1e6:.1f} us/projectile, "
+            f"room {'-' if room is None else room}, throttled {load.throttled}/{load.pending_ticks} ticks, "
+            f"{load.elites} elites ({load.merged} merged)",
+            f"Enemies: {len(self.enemies)}  Entities: {self.entities.count()}",
+        ]
+        if self.visibility:
+            lines.append(f"Sight: {len(self.visibility.cells)} tiles visible, "
+                         f"{self.visibility.recomputes} recomputes, {self.fog.painted} fog tiles repainted")
+        if self.minimap:
+            lines.append(f"Minimap: {self.minimap.dot_count} dots, {self.minimap.refreshes} refreshes")
+        for timer in timers.pending(5):
+            lines.append(f"  {timer.name} in {(timer.due - self.clock.ms) / 1000:.2f}s")
+        
+        y = 70
+        texts = [self.font_sm.render(line, True, YELLOW) for line in lines]
+        width = max(text.get_width() for text in texts)
+        backing = pygame.Surface((width + 8, len(texts) * 18 + 8), pygame.SRCALPHA)
+        backing.fill((0, 0, 0, 160))
+        self.screen.blit(backing, (6, y - 4))
+        for text in texts:
+            self.screen.blit(text, (10, y))
+            y += 18
 
     def handle_player_defeat(self):
         """Handle player defeat logic."""
         # Play game over sound
         self.play_sound("game_over")
         
-        # Create explosion particle effect
-        for _ in range(30):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(2, 5)
-            self.effects_list.append({
-                "type": "particle",
-                "position": (self.player.x + self.player.width // 2, 
-                           self.player.y + self.player.height // 2) if self.player else (0, 0),
-                "velocity": (math.cos(angle) * speed, math.sin(angle) * speed),
-                "color": (255, 100, 50),
-                "size": random.uniform(2, 6),
-                "duration": random.randint(30, 60),
-                "timer": 0
-            })
-        
-        # Add game over text
-        self.effects_list.append({
-            "type": "text",
-            "text": "GAME OVER",
-            "position": (WIDTH // 2, HEIGHT // 2),
-            "color": (255, 0, 0),
-            "size": 80,
-            "duration": 180,
-            "timer": 0,
-            "fade_in": True
-        })
-        
-        # Add score text
-        self.effects_list.append({
-            "type": "text",
-            "text": f"SCORE: {self.score}",
-            "position": (WIDTH // 2, HEIGHT // 2 + 80),
-            "color": (255, 255, 255),
-            "size": 40,
-            "duration": 180,
-            "timer": 0,
-            "fade_in": True
-        })
-        
-        # Return to menu after delay
-        self.player = None  # Remove player to prevent further updates
-        pygame.time.set_timer(pygame.USEREVENT, 3000)  # 3 second timer
-        
-        # Set up one-time event handler
-        def handle_game_over_event(event):
-            if event.type == pygame.USEREVENT:
-                pygame.time.set_timer(pygame.USEREVENT, 0)  # Disable timer
-                pygame.event.set_allowed(None)  # Reset event filtering
-                self.transition_to("menu")
-                return True
-            return False
+        # Record the run; the insert happens off the frame path
+        if self.leaderboard is not None:
+            self.leaderboard.submit(self.score, self.survival_time, self.difficulty,
+                                    wave=self.wave_number)
         
-        # Add event handler
-        pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.USEREVENT])  # Filter events
-
+        # Remove player to prevent further updates, then show the game over screen
+        self.player = None
+        self.transition_to("game_over")
 
     def update_transition(self, dt):
         """Update the screen transition effect."""
@@ -1465,71 +1852,32 @@ class Game:
             self.screen.blit(overlay, (0, 0))
 
     def draw_pause_menu(self):
-        """Draw the pause menu."""
+        """Draw the pause menu: the cached frozen frame plus the button tree."""
+        self.pause_layer.draw(self.screen)
+        
+        self.pause_ui.update(pygame.mouse.get_pos())
+        self.pause_ui.draw(self.screen)
+
+    def build_pause_layer(self):
+        """Compose the last gameplay frame, dimmed, with the pause title."""
+        if self.pause_snapshot is not None:
+            layer = self.pause_snapshot.copy()
+        else:
+            layer = pygame.Surface((WIDTH, HEIGHT))
+            layer.fill(BG_COLOR)
+        
         # Draw semi-transparent overlay
         overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 150))
-        self.screen.blit(overlay, (0, 0))
+        overlay.fill((0, 0, 0, 180))  # Semi-transparent black
+        layer.blit(overlay, (0, 0))
         
         # Draw pause title
-        title = title_font.render("PAUSED", True, NEON_BLUE)
-        self.screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 150))
-        
-        # Draw continue button
-        continue_btn = Button("CONTINUE", WIDTH // 2 - 100, 250, 200, 50, self.toggle_pause)
-        continue_btn.draw(self.screen, button_font)
-        
-        # Draw settings button
-        settings_btn = Button("SETTINGS", WIDTH // 2 - 100, 320, 200, 50, 
-                             lambda: self.transition_to("settings"))
-        settings_btn.draw(self.screen, button_font)
-        
-        # Draw quit button
-        quit_btn = Button("QUIT TO MENU", WIDTH // 2 - 100, 390, 200, 50, 
-                         lambda: self.transition_to("menu"))
-        quit_btn.draw(self.screen, button_font)
-        
-        # Draw controls info
-        controls_text = [
-            "CONTROLS:",
-            "Arrow Keys - Move",
-            "SPACE - Melee Attack",
-            "F - Ranged Attack",
-            "ESC - Pause/Menu",
-            "E - Use Tool",
-            "C - Craft"
-        ]
-        
-        for i, text in enumerate(controls_text):
-            info = info_font.render(text, True, (200, 200, 200))
-            self.screen.blit(info, (WIDTH // 2 - 250, 250 + i * 30))
-
-    def handle_pause_events(self, events):
-        """Handle events in the pause menu."""
-        for event in events:
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                self.toggle_pause()
-                return
-        
-        # Find and handle button clicks (simplified)
-        for event in events:
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
-                
-                # Continue button
-                if pygame.Rect(WIDTH // 2 - 100, 250, 200, 50).collidepoint(mouse_pos):
-                    self.toggle_pause()
-                
-                # Settings button
-                elif pygame.Rect(WIDTH // 2 - 100, 320, 200, 50).collidepoint(mouse_pos):
-                    self.transition_to("settings")
-                
-                # Quit button
-                elif pygame.Rect(WIDTH // 2 - 100, 390, 200, 50).collidepoint(mouse_pos):
-                    self.transition_to("menu")
+        title_text = self.font_lg.render("PAUSED", True, NEON_BLUE)
+        layer.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, 150))
+        return layer
 
-    def draw_leaderboard(self):
-        """Draw a fancy leaderboard screen."""
+    def build_backdrop(self, title_text):
+        """Render the grid backdrop and glowing title shared by menu screens."""
         # Draw a dark background with grid pattern
         background = pygame.Surface((WIDTH, HEIGHT))
         background.fill((5, 10, 20))  # Dark blue
@@ -1556,10 +1904,8 @@ class Game:
             color = (0, 100, 255, int(100 * (1 - abs(x - WIDTH/2) / (WIDTH/2))))
             pygame.draw.line(background, color, (x, 0), (x, HEIGHT))
         
-        self.screen.blit(background, (0, 0))
-        
-        # Draw leaderboard title with glow effect
-        title = title_font.render("LEADERBOARD", True, NEON_BLUE)
+        # Draw title with glow effect
+        title = self.title_font.render(title_text, True, NEON_BLUE)
         
         # Add glow
         glow_surf = pygame.Surface((title.get_width() + 20, title.get_height() + 20), pygame.SRCALPHA)
@@ -1569,9 +1915,23 @@ class Game:
             pygame.draw.rect(glow_surf, (*NEON_BLUE, alpha), 
                            (10-i, 10-i, title.get_width()+size, title.get_height()+size), 
                            border_radius=10)
-        self.screen.blit(glow_surf, (WIDTH // 2 - (title.get_width() + 20) // 2, 30))
+        background.blit(glow_surf, (WIDTH // 2 - (title.get_width() + 20) // 2, 30))
         
-        self.screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 50))
+        background.blit(title, (WIDTH // 2 - title.get_width() // 2, 50))
+        
+        return background
+
+    def draw_leaderboard(self):
+        """Draw the leaderboard screen: one cached layer plus the back button."""
+        # The layer only changes when a run is recorded or another board is picked
+        key = (self.leaderboard.version, self.leaderboard.last_run_id,
+               self.leaderboard_by, self.leaderboard_difficulty)
+        self.leaderboard_layer.draw(self.screen, key)
+        self.leaderboard_ui.draw(self.screen)
+
+    def build_leaderboard_layer(self):
+        """Compose everything on the leaderboard screen except the back button."""
+        layer = self.build_backdrop("LEADERBOARD")
         
         # Draw table headers with cyberpunk style
         headers = ["RANK", "PLAYER", "SCORE", "TIME"]
@@ -1580,56 +1940,40 @@ class Game:
         header_bg = pygame.Surface((WIDTH - 160, 40))
         header_bg.fill((0, 50, 100))
         header_bg.set_alpha(200)
-        self.screen.blit(header_bg, (80, 120))
+        layer.blit(header_bg, (80, 120))
         
         for i, header in enumerate(headers):
-            header_text = button_font.render(header, True, (150, 200, 255))
-            self.screen.blit(header_text, (header_positions[i], 125))
+            header_text = self.button_font.render(header, True, (150, 200, 255))
+            layer.blit(header_text, (header_positions[i], 125))
         
         # Draw glowing horizontal separator
-        pygame.draw.rect(self.screen, NEON_BLUE, (60, 170, WIDTH - 120, 3))
+        pygame.draw.rect(layer, NEON_BLUE, (60, 170, WIDTH - 120, 3))
         glow_surf = pygame.Surface((WIDTH - 100, 13), pygame.SRCALPHA)
         pygame.draw.rect(glow_surf, (*NEON_BLUE, 50), (0, 0, WIDTH - 100, 13))
-        self.screen.blit(glow_surf, (50, 165))
-        
-        # Draw placeholder leaderboard entries with enhanced visuals
-        entries = [
-            {"name": "ByteMaster", "score": 10000, "time": 1800},
-            {"name": "CodeBreaker", "score": 8500, "time": 1500},
-            {"name": "CyberSlice", "score": 7200, "time": 1200},
-            {"name": "DataRunner", "score": 6800, "time": 1100},
-            {"name": "EncryptionKey", "score": 5500, "time": 900},
-            {"name": "FirewallHacker", "score": 4200, "time": 800},
-            {"name": "GlitchHunter", "score": 3600, "time": 700},
-            {"name": "HexHacker", "score": 2800, "time": 600},
-            {"name": "InfoSec", "score": 2000, "time": 500},
-            {"name": "JavaScripter", "score": 1500, "time": 400}
-        ]
+        layer.blit(glow_surf, (50, 165))
         
-        # Add the player's score if they've played
-        if hasattr(self, 'score') and self.score > 0:
-            player_entry = {"name": "YOU", "score": self.score, "time": int(self.survival_time)}
-            
-            # Insert at correct position
-            inserted = False
-            for i, entry in enumerate(entries):
-                if player_entry["score"] > entry["score"]:
-                    entries.insert(i, player_entry)
-                    inserted = True
-                    break
-            
-            if not inserted and len(entries) < 10:
-                entries.append(player_entry)
-            
-            # Keep only top 10
-            entries = entries[:10]
+        # Draw which board is showing
+        board_name = (self.leaderboard_difficulty or "All").upper()
+        board_text = self.info_font.render(
+            f"< {board_name} >   BY {self.leaderboard_by.upper()}   (TAB to sort)", True, (150, 200, 255))
+        layer.blit(board_text, (WIDTH // 2 - board_text.get_width() // 2, 95))
+        
+        # Top 10 from the local leaderboard (cached until the next run is recorded)
+        entries = self.leaderboard.top(self.leaderboard_by, self.leaderboard_difficulty, 10)
+        if not entries:
+            empty_text = self.info_font.render("No runs recorded yet", True, (200, 200, 255))
+            layer.blit(empty_text, (WIDTH // 2 - empty_text.get_width() // 2, 200))
         
         # Draw entries with alternating row backgrounds
         for i, entry in enumerate(entries):
-            y_pos = 180 + i * 40
+            y_pos = 180 + i * 32
+            
+            # The most recent run from this session is shown as "YOU"
+            if entry["id"] == self.leaderboard.last_run_id:
+                entry = dict(entry, name="YOU")
             
             # Row background with alternating colors
-            row_bg = pygame.Surface((WIDTH - 160, 40))
+            row_bg = pygame.Surface((WIDTH - 160, 32))
             if entry.get("name") == "YOU":
                 row_bg.fill((50, 0, 100))  # Highlight player's score
             elif i % 2 == 0:
@@ -1637,69 +1981,42 @@ class Game:
             else:
                 row_bg.fill((20, 20, 40))
             row_bg.set_alpha(200)
-            self.screen.blit(row_bg, (80, y_pos))
+            layer.blit(row_bg, (80, y_pos))
             
             # Draw rank with medal for top 3
             if i < 3:
                 medal_colors = [(255, 215, 0), (192, 192, 192), (205, 127, 50)]  # Gold, Silver, Bronze
-                pygame.draw.circle(self.screen, medal_colors[i], (80, y_pos + 20), 15)
-                rank_text = info_font.render(str(i+1), True, (0, 0, 0))
-                self.screen.blit(rank_text, (80 - rank_text.get_width()//2, y_pos + 20 - rank_text.get_height()//2))
+                pygame.draw.circle(layer, medal_colors[i], (80, y_pos + 16), 14)
+                rank_text = self.info_font.render(str(i+1), True, (0, 0, 0))
+                layer.blit(rank_text, (80 - rank_text.get_width()//2, y_pos + 16 - rank_text.get_height()//2))
             else:
-                rank_text = info_font.render(f"{i+1}", True, (255, 255, 255))
-                self.screen.blit(rank_text, (80 - rank_text.get_width()//2, y_pos + 20 - rank_text.get_height()//2))
+                rank_text = self.info_font.render(f"{i+1}", True, (255, 255, 255))
+                layer.blit(rank_text, (80 - rank_text.get_width()//2, y_pos + 16 - rank_text.get_height()//2))
             
             # Draw player name
-            name_text = info_font.render(entry.get("name", "Unknown"), True, 
+            name_text = self.info_font.render(entry.get("name", "Unknown"), True, 
                                        (255, 255, 0) if entry.get("name") == "YOU" else (255, 255, 255))
-            self.screen.blit(name_text, (180, y_pos + 12))
+            layer.blit(name_text, (180, y_pos + 6))
             
             # Draw score with formatting
-            score_text = info_font.render(f"{entry.get('score', 0):,}", True, (255, 255, 255))
-            self.screen.blit(score_text, (480, y_pos + 12))
+            score_text = self.info_font.render(f"{entry.get('score', 0):,}", True, (255, 255, 255))
+            layer.blit(score_text, (480, y_pos + 6))
             
             # Draw time with formatting
             minutes = entry.get('time', 0) // 60
             seconds = entry.get('time', 0) % 60
-            time_text = info_font.render(f"{minutes}m {seconds}s", True, (255, 255, 255))
-            self.screen.blit(time_text, (600, y_pos + 12))
-        
-        # Draw back button
-        back_btn = Button("BACK", WIDTH // 2 - 75, HEIGHT - 80, 150, 40, 
-                         lambda: self.transition_to("menu"))
-        back_btn.draw(self.screen, button_font)
+            time_text = self.info_font.render(f"{minutes}m {seconds}s", True, (255, 255, 255))
+            layer.blit(time_text, (600, y_pos + 6))
         
         # Draw instructions
-        instructions = info_font.render("Press ESC to return to menu", True, (200, 200, 255))
-        self.screen.blit(instructions, (WIDTH // 2 - instructions.get_width() // 2, HEIGHT - 30))
-
-    def draw_settings(self):
-        """Draw the settings screen."""
-        # Draw a dark background with tech pattern
-        background = pygame.Surface((WIDTH, HEIGHT))
-        background.fill((5, 10, 20))  # Dark blue
-        
-        # Add grid lines with perspective effect
-        vanishing_point_x = WIDTH // 2
-        vanishing_point_y = -100
-        
-        # Draw horizontal grid lines with perspective
-        for y in range(0, HEIGHT + 100, 40):
-            start_x_left = 0
-            start_x_right = WIDTH
-            end_x_left = (0 - vanishing_point_x) * (HEIGHT - y) / (HEIGHT - vanishing_point_y) + vanishing_point_x
-            end_x_right = (WIDTH - vanishing_point_x) * (HEIGHT - y) / (HEIGHT - vanishing_point_y) + vanishing_point_x
-            
-            # Draw only if within screen
-            if y < HEIGHT:
-                color = (0, 100, 255, int(100 * (1 - y / HEIGHT)))
-                pygame.draw.line(background, color, (start_x_left, y), (end_x_left, vanishing_point_y))
-                pygame.draw.line(background, color, (start_x_right, y), (end_x_right, vanishing_point_y))
+        instructions = self.info_font.render("Press ESC to return to menu", True, (200, 200, 255))
+        layer.blit(instructions, (WIDTH // 2 - instructions.get_width() // 2, HEIGHT - 30))
         
-        # Add vertical grid lines
-        for x in range(0, WIDTH, 80):
-            color = (0, 100, 255, int(100 * (1 - abs(x - WIDTH/2) / (WIDTH/2))))
-            pygame.draw.line(background, color, (x, 0), (x, HEIGHT))
+        return layer
+
+    def build_settings_backdrop(self):
+        """Render the settings screen backdrop with its data particles."""
+        layer = self.build_backdrop("SETTINGS")
         
         # Add floating data particles
         for _ in range(50):
@@ -1707,24 +2024,14 @@ class Game:
             y = random.randint(0, HEIGHT)
             size = random.randint(1, 3)
             color = random.choice([NEON_BLUE, NEON_GREEN, NEON_PINK, NEON_PURPLE])
-            pygame.draw.circle(background, color, (x, y), size)
-        
-        self.screen.blit(background, (0, 0))
+            pygame.draw.circle(layer, color, (x, y), size)
         
-        # Draw settings title with glow
-        title = title_font.render("SETTINGS", True, NEON_BLUE)
-        
-        # Add glow
-        glow_surf = pygame.Surface((title.get_width() + 20, title.get_height() + 20), pygame.SRCALPHA)
-        for i in range(10, 0, -1):
-            alpha = 20 - i*2
-            size = i*2
-            pygame.draw.rect(glow_surf, (*NEON_BLUE, alpha), 
-                           (10-i, 10-i, title.get_width()+size, title.get_height()+size), 
-                           border_radius=10)
-        self.screen.blit(glow_surf, (WIDTH // 2 - (title.get_width() + 20) // 2, 30))
-        
-        self.screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 50))
+        return layer
+
+    def draw_settings(self):
+        """Draw the settings screen."""
+        # Backdrop, particles and title are composed once
+        self.settings_backdrop.draw(self.screen)
         
         # Draw settings with sliders and toggles
         settings_x = WIDTH // 2 - 200
@@ -1757,14 +2064,12 @@ class Game:
                                  lambda v: self.update_setting("difficulty", v))
         
         # Draw back button
-        back_btn = Button("SAVE & RETURN", WIDTH // 2 - 125, HEIGHT - 80, 250, 50, 
-                         lambda: self.transition_to("menu"))
-        back_btn.draw(self.screen, button_font)
+        self.settings_back_button.draw(self.screen, self.button_font)
 
     def draw_setting_slider(self, label, x, y, value, on_change):
         """Draw a slider setting control."""
         # Draw label
-        label_text = info_font.render(label, True, (255, 255, 255))
+        label_text = self.info_font.render(label, True, (255, 255, 255))
         self.screen.blit(label_text, (x, y))
         
         # Draw slider track
@@ -1784,7 +2089,7 @@ class Game:
         self.screen.blit(glow_surf, (handle_pos - 10, y + 20))
         
         # Draw value percentage
-        value_text = info_font.render(f"{int(value * 100)}%", True, (200, 200, 200))
+        value_text = self.info_font.render(f"{int(value * 100)}%", True, (200, 200, 200))
         self.screen.blit(value_text, (x + 410, y + 25))
         
         # Handle interaction
@@ -1800,7 +2105,7 @@ class Game:
     def draw_setting_toggle(self, label, x, y, value, on_toggle):
         """Draw a toggle setting control."""
         # Draw label
-        label_text = info_font.render(label, True, (255, 255, 255))
+        label_text = self.info_font.render(label, True, (255, 255, 255))
         self.screen.blit(label_text, (x, y))
         
         # Draw toggle background
@@ -1832,7 +2137,7 @@ class Game:
     def draw_setting_dropdown(self, label, x, y, value, options, on_change):
         """Draw a dropdown setting control."""
         # Draw label
-        label_text = info_font.render(label, True, (255, 255, 255))
+        label_text = self.info_font.render(label, True, (255, 255, 255))
         self.screen.blit(label_text, (x, y))
         
         # Draw current value
@@ -1840,7 +2145,7 @@ class Game:
         pygame.draw.rect(self.screen, (40, 40, 60), value_bg)
         pygame.draw.rect(self.screen, (100, 100, 150), value_bg, 1)
         
-        value_text = info_font.render(value, True, (255, 255, 255))
+        value_text = self.info_font.render(value, True, (255, 255, 255))
         self.screen.blit(value_text, (x + 310, y + 5))
         
         # Draw dropdown arrow
@@ -1879,7 +2184,7 @@ class Game:
                 pygame.draw.rect(dropdown, (90, 90, 120), option_rect)
             
             # Draw option text
-            option_text = info_font.render(option, True, (255, 255, 255))
+            option_text = self.info_font.render(option, True, (255, 255, 255))
             dropdown.blit(option_text, (10, i * option_height + 5))
         
         # Draw border
@@ -1994,19 +2299,30 @@ class Game:
                     running = False
             
             # Handle game state
+            frame_started = time.perf_counter()
             self.handle_state(events, dt)
             
+            # Step visual quality by how much of the frame the work took
+            if self.quality.record(time.perf_counter() - frame_started):
+                self.apply_quality()
+            
             # Update display
             pygame.display.flip()
+            self.record_startup_metrics()
             
             # Cap the frame rate
-            self.clock.tick(self.FPS)
+            self.frame_clock.tick(self.FPS)
         
         # Clean up and quit
+        self.settings.close()
         pygame.quit()
 
     def handle_state(self, events, dt):
         """Handle the current game state."""
+        # Finish any assets the background loader has decoded
+        if not self.assets_ready:
+            self.assets_ready = self.asset_loader.finish()
+        
         # Handle state transitions
         if self.fading_out or self.fading_in:
             self.handle_transition()
@@ -2021,194 +2337,156 @@ class Game:
             self.handle_pause(events, dt)
         elif self.current_state == "settings":
             self.handle_settings(events, dt)
+        elif self.current_state == "leaderboard":
+            self.handle_leaderboard(events, dt)
         elif self.current_state == "game_over":
             self.handle_game_over(events, dt)
+        elif self.current_state == "loading":
+            self.handle_loading(events, dt)
 
-    def handle_menu(self, events, dt):
-        """Handle the menu state."""
-        # Draw menu background
+    def handle_loading(self, events, dt):
+        """Show loading progress until the background loader is done."""
         self.draw_menu_background(dt)
         
-        # Draw game title
-        title_text = self.font_xl.render("CODEBREAK", True, NEON_BLUE)
-        title_shadow = self.font_xl.render("CODEBREAK", True, NEON_PINK)
-        shadow_pos = (WIDTH // 2 - title_shadow.get_width() // 2 + 3, 
-                     100 + 3)
-        title_pos = (WIDTH // 2 - title_text.get_width() // 2, 100)
-        self.screen.blit(title_shadow, shadow_pos)
+        # Draw loading title
+        title_text = self.font_lg.render("LOADING", True, NEON_BLUE)
+        title_pos = (WIDTH // 2 - title_text.get_width() // 2, HEIGHT // 2 - 60)
         self.screen.blit(title_text, title_pos)
         
-        # Draw subtitle
-        subtitle = self.font_md.render("CYBER SURVIVAL", True, WHITE)
-        subtitle_pos = (WIDTH // 2 - subtitle.get_width() // 2, 160)
-        self.screen.blit(subtitle, subtitle_pos)
+        self.draw_loading_bar(WIDTH // 2 - 150, HEIGHT // 2, 300, 16)
+        
+        # Start the game as soon as everything is ready
+        if self.assets_ready:
+            self.initialize_game_world()
+            self.current_state = "gameplay"
+
+    def draw_loading_bar(self, x, y, width, height):
+        """Draw asset loader progress with the name of the last asset."""
+        progress = self.asset_loader.progress
+        pygame.draw.rect(self.screen, GRAY, (x, y, width, height))
+        pygame.draw.rect(self.screen, NEON_BLUE, (x, y, int(width * progress), height))
+        pygame.draw.rect(self.screen, WHITE, (x, y, width, height), 1)
+        
+        label = self.font_sm.render(f"Loading {self.loading_label}... {int(progress * 100)}%",
+                                    True, GRAY)
+        self.screen.blit(label, (x, y + height + 5))
+
+    def record_startup_metrics(self):
+        """Measure and report startup timings, once each."""
+        now = time.perf_counter()
+        settled = not (self.fading_in or self.fading_out)
+        
+        if settled and self.current_state == "menu" and "menu_interactive_ms" not in self.startup_metrics:
+            self.startup_metrics["menu_interactive_ms"] = (now - self.boot_started) * 1000
+            print(f"Startup: interactive menu after {self.startup_metrics['menu_interactive_ms']:.0f} ms")
+        
+        if (settled and self.current_state == "gameplay" and self.player and
+                "first_gameplay_frame_ms" not in self.startup_metrics):
+            self.startup_metrics["first_gameplay_frame_ms"] = (now - self.boot_started) * 1000
+            since_request = (now - (self.gameplay_requested or now)) * 1000
+            print(f"Startup: first gameplay frame after "
+                  f"{self.startup_metrics['first_gameplay_frame_ms']:.0f} ms "
+                  f"({since_request:.0f} ms after START GAME)")
+        
+        if self.assets_ready and "assets_loaded_ms" not in self.startup_metrics:
+            loader = self.asset_loader
+            self.startup_metrics["assets_loaded_ms"] = (loader.finished_at - loader.started_at) * 1000
+            print(f"Startup: background assets ready after {self.startup_metrics['assets_loaded_ms']:.0f} ms")
+
+    def handle_menu(self, events, dt):
+        """Handle the menu state."""
+        # Draw menu background
+        self.draw_menu_background(dt)
         
-        # Update and draw buttons
-        mouse_pos = pygame.mouse.get_pos()
-        for button in self.menu_buttons:
-            button.update(mouse_pos)
-            button.draw(self.screen, self.font_md)
+        # Title, buttons and version info
+        self.menu_ui.update(pygame.mouse.get_pos())
+        self.menu_ui.draw(self.screen)
         
         # Handle button events
         for event in events:
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                for button in self.menu_buttons:
-                    if button.handle_event(event):
-                        break
+            self.menu_ui.handle_event(event)
         
-        # Draw version info
-        version_text = self.font_sm.render("v0.1", True, GRAY)
-        self.screen.blit(version_text, (WIDTH - version_text.get_width() - 10, 
-                                      HEIGHT - version_text.get_height() - 10))
+        # Show background loading progress until assets are ready
+        if not self.assets_ready:
+            self.draw_loading_bar(20, HEIGHT - 40, 200, 6)
 
     def handle_pause(self, events, dt):
         """Handle the pause state."""
-        # Draw semi-transparent overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))  # Semi-transparent black
-        self.screen.blit(overlay, (0, 0))
-        
-        # Draw pause title
-        title_text = self.font_lg.render("PAUSED", True, NEON_BLUE)
-        title_pos = (WIDTH // 2 - title_text.get_width() // 2, 150)
-        self.screen.blit(title_text, title_pos)
-        
-        # Update and draw buttons
-        mouse_pos = pygame.mouse.get_pos()
-        for button in self.pause_buttons:
-            button.update(mouse_pos)
-            button.draw(self.screen, self.font_md)
+        self.draw_pause_menu()
         
         # Handle button events
         for event in events:
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                for button in self.pause_buttons:
-                    if button.handle_event(event):
-                        break
-            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                 self.transition_to("gameplay")
+            else:
+                self.pause_ui.handle_event(event)
 
     def handle_game_over(self, events, dt):
         """Handle the game over state."""
         # Draw background
         self.draw_menu_background(dt)
         
-        # Draw game over title
-        title_text = self.font_xl.render("GAME OVER", True, NEON_RED)
-        title_pos = (WIDTH // 2 - title_text.get_width() // 2, 150)
-        self.screen.blit(title_text, title_pos)
-        
-        # Draw score
-        score_text = self.font_md.render(f"SCORE: {self.score}", True, WHITE)
-        score_pos = (WIDTH // 2 - score_text.get_width() // 2, 220)
-        self.screen.blit(score_text, score_pos)
-        
-        # Draw survival time
+        # Score and survival time only re-render when they change
         minutes = int(self.survival_time // 60)
         seconds = int(self.survival_time % 60)
-        time_text = self.font_md.render(f"SURVIVAL TIME: {minutes:02d}:{seconds:02d}", 
-                                       True, WHITE)
-        time_pos = (WIDTH // 2 - time_text.get_width() // 2, 260)
-        self.screen.blit(time_text, time_pos)
+        self.game_over_score.set_text(f"SCORE: {self.score}")
+        self.game_over_time.set_text(f"SURVIVAL TIME: {minutes:02d}:{seconds:02d}")
         
-        # Update and draw buttons
-        mouse_pos = pygame.mouse.get_pos()
-        for button in self.game_over_buttons:
-            button.update(mouse_pos)
-            button.draw(self.screen, self.font_md)
+        # Title, results and buttons
+        self.game_over_ui.update(pygame.mouse.get_pos())
+        self.game_over_ui.draw(self.screen)
         
         # Handle button events
         for event in events:
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                for button in self.game_over_buttons:
-                    if button.handle_event(event):
-                        break
+            self.game_over_ui.handle_event(event)
+
+    def show_leaderboard(self):
+        """Open the leaderboard on the board for the current difficulty."""
+        self.leaderboard_difficulty = self.settings["difficulty"]
+        self.transition_to("leaderboard")
+
+    def handle_leaderboard(self, events, dt):
+        """Handle the leaderboard state."""
+        self.leaderboard_ui.update(pygame.mouse.get_pos())
+        self.draw_leaderboard()
+        
+        boards = (None,) + DIFFICULTIES
+        for event in events:
+            if self.leaderboard_ui.handle_event(event):
+                continue
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    self.transition_to("menu")
+                elif event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                    # Cycle through the per-difficulty boards
+                    step = 1 if event.key == pygame.K_RIGHT else -1
+                    index = boards.index(self.leaderboard_difficulty)
+                    self.leaderboard_difficulty = boards[(index + step) % len(boards)]
+                elif event.key == pygame.K_TAB:
+                    self.leaderboard_by = "time" if self.leaderboard_by == "score" else "score"
 
     def handle_settings(self, events, dt):
         """Handle the settings state."""
         # Draw animated background
         self.draw_menu_background(dt)
         
-        # Draw settings title
-        title_text = self.font_lg.render("SETTINGS", True, NEON_BLUE)
-        title_pos = (WIDTH // 2 - title_text.get_width() // 2, 80)
-        self.screen.blit(title_text, title_pos)
-        
-        # Update and draw settings controls
-        mouse_pos = pygame.mouse.get_pos()
-        for control in self.settings_controls:
-            control.update(mouse_pos)
-            control.draw(self.screen, self.font_md)
+        # Title and controls; only widgets whose look changed are re-rendered
+        self.settings_ui.update(pygame.mouse.get_pos())
+        self.settings_ui.draw(self.screen)
         
         # Handle control events
         for event in events:
-            if event.type == pygame.MOUSEBUTTONDOWN or event.type == pygame.MOUSEBUTTONUP:
-                for control in self.settings_controls:
-                    if control.handle_event(event):
-                        break
-            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                 self.transition_to("menu")
+            else:
+                self.settings_ui.handle_event(event)
                 
         # Show settings saved message if needed
         # Implement if needed
 
     def draw_menu_background(self, dt):
         """Draw animated cyberpunk background for menus."""
-        # Fill background
-        self.screen.fill(BG_COLOR)
-        
-        # Draw perspective grid
-        self.grid_offset_y = (self.grid_offset_y + 30 * dt) % 30
-        grid_spacing = 30
-        vanishing_point_y = HEIGHT // 2
-        
-        # Draw horizontal grid lines
-        for y in range(int(self.grid_offset_y), HEIGHT, grid_spacing):
-            line_width = max(1, int(3 * (y / HEIGHT)))
-            perspective = 0.3 + 0.7 * (y / HEIGHT)
-            x1 = WIDTH // 2 - int(WIDTH * 0.5 * perspective)
-            x2 = WIDTH // 2 + int(WIDTH * 0.5 * perspective)
-            pygame.draw.line(self.screen, NEON_BLUE, (x1, y), (x2, y), line_width)
-        
-        # Draw vertical grid lines
-        vanishing_point_x = WIDTH // 2
-        num_lines = 20
-        for i in range(num_lines):
-            angle = i * (math.pi / num_lines)
-            x = vanishing_point_x + int(WIDTH * math.cos(angle))
-            y = vanishing_point_y + int(HEIGHT * math.sin(angle))
-            pygame.draw.line(self.screen, NEON_BLUE, (vanishing_point_x, vanishing_point_y), 
-                            (x, y), 1)
-        
-        # Add floating data particles
-        if len(self.bg_particles) < 50:
-            if random.random() < 0.1:
-                particle = {
-                    "x": random.randint(0, WIDTH),
-                    "y": random.randint(0, HEIGHT),
-                    "size": random.randint(2, 6),
-                    "color": random.choice([NEON_BLUE, NEON_PINK, NEON_GREEN]),
-                    "speed": random.uniform(10, 30),
-                    "direction": random.uniform(0, 2 * math.pi)
-                }
-                self.bg_particles.append(particle)
-        
-        # Update and draw particles
-        for particle in self.bg_particles[:]:
-            # Move particle
-            particle["x"] += particle["speed"] * dt * math.cos(particle["direction"])
-            particle["y"] += particle["speed"] * dt * math.sin(particle["direction"])
-            
-            # Remove if off-screen
-            if (particle["x"] < 0 or particle["x"] > WIDTH or 
-                particle["y"] < 0 or particle["y"] > HEIGHT):
-                self.bg_particles.remove(particle)
-                continue
-                
-            # Draw particle
-            pygame.draw.circle(self.screen, particle["color"], 
-                              (int(particle["x"]), int(particle["y"])), 
-                              particle["size"])
+        self.menu_background.draw(self.screen, dt)
 
     def handle_transition(self):
         """Handle state transitions with fade effect."""
@@ -2233,7 +2511,11 @@ class Game:
                 
                 # Initialize new state if needed
                 if self.current_state == "gameplay" and not self.player:
-                    self.initialize_game_world()
+                    if self.assets_ready:
+                        self.initialize_game_world()
+                    else:
+                        # Wait on the loading screen for the background loader
+                        self.current_state = "loading"
                 
         elif self.fading_in:
             # Increment transition timer
@@ -2256,6 +2538,15 @@ class Game:
         """Transition to a new game state."""
         if state == self.current_state:
             return
+        
+        # Remember when gameplay was first requested for startup metrics
+        if state == "gameplay" and self.gameplay_requested is None:
+            self.gameplay_requested = time.perf_counter()
+            
+        # Freeze the last gameplay frame as the pause screen backdrop
+        if state == "pause" and self.current_state == "gameplay":
+            self.pause_snapshot = self.screen.copy()
+            self.pause_layer.invalidate()
             
         self.next_state = state
         self.previous_state = self.current_state
@@ -2274,28 +2565,15 @@ class Game:
         if setting == "sound_volume":
             self.effects.set_volume(value)
         
-        # Save settings
-        self.save_settings()
+        # The store saves on its own once changes settle (e.g. a slider drag ends)
 
     def save_settings(self):
-        """Save settings to file."""
-        try:
-            with open("settings.json", "w") as f:
-                json.dump(self.settings, f)
-        except Exception as e:
-            print(f"Error saving settings: {e}")
+        """Write any pending settings changes to disk now."""
+        self.settings.flush()
 
     def load_settings(self):
-        """Load settings from file."""
-        try:
-            if os.path.exists("settings.json"):
-                with open("settings.json", "r") as f:
-                    loaded_settings = json.load(f)
-                    # Update settings, keeping defaults for any missing keys
-                    for key, value in loaded_settings.items():
-                        self.settings[key] = value
-        except Exception as e:
-            print(f"Error loading settings: {e}")
+        """Reload settings from file."""
+        self.settings.load()
 
     def restart_game(self):
         """Restart the game."""
@@ -2303,25 +2581,71 @@ class Game:
         self.survival_time = 0
         self.wave_number = 0
         self.enemies = []
-        self.resources = []
-        self.power_ups = []
+        self.entities.clear()
         self.effects_list = []
         self.transition_to("gameplay")
 
+    def set_world(self, world):
+        """Switch to a world and precompute its pickup spawn spots."""
+        self.world_generator = world
+        self.visibility = Visibility(world.map_bytes(), world.grid_width, world.grid_height,
+                                     world.tile_size)
+        self.fog = FogLayer(self.visibility)
+        self.minimap = Minimap(world, self.minimap_dots, self.clock)
+        self.spawn_placer = SpawnPlacer(world, pygame.Rect(100, 100, WIDTH - 200, HEIGHT - 200),
+                                        start=(WIDTH // 2, HEIGHT // 2),
+                                        spacing=TILE_SIZE * 1.5, footprint=TILE_SIZE,
+                                        safe_radius=150, rng=self.rng)
+
+    def minimap_dots(self):
+        """Minimap dots (x, y, colour, size): pickups, the enemies the player
+        can see, teammates and the player."""
+        archetypes = self.entities.archetypes
+        columns = archetypes["resource"].columns
+        for x, y, sprite in zip(columns["x"], columns["y"], columns["sprite"]):
+            yield x + 24, y + 24, RESOURCE_LIGHTS[sprite], 2
+        columns = archetypes["power_up"].columns
+        for x, y, sprite in zip(columns["x"], columns["y"], columns["sprite"]):
+            yield x + TILE_SIZE / 2, y + TILE_SIZE / 2, POWER_UP_LIGHTS[sprite], 3
+        
+        in_view = self.enemy_in_view if self.visibility else None
+        for enemy in self.enemies:
+            if enemy.active and (in_view is None or in_view(enemy)):
+                yield *center(enemy), NEON_RED, 3
+        
+        for player in [*self.allies, self.player]:
+            if player and player.health > 0:
+                yield player.x + player.width / 2, player.y + player.height / 2, WHITE, 4
+
+    def pickup_near(self, x, y):
+        """Check if a resource or power-up already sits within a tile of a point."""
+        return bool(self.proximity.query_radius(x, y, TILE_SIZE))
+
     def initialize_game_world(self):
         """Initialize the game world and player."""
         # Create world generator
-        self.world_generator = WorldGenerator(WIDTH, HEIGHT, TILE_SIZE)
+        self.set_world(WorldGenerator(WIDTH, HEIGHT, TILE_SIZE, style=self.balance["map_style"],
+                                      rng=self.rng))
+        self.difficulty = self.settings["difficulty"]
         
         # Reset game metrics
         self.score = 0
         self.survival_time = 0
         self.wave_number = 0
         
+        # Drop wave, power-up and cooldown timers left over from a previous run
+        self.clock.timers.clear()
+        self.enemies_to_spawn = 0
+        self.wave_timer = None
+        self.power_up_timer = None
+        self.wave_spawner.clear()
+        self.ai_scheduler.reset()
+        
         # Clear game objects
+        self.allies = []
         self.enemies = []
-        self.resources = []
-        self.power_ups = []
+        self.combat.invalidate()
+        self.entities.clear()
         self.effects_list = []
         
         # Load sprites
@@ -2337,24 +2661,8 @@ class Game:
             self.player_sprite_sheet = player_surface
         
         # Create player
-        self.player = Player(self.player_sprite_sheet, 
-                            WIDTH // 2 - TILE_SIZE // 2, 
-                            HEIGHT // 2 - TILE_SIZE // 2)
-        
-        # Initialize player attributes
-        self.player.health = 100
-        self.player.max_health = 100
-        self.player.energy = 100
-        self.player.max_energy = 100
-        self.player.is_dashing = False
-        
-        # Initialize player inventory with DEBUG resources for testing
-        # Comment these out when testing resource collection
-        self.player.inventory = {
-            "code_fragments": 10,  # DEBUG: Add some resources for testing crafting
-            "energy_cores": 5,     # DEBUG: Add some resources for testing crafting
-            "data_shards": 3       # DEBUG: Add some resources for testing crafting
-        }
+        self.player = self.create_player(WIDTH // 2 - TILE_SIZE // 2,
+                                         HEIGHT // 2 - TILE_SIZE // 2)
         
         # Reset crafting menu state
         self.show_crafting = False
@@ -2371,11 +2679,44 @@ class Game:
         for item_name, recipe in self.player.crafting_recipes.items():
             print(f"  {item_name}: {recipe}")
         
-        # Start first wave
+        # Start first wave, its enemies built now rather than on the first frame
+        self.wave_spawner.prewarm(self.wave_plan(1).total)
         self.start_new_wave()
 
+    def create_player(self, x, y):
+        """Create a player with starting stats and inventory at a position."""
+        player = Player(self.player_sprite_sheet, x, y, entities=self.entities, clock=self.clock)
+        
+        # Scale crafting costs for balance experiments
+        cost_scale = self.balance["craft_cost_scale"]
+        if cost_scale != 1.0:
+            for recipe in player.crafting_recipes.values():
+                for resource in RESOURCE_TYPES:
+                    recipe[resource] = max(1, round(recipe[resource] * cost_scale))
+        
+        # Initialize player attributes
+        player.health = 100
+        player.max_health = 100
+        player.energy = 100
+        player.max_energy = 100
+        player.is_dashing = False
+        
+        # Initialize player inventory with DEBUG resources for testing
+        # Comment these out when testing resource collection
+        player.inventory = {
+            "code_fragments": 10,  # DEBUG: Add some resources for testing crafting
+            "energy_cores": 5,     # DEBUG: Add some resources for testing crafting
+            "data_shards": 3       # DEBUG: Add some resources for testing crafting
+        }
+        return player
+
     def load_sprites(self):
         """Load all game sprites."""
+        # Sprites and placeholders are built once and reused across restarts
+        if self.sprites_loaded:
+            return
+        self.sprites_loaded = True
+        
         # Object sprites
         object_types = ["console", "crate", "terminal", "debris"]
         for obj_type in object_types:
@@ -2397,12 +2738,13 @@ class Game:
         resource_types = ["code_fragments", "energy_cores", "data_shards"]
         for res_type in resource_types:
             try:
-                # Load resource image (single image, not spritesheet)
-                sprite_path = f"spritesheets/resources/{res_type}.png"
-                image = pygame.image.load(sprite_path).convert_alpha()
+                # Resource image from the asset cache (single image, not spritesheet)
+                image = get_asset(res_type)
+                if image is None:
+                    raise FileNotFoundError(ASSET_MANIFEST[res_type]["path"])
                 
                 # Verify dimensions (single 48x48 image)
-                expected_size = 48
+                expected_size = ASSET_MANIFEST[res_type]["size"][0]
                 
                 if image.get_width() != expected_size or image.get_height() != expected_size:
                     print(f"Warning: Resource image dimensions incorrect for {res_type}. Expected {expected_size}x{expected_size}, got {image.get_width()}x{image.get_height()}")
@@ -2442,12 +2784,16 @@ class Game:
                             pygame.Rect(2, 2, TILE_SIZE - 4, TILE_SIZE - 4), 2)
             self.power_up_sprites[pu_type] = surface
         
+        # Sprite tables for the entity store, indexed by sprite ref
+        self.build_entity_sprite_tables()
+        
         # Enemy sprite sheet
         if not self.enemy_sprite_sheet:
             try:
-                # Load the enemy spritesheet with the correct path
-                sprite_path = "spritesheets/enemy-spritesheet.png"
-                self.enemy_sprite_sheet = pygame.image.load(sprite_path).convert_alpha()
+                # Enemy spritesheet from the asset cache
+                self.enemy_sprite_sheet = get_asset("enemy_sheet")
+                if self.enemy_sprite_sheet is None:
+                    raise FileNotFoundError(ASSET_MANIFEST["enemy_sheet"]["path"])
                 
                 # Verify dimensions
                 expected_width = 4 * 48  # 4 frames wide
@@ -2483,9 +2829,10 @@ class Game:
         # Player sprite sheet
         if not self.player_sprite_sheet:
             try:
-                # Load the player spritesheet with the correct path
-                sprite_path = "spritesheets/player-spritesheet.png"
-                self.player_sprite_sheet = pygame.image.load(sprite_path).convert_alpha()
+                # Player spritesheet from the asset cache
+                self.player_sprite_sheet = get_asset("player_sheet")
+                if self.player_sprite_sheet is None:
+                    raise FileNotFoundError(ASSET_MANIFEST["player_sheet"]["path"])
                 
                 # Verify dimensions
                 expected_width = 4 * 48  # 4 frames wide
@@ -2518,110 +2865,100 @@ class Game:
                 
                 self.player_sprite_sheet = sheet
 
+    def build_entity_sprite_tables(self):
+        """Build the (surface, offset) frame tables used by collect_sprites."""
+        # Resources pulse, so pre-scale one frame per pulse step instead of
+        # scaling every resource every frame
+        base_size = 48
+        resource_table = []
+        for res_type in RESOURCE_TYPES:
+            sprite = self.resource_sprites[res_type]
+            frames = []
+            for step in range(PULSE_FRAMES):
+                pulse_scale = 1.0 + (step / (PULSE_FRAMES - 1)) * 0.2
+                scaled_size = int(base_size * pulse_scale)
+                offset = (scaled_size - base_size) // 2
+                frames.append((pygame.transform.scale(sprite, (scaled_size, scaled_size)),
+                               (offset, offset)))
+            resource_table.append(frames)
+        
+        # Power-ups are drawn unscaled
+        power_up_table = [[(self.power_up_sprites[pu_type], (0, 0))]
+                          for pu_type in POWER_UP_TYPES]
+        
+        # Projectiles are a glowing dot centered on their position
+        projectile_sprite = pygame.Surface((10, 10), pygame.SRCALPHA)
+        pygame.draw.circle(projectile_sprite, NEON_BLUE, (5, 5), 5)
+        
+        self.entity_sprites = {
+            "resource": resource_table,
+            "power_up": power_up_table,
+            "projectile": [[(projectile_sprite, (5, 5))]]
+        }
+
     def play_sound(self, sound_name):
         """Play a sound by name."""
         self.effects.play_sound(sound_name)
 
     def update_power_ups(self, dt):
         """Update power-ups and check for collection."""
-        # Initialize spawn timer if not exists
-        if not hasattr(self, 'power_up_spawn_timer'):
-            self.power_up_spawn_timer = 0
-            self.power_up_spawn_interval = 45.0  # Spawn every 45 seconds
-            self.power_up_spawn_chance = 0.7     # 70% chance to spawn when timer is up
-            self.max_power_ups = 3               # Maximum number of power-ups at once
-        
-        # Update spawn timer
-        self.power_up_spawn_timer += dt
-        
-        # Check if it's time to try spawning a power-up
-        if self.power_up_spawn_timer >= self.power_up_spawn_interval:
-            self.power_up_spawn_timer = 0
-            if len(self.power_ups) < self.max_power_ups and random.random() < self.power_up_spawn_chance:
-                self.spawn_random_power_up()
-        
-        # Update each power-up
-        for power_up in self.power_ups[:]:
-            # Update animation if needed
-            if "pulse" in power_up:
-                power_up["pulse"] += 0.05 * power_up["pulse_dir"]
-                if power_up["pulse"] >= 1.0:
-                    power_up["pulse"] = 1.0
-                    power_up["pulse_dir"] = -1
-                elif power_up["pulse"] <= 0.0:
-                    power_up["pulse"] = 0.0
-                    power_up["pulse_dir"] = 1
-            
-            # Check if expired
-            if "timer" in power_up:
-                power_up["timer"] += dt
-                if power_up["timer"] >= power_up.get("duration", 20.0):
-                    self.power_ups.remove(power_up)
+        # Spawn attempts run on a repeating game-clock timer
+        if self.power_up_timer is None:
+            self.power_up_timer = self.clock.after(self.power_up_spawn_interval, self.power_up_timer_due)
+        
+        # Expiry is handled by the timer spawn_timed sets up
         
         # Check collection
         self.check_power_up_collection()
 
+    def power_up_timer_due(self):
+        """Power-up timer callback: maybe spawn one, then wait another interval."""
+        self.power_up_timer = self.clock.after(self.power_up_spawn_interval, self.power_up_timer_due)
+        if self.entities.count("power_up") < self.max_power_ups and self.rng.random() < self.power_up_spawn_chance:
+            self.spawn_random_power_up()
+
     def spawn_random_power_up(self):
         """Spawn a power-up at a random location away from the player."""
         if not self.player:
             return
             
         # Find a suitable spawn position
-        max_attempts = 10
         min_distance = 200  # Minimum distance from player
         max_distance = 400  # Maximum distance from player
         
-        for _ in range(max_attempts):
-            # Generate random position
-            x = random.randint(100, WIDTH - 100)
-            y = random.randint(100, HEIGHT - 100)
-            
-            # Calculate distance from player
-            dist = ((self.player.x - x) ** 2 + (self.player.y - y) ** 2) ** 0.5
-            
-            # Check if position is valid
-            if min_distance <= dist <= max_distance:
-                # Spawn power-up
-                self.spawn_power_up(x, y)
-                
-                # Add spawn effect
-                self.add_effect("text", x, y - 20, 
-                              text="Power-up!", 
-                              color=NEON_BLUE, 
-                              size=20, 
-                              duration=1.0)
-                return
-                
-        # If no suitable position found after max attempts, spawn at a default position
-        edge_spawn = random.choice([
-            (random.randint(100, WIDTH - 100), 100),                  # Top
-            (random.randint(100, WIDTH - 100), HEIGHT - 100),        # Bottom
-            (100, random.randint(100, HEIGHT - 100)),                # Left
-            (WIDTH - 100, random.randint(100, HEIGHT - 100))         # Right
-        ])
-        self.spawn_power_up(edge_spawn[0], edge_spawn[1])
+        # A free spot in range of the player, or failing that anywhere
+        # outside the safe zone
+        player_pos = (self.player.x, self.player.y)
+        spot = self.spawn_placer.sample(player_pos, occupied=self.pickup_near,
+                                        min_distance=min_distance, max_distance=max_distance)
+        if spot is None:
+            spot = self.spawn_placer.sample(player_pos, occupied=self.pickup_near)
+        if spot is None:
+            return  # Every spot is taken; the next spawn roll tries again
+        x, y = spot
+        
+        # Spawn power-up
+        self.spawn_power_up(x, y)
+        
+        # Add spawn effect
+        self.add_effect("text", x, y - 20, 
+                      text="Power-up!", 
+                      color=NEON_BLUE, 
+                      size=20, 
+                      duration=1.0)
 
     def spawn_power_up(self, x, y):
         """Spawn a power-up at the specified position."""
-        power_up_types = ["health", "energy", "shield", "damage"]
         weights = [0.4, 0.3, 0.2, 0.1]  # Probability weights
         
         # Choose random type
-        power_up_type = random.choices(power_up_types, weights=weights, k=1)[0]
+        power_up_type = self.rng.choices(POWER_UP_TYPES, weights=weights, k=1)[0]
         
-        # Create power-up
-        power_up = {
-            "type": power_up_type,
-            "x": x,
-            "y": y,
-            "collected": False,
-            "pulse": 0,
-            "pulse_dir": 1,
-            "timer": 0,
-            "duration": 30.0  # 30 seconds before disappearing
-        }
-        
-        self.power_ups.append(power_up)
+        # Create power-up, 30 seconds before disappearing
+        return self.spawn_timed("power_up", 30.0,
+                                x=x,
+                                y=y,
+                                sprite=POWER_UP_TYPES.index(power_up_type))
 
     def check_power_up_collection(self):
         """Check if player has collected power-ups."""
@@ -2631,29 +2968,28 @@ class Game:
         # Collection radius
         collection_radius = TILE_SIZE * 1.5
         
-        # Check each power-up
-        for power_up in self.power_ups[:]:
-            if not power_up.get("collected", False):
-                # Calculate distance
-                dist = ((self.player.x - power_up["x"]) ** 2 + 
-                       (self.player.y - power_up["y"]) ** 2) ** 0.5
-                
-                if dist < collection_radius:
-                    # Apply power-up effect
-                    self.apply_power_up(power_up)
-                    
-                    # Remove power-up
-                    self.power_ups.remove(power_up)
-                    
-                    # Play sound
-                    self.play_sound("collect")
+        # Check power-ups within reach, from the proximity grid
+        store = self.entities
+        power_ups = store.archetypes["power_up"]
+        for entity_id in self.proximity.query_radius(self.player.x, self.player.y, collection_radius):
+            archetype, row = store.locations[entity_id]
+            if archetype is not power_ups:
+                continue
+            power_up_type = POWER_UP_TYPES[power_ups.columns["sprite"][row]]
+            
+            # Remove power-up
+            store.despawn(entity_id)
+            
+            # Apply power-up effect
+            self.apply_power_up(power_up_type)
+            
+            # Play sound
+            self.play_sound("collect")
 
-    def apply_power_up(self, power_up):
+    def apply_power_up(self, power_up_type):
         """Apply power-up effect to player."""
         if not self.player:
             return
-            
-        power_up_type = power_up["type"]
         
         if power_up_type == "health":
             # Restore health
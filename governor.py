@@ -0,0 +1,202 @@
+# governor.py
+# Adaptive visual quality. The governor watches how long each frame's work
+# takes (update and draw, not the wait for the frame cap) and steps the
+# quality level down when the rolling average eats into the frame budget,
+# or back up once there has been plenty of headroom for a while. Separate
+# down/up thresholds, a hold after every change and a per-level wait before
+# stepping up (doubled whenever a level proves too heavy right after being
+# entered) keep it from flapping between levels.
+#
+# The load governor does the same for the simulation: it learns what one
+# enemy and one projectile cost to update each tick and holds wave arrivals
+# back while more enemies would overrun the tick budget.
+from collections import deque
+
+
+class QualityLevel:
+    """Visual settings for one quality level.
+
+    particle_scale: share of GameEffects particles created
+    max_text_effects: text effects drawn at once (None: all)
+    pulse_interval: frames between resource pulse animation steps
+    health_bars: draw enemy health bars
+    screen_shake: shake the camera
+    menu_particles: menu background particle cap
+    lighting: 0 off, 1 blocky lightmap upscale, 2 smooth upscale
+    """
+
+    __slots__ = ("name", "particle_scale", "max_text_effects", "pulse_interval",
+                 "health_bars", "screen_shake", "menu_particles", "lighting")
+
+    def __init__(self, name, particle_scale, max_text_effects, pulse_interval,
+                 health_bars, screen_shake, menu_particles, lighting):
+        self.name = name
+        self.particle_scale = particle_scale
+        self.max_text_effects = max_text_effects
+        self.pulse_interval = pulse_interval
+        self.health_bars = health_bars
+        self.screen_shake = screen_shake
+        self.menu_particles = menu_particles
+        self.lighting = lighting
+
+
+# Lowest first
+QUALITY_LEVELS = (
+    QualityLevel("minimal", 0.0, 3, 0, False, False, 0, 0),
+    QualityLevel("low", 0.25, 6, 4, False, False, 15, 1),
+    QualityLevel("medium", 0.5, 12, 2, True, True, 30, 1),
+    QualityLevel("high", 1.0, None, 1, True, True, 50, 2),
+)
+
+
+class QualityGovernor:
+    """Picks a quality level from rolling frame work times.
+
+    ``budget`` is the frame time (seconds) to stay within. The level steps
+    down when the average over ``window`` frames exceeds ``down_at`` of the
+    budget, and up after ``up_after`` frames in a row with the average
+    below ``up_at`` of it. No decisions are made for ``hold`` frames after
+    a change.
+    """
+
+    def __init__(self, budget=1 / 60, levels=QUALITY_LEVELS, window=30, down_at=0.9, up_at=0.55,
+                 up_after=120, hold=60, max_up_after=3840):
+        self.budget = budget
+        self.levels = levels
+        self.window = window
+        self.down_at = down_at
+        self.up_at = up_at
+        self.hold = hold
+        self.max_up_after = max_up_after
+
+        self.index = len(levels) - 1  # Start at the top; weak machines step down quickly
+        self.samples = deque(maxlen=window)
+        self.total = 0.0
+        self.calm = 0  # Consecutive frames with headroom to step up
+        self.holding = 0
+        self.frame = 0
+        self.entered = {}  # Level index -> frame it was last stepped up into
+        self.up_after = [up_after] * len(levels)  # Frames of calm needed to step up into a level
+
+        # For the debug overlay
+        self.changes = 0
+        self.average = 0.0
+
+    @property
+    def level(self):
+        """The current QualityLevel."""
+        return self.levels[self.index]
+
+    def record(self, work_time):
+        """Add one frame's work time; True if the level changed."""
+        self.frame += 1
+        samples = self.samples
+        if len(samples) == samples.maxlen:
+            self.total -= samples[0]
+        samples.append(work_time)
+        self.total += work_time
+        self.average = self.total / len(samples)
+
+        if self.holding:
+            self.holding -= 1
+            return False
+        if len(samples) < self.window:
+            return False
+
+        if self.average > self.budget * self.down_at and self.index > 0:
+            # A level that was too heavy right after being entered waits
+            # longer before it is tried again
+            entered = self.entered.get(self.index)
+            if entered is not None and self.frame - entered < self.up_after[self.index]:
+                self.up_after[self.index] = min(self.up_after[self.index] * 2, self.max_up_after)
+            return self.step(-1)
+
+        if self.average < self.budget * self.up_at and self.index < len(self.levels) - 1:
+            self.calm += 1
+            if self.calm >= self.up_after[self.index + 1]:
+                self.entered[self.index + 1] = self.frame
+                return self.step(1)
+        else:
+            self.calm = 0
+        return False
+
+    def step(self, direction):
+        """Move one level up (1) or down (-1) and start a fresh window."""
+        self.index += direction
+        self.samples.clear()
+        self.total = 0.0
+        self.calm = 0
+        self.holding = self.hold
+        self.changes += 1
+        return True
+
+
+class LoadGovernor:
+    """Caps live enemies so the simulation stays inside a per-tick budget.
+
+    The update cost of one enemy and one projectile (seconds per tick) is
+    tracked as a moving average of measured ticks. Wave arrivals that would
+    push the predicted cost past ``budget`` wait in the spawn queue; once a
+    backlog has waited ``merge_after`` ticks, queued enemies arrive merged
+    into elites of up to ``max_weight`` enemies each, so the wave keeps its
+    total strength with fewer live entities. ``budget=None`` never throttles,
+    which keeps seeded headless runs deterministic.
+    """
+
+    def __init__(self, budget=None, smoothing=0.05, min_enemies=8, merge_after=120, max_weight=4):
+        self.budget = budget
+        self.smoothing = smoothing
+        self.min_enemies = min_enemies  # Always allowed, however slow the ticks
+        self.merge_after = merge_after
+        self.max_weight = max_weight
+
+        self.costs = {}  # Entity kind -> seconds per entity per tick
+        self.waiting = 0  # Ticks the current backlog has waited
+
+        # Throttling report, for the debug overlay
+        self.pending_ticks = 0  # Ticks with arrivals queued
+        self.throttled = 0  # ...of which some had to wait
+        self.elites = 0
+        self.merged = 0  # Enemies folded into elites
+
+    def measure(self, kind, count, elapsed):
+        """Record one tick's update time for ``count`` entities of a kind."""
+        if self.budget is None or count <= 0:
+            return
+        cost = elapsed / count
+        previous = self.costs.get(kind)
+        self.costs[kind] = cost if previous is None else previous + (cost - previous) * self.smoothing
+
+    def room(self, enemies, projectiles):
+        """How many more enemies fit in the budget (None: no limit)."""
+        enemy_cost = self.costs.get("enemy")
+        if self.budget is None or not enemy_cost:
+            return None
+        spare = self.budget - self.costs.get("projectile", 0.0) * projectiles
+        capacity = max(self.min_enemies, int(spare / enemy_cost))
+        return max(0, capacity - enemies)
+
+    def admit(self, pending, enemies, projectiles):
+        """This tick's arrivals as (count, weight): up to ``count`` enemies
+        arrive, each standing for ``weight`` of the ``pending`` ones."""
+        if not pending:
+            self.waiting = 0
+            return 0, 1
+        self.pending_ticks += 1
+        room = self.room(enemies, projectiles)
+        if room is None or pending <= room:
+            self.waiting = 0
+            return pending, 1
+
+        self.throttled += 1
+        self.waiting += 1
+        if room and self.waiting >= self.merge_after:
+            weight = min(self.max_weight, -(-pending // room))
+            if weight > 1:
+                return room, weight
+        return room, 1
+
+    def merged_arrival(self, weight):
+        """Count an elite standing for ``weight`` enemies."""
+        self.elites += 1
+        self.merged += weight
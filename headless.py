@@ -0,0 +1,223 @@
+# headless.py
+# Runs seeded game sessions without a window or audio output, stepping the
+# simulation at a fixed dt as fast as the CPU allows. A scripted bot stands in
+# for the player. Used by simulate.py for balance sweeps.
+import os
+
+# Must be set before pygame initialises its display and mixer
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import contextlib
+import pygame
+from game import Game, BALANCE_DEFAULTS, WIDTH, HEIGHT
+
+# Movement options the bot scores every step: (keys held, dx, dy)
+MOVES = [((), 0, 0)]
+for _vertical, _dy in ((None, 0), (pygame.K_UP, -1), (pygame.K_DOWN, 1)):
+    for _horizontal, _dx in ((None, 0), (pygame.K_LEFT, -1), (pygame.K_RIGHT, 1)):
+        if _vertical or _horizontal:
+            MOVES.append((tuple(k for k in (_vertical, _horizontal) if k), _dx, _dy))
+
+# Key that turns the player to face each direction
+FACING_KEYS = {"up": pygame.K_UP, "down": pygame.K_DOWN,
+               "left": pygame.K_LEFT, "right": pygame.K_RIGHT}
+
+# Order the bot crafts tools in, most protective first
+CRAFT_PRIORITY = ("data_shield", "energy_sword", "hack_tool")
+
+# Gameplay prints debug chatter; headless runs send it here
+_devnull = open(os.devnull, "w")
+
+
+def quiet():
+    """Context manager that discards gameplay's stdout chatter."""
+    return contextlib.redirect_stdout(_devnull)
+
+
+class BotKeys:
+    """Stand-in for pygame.key.get_pressed(): a set of held keys."""
+
+    def __init__(self, held=()):
+        self.held = set(held)
+
+    def __getitem__(self, key):
+        return key in self.held
+
+
+class Bot:
+    """Scripted player: fights enemies from a distance, collects resources
+    when it is safe, shoots enemies lined up with it, and crafts and uses
+    tools.
+
+    Deliberately simple; it only needs to play the same way in every
+    session so balance changes show up as shifts in the results.
+    """
+
+    def __init__(self, game, safe_distance=120, fight_distance=220, fire_range=420,
+                 tool_health=50):
+        self.game = game
+        self.safe_distance = safe_distance
+        self.fight_distance = fight_distance
+        self.fire_range = fire_range
+        self.tool_health = tool_health
+
+        # World objects never move, so their collision rects are built once
+        world = game.world_generator
+        self.obstacles = [pygame.Rect(obj.x, obj.y, obj.width, obj.height)
+                          for obj in world.objects] if world else []
+
+        # Unstick from obstacles by wandering for a while (seeded, so runs repeat)
+        self.last_position = None
+        self.still_steps = 0
+        self.wander_keys = ()
+        self.wander_steps = 0
+
+    def step(self):
+        """Craft if possible and return the keys to hold this step."""
+        game = self.game
+        player = game.player
+        if player.equipped_tool is None:
+            for index, name in enumerate(player.crafting_recipes):
+                if name in CRAFT_PRIORITY and player.can_craft(name):
+                    game.handle_crafting_selection(index)
+                    break
+
+        px = player.x + player.width / 2
+        py = player.y + player.height / 2
+        enemies = [(enemy.x + enemy.sprite_width / 2, enemy.y + enemy.sprite_height / 2)
+                   for enemy in game.enemies if enemy.active]
+        if self.wander_steps > 0:
+            self.wander_steps -= 1
+            held = set(self.wander_keys)
+        else:
+            held = set(self.choose_move(px, py, enemies))
+
+        # Score-based movement can get pinned against an obstacle
+        position = (player.x, player.y)
+        self.still_steps = self.still_steps + 1 if position == self.last_position else 0
+        self.last_position = position
+        if self.still_steps > 30 and self.wander_steps == 0:
+            self.wander_keys = self.game.rng.choice(MOVES[1:])[0]
+            self.wander_steps = 40
+
+        # Shoot along the axis of an enemy lined up with us, turning first
+        target = self.line_of_fire(px, py, enemies)
+        if target is not None:
+            if player.direction != target:
+                held = {FACING_KEYS[target]}
+            held.add(pygame.K_f)
+
+        # Tools are used once per emergency; held E would use one every step
+        if (player.equipped_tool is not None and player.health < self.tool_health
+                and not player.is_invincible and player.shield == 0):
+            held.add(pygame.K_e)
+        return BotKeys(held)
+
+    def choose_move(self, px, py, enemies):
+        """Pick the move that best keeps the nearest enemy at fighting range
+        and lined up on an axis, or heads for a resource when it is safe,
+        while staying clear of the screen edges."""
+        resources = self.game.entities.archetypes["resource"]
+        columns = resources.columns
+        targets = [(columns["x"][row], columns["y"][row]) for row in range(len(resources))]
+        player = self.game.player
+        speed = player.speed
+
+        best_keys, best_score = (), None
+        for keys, dx, dy in MOVES:
+            if keys and not self.can_move(player.x + dx * speed, player.y + dy * speed):
+                continue
+            x, y = px + dx * speed, py + dy * speed
+            score = 0.0
+            nearest = None
+            if enemies:
+                nearest = min(enemies, key=lambda e: (e[0] - x) ** 2 + (e[1] - y) ** 2)
+                distance = ((nearest[0] - x) ** 2 + (nearest[1] - y) ** 2) ** 0.5
+                if distance < self.safe_distance:
+                    score -= 4.0 * (self.safe_distance - distance)
+                else:
+                    # Close in to fighting range and line up a shot
+                    score -= abs(distance - self.fight_distance)
+                    score -= min(abs(nearest[0] - x), abs(nearest[1] - y))
+            if targets and (nearest is None or distance > self.fight_distance):
+                score -= 0.5 * min((tx - x) ** 2 + (ty - y) ** 2 for tx, ty in targets) ** 0.5
+            margin = min(x, y, WIDTH - x, HEIGHT - y)
+            if margin < 60:
+                score -= (60 - margin) * 10
+            if best_score is None or score > best_score:
+                best_keys, best_score = keys, score
+        return best_keys
+
+    def can_move(self, x, y):
+        """Check a player position the same way Player.move does."""
+        world = self.game.world_generator
+        if world is None:
+            return True
+        if not world.is_valid_position(x, y):
+            return False
+        player = self.game.player
+        rect = pygame.Rect(x, y, player.width, player.height)
+        return rect.collidelist(self.obstacles) == -1
+
+    def line_of_fire(self, px, py, enemies):
+        """Direction of the nearest enemy within range on a clear axis, or None."""
+        best = None
+        for ex, ey in enemies:
+            dx, dy = ex - px, ey - py
+            if abs(dx) < 20 and abs(dy) < self.fire_range:
+                direction, distance = ("down" if dy > 0 else "up"), abs(dy)
+            elif abs(dy) < 20 and abs(dx) < self.fire_range:
+                direction, distance = ("right" if dx > 0 else "left"), abs(dx)
+            else:
+                continue
+            if best is None or distance < best[1]:
+                best = (direction, distance)
+        return best[0] if best else None
+
+
+def create_game():
+    """Create a headless Game with every asset loaded."""
+    with quiet():
+        game = Game(headless=True)
+        game.asset_loader.wait()
+    return game
+
+
+def start_session(game, seed, difficulty="Normal", balance=None):
+    """Start a fresh seeded run on a headless game.
+
+    The same seed, difficulty and balance always give the same run.
+    """
+    game.rng.seed(seed)
+    game.clock.reset()
+    game.balance = {**BALANCE_DEFAULTS, **(balance or {})}
+    game.settings["difficulty"] = difficulty
+
+    with quiet():
+        game.player = None
+        game.show_crafting = False
+        game.initialize_game_world()
+
+
+def run_session(game, seed, difficulty="Normal", balance=None, dt=1/60, max_time=600.0):
+    """Play one seeded session with the bot until defeat or max_time and
+    return its results."""
+    start_session(game, seed, difficulty, balance)
+    bot = Bot(game)
+
+    with quiet():
+        steps = 0
+        while game.player.health > 0 and game.survival_time < max_time:
+            game.update_simulation(bot.step(), dt)
+            steps += 1
+
+    return {
+        "seed": seed,
+        "difficulty": difficulty,
+        "score": game.score,
+        "survival_time": game.survival_time,
+        "wave": game.wave_number,
+        "defeated": game.player.health <= 0,
+        "steps": steps,
+    }
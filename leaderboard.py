@@ -0,0 +1,164 @@
+# leaderboard.py
+# Local leaderboard backed by SQLite. Runs are inserted by a writer thread so
+# game over never waits on disk, and top-K boards are served from an in-memory
+# cache that is only invalidated when a new run lands.
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+
+DIFFICULTIES = ("Easy", "Normal", "Hard")
+
+# Board orderings; ties fall back to the other metric, then to the older run
+BOARD_ORDER = {
+    "score": "score DESC, survival_time DESC, id ASC",
+    "time": "survival_time DESC, score DESC, id ASC",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    survival_time REAL NOT NULL,
+    wave INTEGER NOT NULL DEFAULT 0,
+    difficulty TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (difficulty, score DESC, survival_time DESC);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (difficulty, survival_time DESC, score DESC);
+CREATE INDEX IF NOT EXISTS runs_by_score_all ON runs (score DESC, survival_time DESC);
+CREATE INDEX IF NOT EXISTS runs_by_time_all ON runs (survival_time DESC, score DESC);
+"""
+
+
+class Leaderboard:
+    """Persistent run history with cached, indexed top-K boards.
+
+    ``submit`` queues a run and returns immediately. ``top`` is meant for the
+    main thread: it answers from the cache and only queries SQLite (through
+    the indexes above) after an insert has invalidated that board.
+    """
+
+    def __init__(self, path="leaderboard.db"):
+        self.path = path
+        self.enabled = True
+
+        self._cache = {}  # (by, difficulty, limit) -> list of entry dicts
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+
+        # Bumped after every insert so screens know when to redraw
+        self.version = 0
+        # Row id of the most recent run submitted by this process
+        self.last_run_id = None
+
+        try:
+            self._reader = self._connect()
+            self._reader.executescript(SCHEMA)
+        except sqlite3.Error as e:
+            print(f"Warning: Leaderboard disabled, could not open {path}: {e}")
+            self.enabled = False
+            return
+
+        self._thread = threading.Thread(target=self._run, name="leaderboard-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _connect(self):
+        """Open a connection; each thread uses its own."""
+        connection = sqlite3.connect(self.path, timeout=5.0)
+        # WAL lets the main thread read while the writer commits
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def submit(self, score, survival_time, difficulty, wave=0, name="PLAYER"):
+        """Queue a finished run for insertion without blocking."""
+        if not self.enabled:
+            return
+        self._queue.put((name, int(score), float(survival_time), int(wave),
+                         difficulty, time.time()))
+
+    def top(self, by="score", difficulty=None, limit=10):
+        """Return the best runs as dicts, optionally for one difficulty only."""
+        if not self.enabled:
+            return []
+        if by not in BOARD_ORDER:
+            raise ValueError(f"Unknown leaderboard ordering '{by}'")
+
+        key = (by, difficulty, limit)
+        with self._lock:
+            entries = self._cache.get(key)
+            version = self.version
+        if entries is not None:
+            return entries
+
+        where = "WHERE difficulty = ?" if difficulty else ""
+        params = (difficulty, limit) if difficulty else (limit,)
+        try:
+            rows = self._reader.execute(
+                f"SELECT id, name, score, survival_time, wave, difficulty FROM runs "
+                f"{where} ORDER BY {BOARD_ORDER[by]} LIMIT ?", params).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error reading leaderboard: {e}")
+            return []
+
+        entries = [{"id": row[0], "name": row[1], "score": row[2], "time": int(row[3]),
+                    "wave": row[4], "difficulty": row[5]} for row in rows]
+        with self._lock:
+            # Don't cache a result an insert has already made stale
+            if self.version == version:
+                self._cache[key] = entries
+        return entries
+
+    def count(self, difficulty=None):
+        """Return the number of recorded runs."""
+        if not self.enabled:
+            return 0
+        if difficulty:
+            row = self._reader.execute("SELECT COUNT(*) FROM runs WHERE difficulty = ?",
+                                       (difficulty,)).fetchone()
+        else:
+            row = self._reader.execute("SELECT COUNT(*) FROM runs").fetchone()
+        return row[0]
+
+    def close(self):
+        """Insert any queued runs and stop the writer thread."""
+        if not self.enabled or not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        """Writer thread body."""
+        try:
+            connection = self._connect()
+        except sqlite3.Error as e:
+            print(f"Error opening leaderboard for writing: {e}")
+            return
+
+        while True:
+            run = self._queue.get()
+            if run is None:
+                break
+            try:
+                with connection:
+                    cursor = connection.execute(
+                        "INSERT INTO runs (name, score, survival_time, wave, difficulty, created_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)", run)
+            except sqlite3.Error as e:
+                print(f"Error saving run to leaderboard: {e}")
+                continue
+
+            # Only boards the new run could appear on are invalidated
+            difficulty = run[4]
+            with self._lock:
+                self.last_run_id = cursor.lastrowid
+                self.version += 1
+                for key in list(self._cache):
+                    if key[1] in (None, difficulty):
+                        del self._cache[key]
+
+        connection.close()
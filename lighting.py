@@ -0,0 +1,91 @@
+# lighting.py
+# Neon lighting. Every light is a pre-rendered radial gradient, cached per
+# radius and colour, added (BLEND_ADD) into a lightmap at a quarter of the
+# screen resolution that starts out filled with the ambient light. The
+# lightmap is then scaled up and multiplied (BLEND_MULT) over the scene, and a
+# dimmed copy of its lights is added (BLEND_ADD) on top so that light glows
+# even over the near-black floor. Lights cost one small blit each; the
+# per-pixel work is a fixed set of fills, scales and blends per frame.
+import pygame
+
+# Brightness steps lights are rounded to, so fading lights reuse textures
+INTENSITY_STEPS = 8
+
+
+class Lighting:
+    """Quarter-resolution lightmap that lights are collected into each frame.
+
+    ``size`` is the lit surface size and ``scale`` how many screen pixels a
+    lightmap pixel covers. Unlit areas keep ``ambient`` of their colour, and
+    ``glow`` (out of 255) of the light is added on top as a glow.
+    """
+
+    def __init__(self, size, scale=4, ambient=(80, 80, 105), glow=48):
+        self.size = size
+        self.scale = scale
+        self.ambient = ambient
+        self.glow = glow
+        small = (-(-size[0] // scale), -(-size[1] // scale))
+        self.lightmap = pygame.Surface(small)
+        self.glowmap = pygame.Surface(small)
+        self.upscaled = pygame.Surface(size)
+        self.textures = {}  # (lightmap radius, colour) -> gradient surface
+        self.lights = []  # This frame's (texture, position, area, flags) blits
+
+        # Last frame's numbers, for the debug overlay
+        self.drawn = 0
+
+    def texture(self, radius, color):
+        """The gradient for a light of ``radius`` lightmap pixels."""
+        key = (radius, color)
+        texture = self.textures.get(key)
+        if texture is None:
+            texture = pygame.Surface((radius * 2, radius * 2))
+            texture.fill((0, 0, 0))
+            # Rings from the rim inwards, brightening with a quadratic falloff
+            for ring in range(radius, 0, -1):
+                falloff = (1.0 - (ring - 1) / radius) ** 2
+                pygame.draw.circle(texture, [int(channel * falloff) for channel in color],
+                                   (radius, radius), ring)
+            self.textures[key] = texture
+        return texture
+
+    def add(self, x, y, radius, color, intensity=1.0):
+        """Queue a light centred on a screen point for this frame."""
+        scale = self.scale
+        width, height = self.size
+        if x + radius < 0 or y + radius < 0 or x - radius > width or y - radius > height:
+            return
+        steps = int(intensity * INTENSITY_STEPS + 0.5)
+        if steps <= 0:
+            return
+        if steps < INTENSITY_STEPS:
+            color = tuple(channel * steps // INTENSITY_STEPS for channel in color)
+        texture_radius = max(1, int(radius / scale + 0.5))
+        self.lights.append((self.texture(texture_radius, color),
+                            (x / scale - texture_radius, y / scale - texture_radius),
+                            None, pygame.BLEND_ADD))
+
+    def apply(self, surface, smooth=True):
+        """Light a surface with the queued lights, then forget them."""
+        resize = pygame.transform.smoothscale if smooth else pygame.transform.scale
+        lightmap = self.lightmap
+        lightmap.fill(self.ambient)
+        lightmap.blits(self.lights, False)
+        resize(lightmap, self.size, self.upscaled)
+        surface.blit(self.upscaled, (0, 0), special_flags=pygame.BLEND_MULT)
+
+        if self.lights and self.glow:
+            # The lights alone, dimmed, from the same lightmap
+            glowmap = self.glowmap
+            glowmap.blit(lightmap, (0, 0))
+            glowmap.fill(self.ambient, special_flags=pygame.BLEND_SUB)
+            glowmap.fill((self.glow,) * 3, special_flags=pygame.BLEND_MULT)
+            resize(glowmap, self.size, self.upscaled)
+            surface.blit(self.upscaled, (0, 0), special_flags=pygame.BLEND_ADD)
+        self.drawn = len(self.lights)
+        self.lights.clear()
+
+    def clear(self):
+        """Forget the queued lights without drawing them."""
+        self.lights.clear()
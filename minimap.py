@@ -0,0 +1,83 @@
+# minimap.py
+# HUD minimap. The terrain never changes within a world, so it is rendered
+# once: the tile map becomes an 8-bit palette image (one byte per tile),
+# static world objects are stamped on, and the result is scaled down to
+# the minimap size. Entity dots go on a small overlay that is cleared and
+# redrawn at a fixed game-clock rate (10 Hz by default) rather than every
+# frame, so a frame's minimap cost is two small blits however big the world.
+import pygame
+
+
+class Minimap:
+    """Cached terrain layer plus a periodically refreshed dot overlay.
+
+    ``world`` is a WorldGenerator; the minimap keeps its aspect ratio within
+    ``max_size``. ``dots()`` returns the (x, y, colour, size) world-pixel
+    dots to show and is called at most every ``interval`` seconds of
+    ``clock`` (the game's SimClock) time.
+    """
+
+    def __init__(self, world, dots, clock, max_size=(150, 110), interval=0.1, floor_color=(10, 10, 25),
+                 wall_color=(90, 90, 140), object_color=(60, 60, 80), border_color=(0, 195, 255)):
+        self.world = world
+        self.dots = dots
+        self.clock = clock
+        self.border_color = border_color
+        self.interval_ms = interval * 1000.0
+        scale = min(max_size[0] / world.width, max_size[1] / world.height)
+        self.scale = scale
+        self.size = (max(1, int(world.width * scale)), max(1, int(world.height * scale)))
+
+        self.terrain = self.render_terrain(floor_color, wall_color, object_color)
+        self.overlay = pygame.Surface(self.size, pygame.SRCALPHA)
+        self.refreshed_at = None  # Game-clock ms of the last dot refresh
+
+        # For the debug overlay
+        self.refreshes = 0
+        self.dot_count = 0
+
+    def render_terrain(self, floor_color, wall_color, object_color):
+        """Scaled-down image of the tile map and world objects."""
+        world = self.world
+        width, height = world.grid_width, world.grid_height
+        tiles = pygame.image.frombuffer(world.map_bytes(), (width, height), "P")
+        tiles.set_palette([floor_color, wall_color])
+
+        # Large maps are averaged down, so walls thinner than a minimap pixel
+        # still show; small ones are scaled up with hard tile edges
+        full = pygame.Surface((width, height))
+        full.blit(tiles, (0, 0))
+        if self.size[0] < width:
+            terrain = pygame.transform.smoothscale(full, self.size)
+        else:
+            terrain = pygame.transform.scale(full, self.size)
+        scale = self.scale
+        for obj in world.objects:
+            terrain.fill(object_color, (int(obj.x * scale), int(obj.y * scale),
+                                        max(1, int(world.tile_size * scale)),
+                                        max(1, int(world.tile_size * scale))))
+        return terrain
+
+    def refresh(self):
+        """Redraw the entity dots."""
+        overlay = self.overlay
+        overlay.fill((0, 0, 0, 0))
+        scale = self.scale
+        count = 0
+        for x, y, color, size in self.dots():
+            overlay.fill(color, (int(x * scale) - size // 2, int(y * scale) - size // 2, size, size))
+            count += 1
+        self.dot_count = count
+        self.refreshes += 1
+
+    def draw(self, target, position):
+        """Draw the minimap with its top-left corner at a screen position,
+        refreshing the dots if they are due."""
+        now = self.clock.ms
+        if self.refreshed_at is None or not 0 <= now - self.refreshed_at < self.interval_ms:
+            self.refresh()
+            self.refreshed_at = now
+        target.blit(self.terrain, position)
+        target.blit(self.overlay, position)
+        pygame.draw.rect(target, self.border_color, (position[0] - 1, position[1] - 1,
+                                                     self.size[0] + 2, self.size[1] + 2), 1)
@@ -0,0 +1,1006 @@
+# netplay.py
+# Server-authoritative co-op over UDP. The server owns the only simulation
+# (waves, enemies, resources, power-ups) and clients just send the keys they
+# hold. Every few ticks the server captures a quantized snapshot of the world
+# and sends each client a delta against the last snapshot that client
+# acknowledged, so a lost packet only makes the next delta a little larger.
+# Clients render the world slightly in the past, interpolating between the
+# two snapshots around their render time.
+#
+#   python netplay.py serve --port 7777
+#   python netplay.py join 127.0.0.1:7777
+#   python netplay.py selftest --clients 2 --enemies 30 --seconds 60
+import argparse
+import random
+import socket
+import statistics
+import struct
+import sys
+import time
+import weakref
+from collections import deque
+
+import pygame
+from ecs import pulse_system
+from enemy import Enemy
+from player import Player
+from game import Game, WIDTH, HEIGHT, TILE_SIZE, RED, NEON_BLUE
+from leaderboard import DIFFICULTIES
+
+PROTOCOL_VERSION = 1
+MAX_PLAYERS = 4
+
+# Message types (first byte of every datagram)
+HELLO, WELCOME, INPUT, SNAPSHOT, BYE = range(1, 6)
+
+HELLO_PACKET = struct.Struct("<BB")  # type, protocol version
+WELCOME_PACKET = struct.Struct("<BHIBBB")  # type, player id, seed, difficulty, tick rate, snapshot rate
+INPUT_PACKET = struct.Struct("<BIBBB")  # type, acked tick, held keys, craft sequence, craft index
+SNAPSHOT_HEADER = struct.Struct("<BIIHIIB")  # type, tick, baseline tick, wave, score, time (ms), flags
+UDP_OVERHEAD = 28  # IPv4 + UDP headers, for wire-size estimates
+
+GAME_OVER = 1  # Snapshot flag: every player is down
+
+# Held keys travel as one bitmask byte
+KEY_BITS = (pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT,
+            pygame.K_f, pygame.K_SPACE, pygame.K_e)
+
+# Positions travel as int16 half pixels; small moves as int8 deltas
+POSITION_SCALE = 2
+
+# Small enumerations are sent as indexes into these
+DIRECTIONS = ("down", "up", "left", "right")
+ENEMY_STATES = ("idle", "chase", "attack")
+TOOLS = (None, "energy_sword", "data_shield", "hack_tool")
+RESOURCE_NAMES = ("code_fragments", "energy_cores", "data_shards")
+
+# Snapshot layout: entity kind -> (fields, struct codes). Every kind starts
+# with x, y so records can switch both to one-byte deltas. Kinds are encoded
+# in this order.
+SCHEMA = {
+    "players": (("x", "y", "health", "max_health", "energy", "shield", "direction",
+                 "tool", "durability") + RESOURCE_NAMES, "hhHHBBBBBHHH"),
+    "enemies": (("x", "y", "health", "max_health", "state"), "hhHHB"),
+    "projectiles": (("x", "y"), "hh"),
+    "resources": (("x", "y", "sprite"), "hhB"),
+    "power_ups": (("x", "y", "sprite"), "hhB"),
+}
+
+# Entity kinds that live in the ECS store, and their archetypes
+KIND_ARCHETYPES = {"projectiles": "projectile", "resources": "resource", "power_ups": "power_up"}
+
+# Largest value each struct code can carry; quantized values are clamped
+LIMITS = {"h": (-32768, 32767), "H": (0, 65535), "B": (0, 255)}
+
+HISTORY = 64  # Snapshots either side keeps as possible delta baselines
+CLIENT_TIMEOUT = 5.0  # Seconds of silence before the server drops a client
+
+_structs = {}
+
+
+def packer(fmt):
+    """Cached struct.Struct for a little-endian format."""
+    packed = _structs.get(fmt)
+    if packed is None:
+        packed = _structs[fmt] = struct.Struct("<" + fmt)
+    return packed
+
+
+def quantize(value, code, scale=1):
+    low, high = LIMITS[code]
+    return min(high, max(low, int(round(value * scale))))
+
+
+def keys_to_bits(keys):
+    """Pack held keys (anything indexable by key constant) into a byte."""
+    bits = 0
+    for bit, key in enumerate(KEY_BITS):
+        if keys[key]:
+            bits |= 1 << bit
+    return bits
+
+
+class InputKeys:
+    """Stand-in for pygame.key.get_pressed() built from an input bitmask."""
+
+    def __init__(self, bits=0):
+        self.bits = bits
+
+    def __getitem__(self, key):
+        try:
+            return bool(self.bits & (1 << KEY_BITS.index(key)))
+        except ValueError:
+            return False
+
+
+# Snapshot encoding. A snapshot is a dict with "tick", "wave", "score",
+# "time", "flags" and one {id: tuple of quantized values} dict per kind.
+
+def pack_count(out, count):
+    """Append a count: one byte, or 255 and a uint16."""
+    if count < 255:
+        out.append(count)
+    else:
+        out += packer("BH").pack(255, count)
+
+
+def unpack_count(data, offset):
+    count = data[offset]
+    if count < 255:
+        return count, offset + 1
+    return packer("H").unpack_from(data, offset + 1)[0], offset + 3
+
+
+def gap_format(gap):
+    """Ids are sent sorted, as gaps from the previous id (usually one byte)."""
+    return ("B", (gap,)) if gap < 255 else ("BI", (255, gap))
+
+
+def encode_snapshot(snapshot, baseline=None):
+    """Encode a snapshot as a delta against a baseline (None: full)."""
+    base_tick = baseline["tick"] if baseline else 0
+    out = bytearray(SNAPSHOT_HEADER.pack(SNAPSHOT, snapshot["tick"], base_tick, snapshot["wave"],
+                                         snapshot["score"], snapshot["time"], snapshot["flags"]))
+    for kind, (fields, codes) in SCHEMA.items():
+        current = snapshot[kind]
+        previous = baseline[kind] if baseline else {}
+        zeros = (0,) * len(fields)
+        small_bit = 1 << len(fields)
+        mask_code = "B" if len(fields) < 8 else "H"
+
+        # Removed ids
+        removed = sorted(previous.keys() - current.keys())
+        pack_count(out, len(removed))
+        last = 0
+        for entity_id in removed:
+            fmt, values = gap_format(entity_id - last)
+            out += packer(fmt).pack(*values)
+            last = entity_id
+
+        # New and changed entities; new ones are diffed against all zeros
+        changed = [(entity_id, current[entity_id], previous.get(entity_id, zeros))
+                   for entity_id in sorted(current)
+                   if current[entity_id] != previous.get(entity_id)]
+        pack_count(out, len(changed))
+        last = 0
+        for entity_id, values, base in changed:
+            gap_fmt, gap = gap_format(entity_id - last)
+            last = entity_id
+
+            dx, dy = values[0] - base[0], values[1] - base[1]
+            small = entity_id in previous and -128 <= dx <= 127 and -128 <= dy <= 127
+            mask = small_bit if small else 0
+            field_fmt = ""
+            items = []
+            for index, (value, old) in enumerate(zip(values, base)):
+                if value != old:
+                    mask |= 1 << index
+                    if small and index < 2:
+                        field_fmt += "b"
+                        items.append(value - old)
+                    else:
+                        field_fmt += codes[index]
+                        items.append(value)
+            out += packer(gap_fmt + mask_code + field_fmt).pack(*gap, mask, *items)
+    return bytes(out)
+
+
+def decode_snapshot(data, baselines):
+    """Decode a snapshot packet against the stored baselines.
+
+    Returns None if the packet's baseline is no longer stored; the client
+    keeps acknowledging its newest snapshot, so the server soon sends a
+    delta it can use.
+    """
+    _, tick, base_tick, wave, score, time_ms, flags = SNAPSHOT_HEADER.unpack_from(data)
+    baseline = None
+    if base_tick:
+        baseline = baselines.get(base_tick)
+        if baseline is None:
+            return None
+
+    snapshot = {"tick": tick, "wave": wave, "score": score, "time": time_ms, "flags": flags}
+    offset = SNAPSHOT_HEADER.size
+    for kind, (fields, codes) in SCHEMA.items():
+        entities = dict(baseline[kind]) if baseline else {}
+        zeros = (0,) * len(fields)
+        small_bit = 1 << len(fields)
+        mask_code = "B" if len(fields) < 8 else "H"
+        mask_size = packer(mask_code).size
+
+        count, offset = unpack_count(data, offset)
+        last = 0
+        for _ in range(count):
+            gap, offset = unpack_gap(data, offset)
+            last += gap
+            entities.pop(last, None)
+
+        count, offset = unpack_count(data, offset)
+        last = 0
+        for _ in range(count):
+            gap, offset = unpack_gap(data, offset)
+            last += gap
+            mask = packer(mask_code).unpack_from(data, offset)[0]
+            offset += mask_size
+
+            small = mask & small_bit
+            changed = [index for index in range(len(fields)) if mask & (1 << index)]
+            fmt = "".join("b" if small and index < 2 else codes[index] for index in changed)
+            items = packer(fmt).unpack_from(data, offset)
+            offset += packer(fmt).size
+
+            values = list(entities.get(last, zeros))
+            for index, value in zip(changed, items):
+                values[index] = values[index] + value if small and index < 2 else value
+            entities[last] = tuple(values)
+        snapshot[kind] = entities
+    return snapshot
+
+
+def unpack_gap(data, offset):
+    gap = data[offset]
+    if gap < 255:
+        return gap, offset + 1
+    return packer("I").unpack_from(data, offset + 1)[0], offset + 5
+
+
+def interpolate(old, new, alpha):
+    """Blend two decoded snapshots into a render state with pixel positions.
+
+    Entities only in ``new`` appear at their new position; everything but
+    position is taken from ``new``.
+    """
+    state = {key: new[key] for key in ("tick", "wave", "score", "time", "flags")}
+    for kind in SCHEMA:
+        previous = old[kind]
+        entities = {}
+        for entity_id, values in new[kind].items():
+            before = previous.get(entity_id)
+            x, y = values[0], values[1]
+            if before is not None:
+                x = before[0] + (x - before[0]) * alpha
+                y = before[1] + (y - before[1]) * alpha
+            entities[entity_id] = (x / POSITION_SCALE, y / POSITION_SCALE) + values[2:]
+        state[kind] = entities
+    return state
+
+
+class RemoteClient:
+    """Server-side record of one connected client."""
+
+    def __init__(self, address, player_id, player, now):
+        self.address = address
+        self.player_id = player_id
+        self.player = player
+        self.keys = InputKeys()
+        self.acked = 0  # Newest snapshot tick the client confirmed
+        self.craft_sequence = 0
+        self.last_heard = now
+
+        # Traffic counters for the report
+        self.bytes_sent = 0
+        self.packets_sent = 0
+        self.full_snapshots = 0
+        self.bytes_received = 0
+
+
+class NetServer:
+    """Runs the authoritative simulation and streams snapshots to clients.
+
+    ``tick()`` advances one fixed simulation step; ``serve_forever`` calls it
+    in real time. The simulation only runs while someone is connected, and
+    starts a fresh session once the last client leaves.
+    """
+
+    def __init__(self, host="0.0.0.0", port=7777, seed=0, difficulty="Normal",
+                 tick_rate=60, snapshot_rate=20, loss=0.0):
+        import headless  # A server never opens a window
+        self.quiet = headless.quiet
+        self.start_session = headless.start_session
+
+        self.seed = seed
+        self.difficulty = difficulty
+        self.tick_rate = tick_rate
+        self.snapshot_rate = snapshot_rate
+        self.snapshot_interval = max(1, round(tick_rate / snapshot_rate))
+        self.loss = loss  # Fraction of snapshots dropped on purpose (testing)
+        self.loss_random = random.Random(seed)  # Kept apart from the game's RNG
+
+        self.game = headless.create_game()
+        self.start_session(self.game, seed, difficulty)
+
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.socket.setblocking(False)
+        self.address = self.socket.getsockname()
+
+        self.clients = {}  # address -> RemoteClient
+        self.next_player_id = 1
+        self.enemy_ids = weakref.WeakKeyDictionary()  # Enemy -> network id
+        self.next_enemy_id = 1
+
+        self.tick_count = 0
+        self.history = {}  # tick -> captured snapshot
+        self.game_over = False
+
+        # Tick cost in seconds, for the report
+        self.simulate_times = deque(maxlen=3600)
+        self.snapshot_times = deque(maxlen=3600)
+
+    def now(self):
+        """Server time in seconds, counted in ticks."""
+        return self.tick_count / self.tick_rate
+
+    def tick(self):
+        """Receive input, advance the simulation and maybe send snapshots."""
+        self.receive()
+        self.tick_count += 1
+        self.drop_silent_clients()
+
+        if self.clients and not self.game_over:
+            if all(client.player.health <= 0 for client in self.clients.values()):
+                self.game_over = True
+                print(f"Game over: score {self.game.score}, wave {self.game.wave_number}")
+        if self.clients and not self.game_over:
+            started = time.perf_counter()
+            with self.quiet():
+                self.simulate(1 / self.tick_rate)
+            self.simulate_times.append(time.perf_counter() - started)
+
+        if self.clients and self.tick_count % self.snapshot_interval == 0:
+            started = time.perf_counter()
+            self.broadcast()
+            self.snapshot_times.append(time.perf_counter() - started)
+
+    def serve_forever(self, status_interval=10.0):
+        """Tick in real time until interrupted, printing a status line now and then."""
+        print(f"Serving co-op on {self.address[0]}:{self.address[1]} "
+              f"(seed {self.seed}, {self.difficulty}, {self.snapshot_rate} snapshots/s)")
+        period = 1 / self.tick_rate
+        next_tick = time.perf_counter()
+        next_status = next_tick + status_interval
+        sent = 0
+        while True:
+            self.tick()
+            now = time.perf_counter()
+            if now >= next_status:
+                total = sum(client.bytes_sent for client in self.clients.values())
+                rate = (total - sent) / status_interval / max(1, len(self.clients))
+                sent = total
+                tick_ms = statistics.fmean(self.simulate_times) * 1000 if self.simulate_times else 0
+                print(f"{len(self.clients)} client(s), {len(self.game.enemies)} enemies, "
+                      f"{rate / 1024:.2f} KB/s per client, {tick_ms:.2f} ms per tick")
+                next_status = now + status_interval
+            next_tick += period
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()  # Fell behind; don't try to catch up
+
+    def receive(self):
+        """Handle every datagram waiting on the socket."""
+        while True:
+            try:
+                data, address = self.socket.recvfrom(2048)
+            except BlockingIOError:
+                return
+            except ConnectionResetError:
+                continue  # Windows reports ICMP port-unreachable this way
+            if not data:
+                continue
+
+            kind = data[0]
+            client = self.clients.get(address)
+            if kind == HELLO and len(data) == HELLO_PACKET.size:
+                if HELLO_PACKET.unpack(data)[1] == PROTOCOL_VERSION:
+                    self.welcome(address)
+            elif kind == INPUT and client and len(data) == INPUT_PACKET.size:
+                _, acked, bits, craft_sequence, craft_index = INPUT_PACKET.unpack(data)
+                client.last_heard = self.now()
+                client.bytes_received += len(data)
+                client.keys = InputKeys(bits)
+                if acked in self.history:
+                    client.acked = max(client.acked, acked)
+                if craft_sequence != client.craft_sequence:
+                    client.craft_sequence = craft_sequence
+                    self.craft(client, craft_index)
+            elif kind == BYE and client:
+                self.remove_client(address)
+
+    def welcome(self, address):
+        """Admit a new client (or re-send a lost welcome)."""
+        client = self.clients.get(address)
+        if client is None:
+            if len(self.clients) >= MAX_PLAYERS:
+                print(f"Refused {address[0]}:{address[1]}: server full")
+                return
+            with self.quiet():
+                player = self.game.create_player(*self.spawn_position())
+            client = RemoteClient(address, self.next_player_id, player, self.now())
+            self.next_player_id += 1
+            self.clients[address] = client
+            print(f"Player {client.player_id} joined from {address[0]}:{address[1]}")
+
+        packet = WELCOME_PACKET.pack(WELCOME, client.player_id, self.seed,
+                                     DIFFICULTIES.index(self.difficulty),
+                                     self.tick_rate, self.snapshot_rate)
+        self.send(client, packet)
+
+    def spawn_position(self):
+        """A free spot near the centre that no other player stands on."""
+        center_x, center_y = WIDTH // 2 - TILE_SIZE // 2, HEIGHT // 2 - TILE_SIZE // 2
+        world = self.game.world_generator
+        taken = [(client.player.x, client.player.y) for client in self.clients.values()]
+        for dx, dy in ((0, 0), (-64, 0), (64, 0), (0, -64), (0, 64), (-64, -64), (64, 64)):
+            x, y = center_x + dx, center_y + dy
+            rect = pygame.Rect(x, y, TILE_SIZE, TILE_SIZE)
+            if ((x, y) not in taken and world.is_valid_position(x, y)
+                    and not any(obj.collides_with(rect) for obj in world.objects)):
+                return x, y
+        return center_x, center_y
+
+    def remove_client(self, address):
+        client = self.clients.pop(address)
+        print(f"Player {client.player_id} left")
+        if not self.clients:
+            # Next group starts a fresh run on the same world
+            self.start_session(self.game, self.seed, self.difficulty)
+            self.history.clear()
+            self.game_over = False
+
+    def drop_silent_clients(self):
+        now = self.now()
+        for address, client in list(self.clients.items()):
+            if now - client.last_heard > CLIENT_TIMEOUT:
+                self.remove_client(address)
+
+    def craft(self, client, index):
+        if client.player.health <= 0:
+            return
+        game = self.game
+        game.player = client.player
+        with self.quiet():
+            game.handle_crafting_selection(index)
+
+    def simulate(self, dt):
+        """One fixed step: every living player acts on their keys, then the
+        shared world (waves, enemies, pickups, projectiles) updates once."""
+        game = self.game
+        players = [client.player for client in self.clients.values()]
+        living = [player for player in players if player.health > 0]
+
+        game.clock.advance(dt)
+        for client in self.clients.values():
+            if client.player.health <= 0:
+                continue
+            game.player = client.player
+            game.update_player(client.keys)
+            game.check_resource_collection()
+            game.check_power_up_collection()
+
+        # Enemies chase whichever living player is nearest
+        game.player = living[0]
+        game.allies = [player for player in players if player is not living[0]]
+        game.update_game_world(dt)
+
+    def capture(self):
+        """Quantize the world into a snapshot."""
+        game = self.game
+        scale = POSITION_SCALE
+        snapshot = {"tick": self.tick_count, "wave": quantize(game.wave_number, "H"),
+                    "score": max(0, int(game.score)), "time": int(game.survival_time * 1000),
+                    "flags": GAME_OVER if self.game_over else 0}
+
+        players = {}
+        for client in self.clients.values():
+            player = client.player
+            tool = player.equipped_tool
+            players[client.player_id] = (
+                quantize(player.x, "h", scale), quantize(player.y, "h", scale),
+                quantize(player.health, "H"), quantize(player.max_health, "H"),
+                quantize(player.energy, "B"), quantize(player.shield, "B"),
+                DIRECTIONS.index(player.direction) if player.direction in DIRECTIONS else 0,
+                TOOLS.index(tool["name"]) if tool and tool["name"] in TOOLS else 0,
+                quantize(tool["durability"], "B") if tool else 0,
+            ) + tuple(quantize(player.inventory.get(name, 0), "H") for name in RESOURCE_NAMES)
+        snapshot["players"] = players
+
+        enemies = {}
+        for enemy in game.enemies:
+            if not enemy.active:
+                continue
+            enemy_id = self.enemy_ids.get(enemy)
+            if enemy_id is None:
+                enemy_id = self.enemy_ids[enemy] = self.next_enemy_id
+                self.next_enemy_id += 1
+            enemies[enemy_id] = (
+                quantize(enemy.x, "h", scale), quantize(enemy.y, "h", scale),
+                quantize(enemy.health, "H"), quantize(enemy.max_health, "H"),
+                ENEMY_STATES.index(enemy.state) if enemy.state in ENEMY_STATES else 0)
+        snapshot["enemies"] = enemies
+
+        for kind, archetype_name in KIND_ARCHETYPES.items():
+            archetype = game.entities.archetypes[archetype_name]
+            columns = archetype.columns
+            xs, ys = columns["x"], columns["y"]
+            sprites = columns["sprite"]
+            with_sprite = kind != "projectiles"
+            snapshot[kind] = {
+                archetype.entity_ids[row]:
+                    (quantize(xs[row], "h", scale), quantize(ys[row], "h", scale))
+                    + ((quantize(sprites[row], "B"),) if with_sprite else ())
+                for row in range(len(archetype))}
+        return snapshot
+
+    def broadcast(self):
+        """Capture a snapshot and send each client its delta."""
+        snapshot = self.capture()
+        self.history[snapshot["tick"]] = snapshot
+        oldest = snapshot["tick"] - HISTORY * self.snapshot_interval
+        for tick in [tick for tick in self.history if tick <= oldest]:
+            del self.history[tick]
+
+        for client in self.clients.values():
+            baseline = self.history.get(client.acked)
+            packet = encode_snapshot(snapshot, baseline)
+            if baseline is None:
+                client.full_snapshots += 1
+            if self.loss and self.loss_random.random() < self.loss:
+                # Counted as sent: the bandwidth was spent, the packet was lost
+                client.bytes_sent += len(packet)
+                client.packets_sent += 1
+                continue
+            self.send(client, packet)
+
+    def send(self, client, packet):
+        client.bytes_sent += len(packet)
+        client.packets_sent += 1
+        try:
+            self.socket.sendto(packet, client.address)
+        except OSError as e:
+            print(f"Warning: could not send to {client.address[0]}:{client.address[1]}: {e}")
+
+    def close(self):
+        self.socket.close()
+
+
+class NetClient:
+    """Connects to a server, sends held keys and keeps decoded snapshots.
+
+    ``update(bits, now)`` is called every frame; ``view(now)`` returns the
+    world interpolated ``interp_delay`` seconds behind the newest snapshot.
+    """
+
+    def __init__(self, address, interp_delay=None, input_rate=30):
+        self.server = address
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.connect(address)
+        self.socket.setblocking(False)
+
+        self.interp_delay = interp_delay  # None: two snapshot intervals
+        self.input_interval = 1 / input_rate
+
+        self.player_id = None
+        self.seed = None
+        self.difficulty = None
+        self.tick_rate = None
+        self.snapshot_rate = None
+
+        self.snapshots = {}  # tick -> decoded snapshot (delta baselines)
+        self.timeline = deque(maxlen=32)  # Newest snapshots in tick order
+        self.latest_received = 0.0  # Local time the newest snapshot arrived
+        self.bits = 0
+        self.last_input = None
+        self.craft_sequence = 0
+        self.craft_index = 0
+
+        # Counters for the report
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.dropped = 0  # Snapshots whose baseline was gone
+        self.decode_times = deque(maxlen=3600)
+
+    @property
+    def connected(self):
+        return self.player_id is not None
+
+    @property
+    def latest(self):
+        return self.timeline[-1] if self.timeline else None
+
+    def hello(self):
+        self.send(HELLO_PACKET.pack(HELLO, PROTOCOL_VERSION))
+
+    def connect(self, timeout=5.0):
+        """Say hello until the server welcomes us; False on timeout."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self.hello()
+            retry = time.monotonic() + 0.25
+            while time.monotonic() < retry:
+                self.poll(time.monotonic())
+                if self.connected:
+                    return True
+                time.sleep(0.01)
+        return False
+
+    def craft(self, index):
+        """Ask the server to craft recipe ``index`` (repeated until acked by
+        the next input packets, so it survives packet loss)."""
+        self.craft_sequence = (self.craft_sequence + 1) % 256
+        self.craft_index = index
+        self.last_input = None  # Send right away
+
+    def update(self, bits, now):
+        """Read snapshots and send input when keys change or it is due."""
+        self.poll(now)
+        if not self.connected:
+            return
+        if (bits != self.bits or self.last_input is None
+                or now - self.last_input >= self.input_interval):
+            self.bits = bits
+            self.last_input = now
+            acked = self.latest["tick"] if self.latest else 0
+            self.send(INPUT_PACKET.pack(INPUT, acked, bits, self.craft_sequence, self.craft_index))
+
+    def poll(self, now):
+        """Handle every datagram waiting on the socket."""
+        while True:
+            try:
+                data = self.socket.recv(65536)
+            except (BlockingIOError, ConnectionRefusedError, ConnectionResetError):
+                return
+            self.bytes_received += len(data)
+            if not data:
+                continue
+            if data[0] == WELCOME and len(data) == WELCOME_PACKET.size:
+                (_, self.player_id, self.seed, difficulty,
+                 self.tick_rate, self.snapshot_rate) = WELCOME_PACKET.unpack(data)
+                self.difficulty = DIFFICULTIES[difficulty]
+                if self.interp_delay is None:
+                    self.interp_delay = 2 / self.snapshot_rate
+            elif data[0] == SNAPSHOT and self.connected:
+                self.receive_snapshot(data, now)
+
+    def receive_snapshot(self, data, now):
+        started = time.perf_counter()
+        snapshot = decode_snapshot(data, self.snapshots)
+        self.decode_times.append(time.perf_counter() - started)
+        if snapshot is None:
+            self.dropped += 1
+            return
+
+        tick = snapshot["tick"]
+        self.snapshots[tick] = snapshot
+        if len(self.snapshots) > HISTORY:
+            del self.snapshots[min(self.snapshots)]
+        # Late packets still serve as baselines but never move time backwards
+        if not self.timeline or tick > self.timeline[-1]["tick"]:
+            self.timeline.append(snapshot)
+            self.latest_received = now
+
+    def view(self, now):
+        """World state at render time, or None before the first snapshot."""
+        if not self.timeline:
+            return None
+        latest = self.timeline[-1]
+        render_tick = (latest["tick"] + (now - self.latest_received) * self.tick_rate
+                       - self.interp_delay * self.tick_rate)
+
+        old = new = latest
+        for snapshot in reversed(self.timeline):
+            if snapshot["tick"] <= render_tick:
+                old = snapshot
+                break
+            new = snapshot
+        else:
+            old = new  # Render time is before everything we have
+        span = new["tick"] - old["tick"]
+        alpha = (render_tick - old["tick"]) / span if span else 1.0
+        return interpolate(old, new, min(1.0, max(0.0, alpha)))
+
+    def send(self, packet):
+        self.bytes_sent += len(packet)
+        try:
+            self.socket.send(packet)
+        except OSError:
+            pass  # Nobody listening yet; hello is retried
+
+    def close(self):
+        if self.connected:
+            self.send(bytes((BYE,)))
+        self.socket.close()
+
+
+class ClientView:
+    """Mirrors interpolated states into a local Game so the normal gameplay
+    renderer can draw them. The client's Game never simulates anything."""
+
+    def __init__(self, game, player_id):
+        self.game = game
+        self.player_id = player_id
+        self.players = {}  # player id -> Player
+        self.enemies = {}  # enemy id -> Enemy
+        self.local_ids = {kind: {} for kind in KIND_ARCHETYPES}  # server id -> local entity id
+        self.keys = InputKeys()
+
+    def start(self, seed):
+        """Build the server's world locally; it is generated from the seed."""
+        game = self.game
+        game.rng.seed(seed)
+        game.clock.reset()
+        game.player = None
+        game.initialize_game_world()
+        game.enemies = []
+        game.entities.clear()
+        game.effects_list = []
+        self.players = {self.player_id: game.player}
+
+    def apply(self, state, dt):
+        """Update the local Game from an interpolated state."""
+        game = self.game
+        game.clock.advance(dt)
+
+        if game.wave_number and state["wave"] > game.wave_number:
+            game.add_effect("text", WIDTH // 2, HEIGHT // 2, text=f"WAVE {state['wave']}",
+                            color=NEON_BLUE, size=60, duration=2.0)
+        game.wave_number = state["wave"]
+        game.score = state["score"]
+        game.survival_time = state["time"] / 1000
+
+        self.apply_players(state["players"])
+        self.apply_enemies(state["enemies"])
+        for kind in KIND_ARCHETYPES:
+            self.apply_entities(kind, state[kind])
+
+        # Purely visual systems still run locally (local explosions and text
+        # effects expire on timers of the local clock)
+        pulse_system(game.entities)
+
+    def apply_players(self, players):
+        game = self.game
+        for player_id in [player_id for player_id in self.players if player_id not in players]:
+            if player_id != self.player_id:
+                del self.players[player_id]
+
+        for player_id, values in players.items():
+            player = self.players.get(player_id)
+            if player is None:
+                player = Player(game.player_sprite_sheet, values[0], values[1], clock=game.clock)
+                self.players[player_id] = player
+            (x, y, player.health, player.max_health, player.energy, player.shield,
+             direction, tool, durability) = values[:9]
+            moving = (x, y) != (player.x, player.y)
+            player.x, player.y = x, y
+            player.direction = DIRECTIONS[direction]
+            player.inventory = dict(zip(RESOURCE_NAMES, values[9:]))
+            name = TOOLS[tool]
+            player.equipped_tool = {"name": name, "stats": player.crafting_recipes[name]["stats"],
+                                    "durability": durability} if name else None
+            player.animate(moving, self.keys, ())
+
+        game.player = self.players[self.player_id]
+        game.allies = [player for player_id, player in self.players.items()
+                       if player_id != self.player_id]
+
+    def apply_enemies(self, enemies):
+        game = self.game
+        for enemy_id in [enemy_id for enemy_id in self.enemies if enemy_id not in enemies]:
+            enemy = self.enemies.pop(enemy_id)
+            game.add_effect("explosion", enemy.x, enemy.y)
+
+        for enemy_id, (x, y, health, max_health, state) in enemies.items():
+            enemy = self.enemies.get(enemy_id)
+            if enemy is None:
+                enemy = self.enemies[enemy_id] = Enemy(game.enemy_sprite_sheet, x, y, clock=game.clock)
+            enemy.x, enemy.y = x, y
+            enemy.health, enemy.max_health = health, max_health
+            enemy.state = ENEMY_STATES[state]
+            enemy.animate()
+        game.enemies = list(self.enemies.values())
+
+    def apply_entities(self, kind, entities):
+        store = self.game.entities
+        local_ids = self.local_ids[kind]
+        for server_id in [server_id for server_id in local_ids if server_id not in entities]:
+            store.despawn(local_ids.pop(server_id))
+
+        archetype = KIND_ARCHETYPES[kind]
+        for server_id, values in entities.items():
+            local_id = local_ids.get(server_id)
+            if local_id is None:
+                if archetype == "projectile":
+                    extra = {"width": 5, "height": 5}
+                elif archetype == "resource":
+                    extra = {"sprite": values[2], "pulse_dir": 1}
+                else:
+                    extra = {"sprite": values[2]}  # Server expires them
+                local_ids[server_id] = store.spawn(archetype, x=values[0], y=values[1], **extra)
+            else:
+                store.move(local_id, values[0], values[1])
+
+
+def run_client(host, port):
+    """Join a server in a window: arrows move, F fires, SPACE attacks,
+    E uses the tool, 1-3 craft, ESC leaves."""
+    game = Game(headless=True)  # In-memory settings, no leaderboard
+    game.asset_loader.wait()
+    client = NetClient((host, port))
+    print(f"Connecting to {host}:{port}...")
+    if not client.connect():
+        print("No answer from the server (unreachable or full)")
+        return 1
+
+    view = ClientView(game, client.player_id)
+    view.start(client.seed)
+    pygame.display.set_caption(f"CodeBreak co-op - player {client.player_id}")
+    game_over_text = game.font_xl.render("GAME OVER", True, RED)
+
+    while True:
+        dt = game.frame_clock.tick(game.FPS) / 1000
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN
+                                             and event.key == pygame.K_ESCAPE):
+                client.close()
+                return 0
+            if event.type == pygame.KEYDOWN and event.key in (pygame.K_1, pygame.K_2, pygame.K_3):
+                client.craft(event.key - pygame.K_1)
+
+        now = time.monotonic()
+        client.update(keys_to_bits(pygame.key.get_pressed()), now)
+        state = client.view(now)
+        if state is None:
+            continue
+        view.apply(state, dt)
+        game.draw_gameplay_elements()
+        if state["flags"] & GAME_OVER:
+            game.screen.blit(game_over_text, game_over_text.get_rect(center=(WIDTH // 2, HEIGHT // 2)))
+        pygame.display.flip()
+
+
+def run_selftest(clients=2, seconds=60.0, snapshot_rate=20, enemies=30, loss=0.0, seed=0):
+    """Run a server and bot clients over localhost in lockstep and report
+    bandwidth and tick cost. Players cannot die, so the world stays busy."""
+    server = NetServer("127.0.0.1", 0, seed=seed, snapshot_rate=snapshot_rate, loss=loss)
+    game = server.game
+    bots = [NetClient(server.address) for _ in range(clients)]
+    bot_random = random.Random(seed)
+    moves = [()] + [(key,) for key in KEY_BITS[:4]] + [(KEY_BITS[0], KEY_BITS[2]),
+                                                      (KEY_BITS[1], KEY_BITS[3])]
+    held = [0] * clients
+
+    for bot in bots:
+        bot.hello()
+    server.tick()
+    for bot in bots:
+        bot.poll(0.0)
+    if not all(bot.connected for bot in bots):
+        print("Bots could not connect")
+        return 1
+    for client in server.clients.values():
+        client.player.is_invincible = True
+        client.player.invincibility_duration = float("inf")
+
+    ticks = int(seconds * server.tick_rate)
+    mismatches = 0
+    full_sizes = []
+    enemy_counts = []
+    started = time.perf_counter()
+    for tick in range(ticks):
+        now = server.now()
+        for index, bot in enumerate(bots):
+            # Wander, changing direction every half second, always firing
+            if tick % (server.tick_rate // 2) == 0:
+                bits = 1 << KEY_BITS.index(pygame.K_f)
+                for key in bot_random.choice(moves):
+                    bits |= 1 << KEY_BITS.index(key)
+                held[index] = bits
+            bot.update(held[index], now)
+
+        # Keep a crowd on screen
+        while len(game.enemies) < enemies:
+            with server.quiet():
+                game.spawn_wave_enemy(game.wave_spawner.take())
+        enemy_counts.append(len(game.enemies))
+
+        server.tick()
+        if server.tick_count % server.snapshot_interval == 0:
+            full_sizes.append(len(encode_snapshot(server.history[server.tick_count])))
+            # Every decoded snapshot must match what the server captured
+            for bot in bots:
+                bot.poll(server.now())
+                latest = bot.latest
+                if latest and latest["tick"] in server.history and latest != server.history[latest["tick"]]:
+                    mismatches += 1
+    elapsed = time.perf_counter() - started
+
+    game_seconds = ticks / server.tick_rate
+    remotes = list(server.clients.values())
+    print(f"Self-test: {clients} client(s), {game_seconds:.0f}s of game time at "
+          f"{server.tick_rate} ticks/s, {snapshot_rate} snapshots/s, "
+          f"{statistics.fmean(enemy_counts):.0f} enemies on average, {loss:.0%} loss "
+          f"(ran in {elapsed:.1f}s)")
+    print()
+    print("Bandwidth per client (server -> client)")
+    for remote in remotes:
+        wire = remote.bytes_sent + remote.packets_sent * UDP_OVERHEAD
+        print(f"  player {remote.player_id}: {remote.bytes_sent / game_seconds / 1024:6.2f} KB/s payload, "
+              f"{wire / game_seconds / 1024:6.2f} KB/s on the wire, "
+              f"{remote.bytes_sent / remote.packets_sent:5.0f} B/packet, "
+              f"{remote.full_snapshots} full snapshot(s)")
+    full = statistics.fmean(full_sizes)
+    print(f"  full snapshots would be {full:.0f} B/packet "
+          f"({full * snapshot_rate / 1024:.2f} KB/s payload)")
+    upstream = statistics.fmean(remote.bytes_received for remote in remotes)
+    print(f"  input (client -> server): {upstream / game_seconds / 1024:.2f} KB/s")
+    print()
+    print("Server tick cost")
+    simulate_ms = sorted(t * 1000 for t in server.simulate_times)
+    snapshot_ms = sorted(t * 1000 for t in server.snapshot_times)
+    budget = 1000 / server.tick_rate
+    print(f"  simulation: {statistics.fmean(simulate_ms):.3f} ms mean, "
+          f"{simulate_ms[int(len(simulate_ms) * 0.99)]:.3f} ms p99 "
+          f"({statistics.fmean(simulate_ms) / budget:.0%} of the {budget:.1f} ms tick)")
+    print(f"  snapshots:  {statistics.fmean(snapshot_ms):.3f} ms mean per broadcast, "
+          f"{snapshot_ms[int(len(snapshot_ms) * 0.99)]:.3f} ms p99 "
+          f"(capture + {clients} delta encode(s) + send)")
+    decode_us = [t * 1e6 for bot in bots for t in bot.decode_times]
+    print(f"  client decode: {statistics.fmean(decode_us):.0f} us mean per snapshot")
+    print(f"  decoded snapshots differing from the server: {mismatches}, "
+          f"undecodable: {sum(bot.dropped for bot in bots)}")
+
+    for bot in bots:
+        bot.close()
+    server.tick()
+    server.close()
+    return 0 if mismatches == 0 else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Server-authoritative co-op over UDP.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="host a co-op game")
+    serve.add_argument("--host", default="0.0.0.0")
+    serve.add_argument("--port", type=int, default=7777)
+    serve.add_argument("--seed", type=int, default=None, help="world seed (default: random)")
+    serve.add_argument("--difficulty", choices=DIFFICULTIES, default="Normal")
+    serve.add_argument("--snapshot-rate", type=int, default=20, help="snapshots per second")
+
+    join = commands.add_parser("join", help="join a game, e.g. join 192.168.1.5:7777")
+    join.add_argument("address")
+
+    selftest = commands.add_parser("selftest", help="measure bandwidth and tick cost on localhost")
+    selftest.add_argument("--clients", type=int, default=2)
+    selftest.add_argument("--seconds", type=float, default=60.0, help="game seconds to simulate")
+    selftest.add_argument("--snapshot-rate", type=int, default=20)
+    selftest.add_argument("--enemies", type=int, default=30, help="enemies kept alive")
+    selftest.add_argument("--loss", type=float, default=0.0, help="fraction of snapshots dropped")
+    selftest.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+        server = NetServer(args.host, args.port, seed, args.difficulty,
+                           snapshot_rate=args.snapshot_rate)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+        return 0
+    if args.command == "join":
+        host, _, port = args.address.rpartition(":")
+        if not host or not port.isdigit():
+            parser.error("address must be HOST:PORT")
+        return run_client(host, int(port))
+    if not 1 <= args.clients <= MAX_PLAYERS:
+        parser.error(f"--clients must be between 1 and {MAX_PLAYERS}")
+    return run_selftest(args.clients, args.seconds, args.snapshot_rate, args.enemies,
+                        args.loss, args.seed)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+# placement.py
+# Spawn placement for pickups. When a world is built, the tiles the player
+# can actually reach (free of blocks and world objects, connected to the
+# player's start) are found once, and an evenly spread Poisson-disk set of
+# spots is sampled on them. Spawning then picks among those spots, skipping
+# the ones in the safe zone around the player, with a fixed worst-case cost.
+import math
+import random
+import zlib
+
+from spatial import SpatialGrid
+
+
+class SpawnPlacer:
+    """Pickup spawn spots on reachable ground, with a player safe zone.
+
+    Spots are top-left positions whose ``footprint``-sized square lies on
+    reachable tiles, at least ``spacing`` apart, inside ``bounds``.
+    ``safe_radius`` is the exclusion zone kept around the player; it is
+    updated incrementally, touching only the spots near its old and new
+    position. Spawn picks draw from ``rng`` (the game's generator; default:
+    the random module).
+    """
+
+    def __init__(self, world, bounds, start, spacing=48, footprint=32, safe_radius=150,
+                 attempts=8, rng=None):
+        self.world = world
+        self.rng = rng if rng is not None else random
+        self.bounds = bounds
+        self.spacing = spacing
+        self.footprint = footprint
+        self.safe_radius = safe_radius
+        self.attempts = attempts
+
+        self.reachable = self.find_reachable(start)
+        self.spots = self.sample_spots()
+
+        # Spot index -> spot, for zone updates and nearest-spot lookups
+        self.spot_grid = SpatialGrid(spacing * 2)
+        for index, (x, y) in enumerate(self.spots):
+            self.spot_grid.insert(index, x, y)
+
+        self.free = set(range(len(self.spots)))  # Spots outside the safe zone
+        self.zone = None  # Last safe zone centre
+        self.zone_spots = set()
+
+    def blocked_tiles(self):
+        """Tiles covered by blocks or world objects."""
+        world = self.world
+        size = world.tile_size
+        width = world.grid_width
+        blocked = set()
+        for index, cell in enumerate(world.map_bytes()):
+            if cell:
+                blocked.add((index % width, index // width))
+        for obj in world.objects:
+            for tx in range(obj.x // size, (obj.x + obj.width - 1) // size + 1):
+                for ty in range(obj.y // size, (obj.y + obj.height - 1) // size + 1):
+                    blocked.add((tx, ty))
+        return blocked
+
+    def find_reachable(self, start):
+        """Flood-fill the free tiles connected to a start position."""
+        world = self.world
+        size = world.tile_size
+        blocked = self.blocked_tiles()
+        first = (int(start[0] // size), int(start[1] // size))
+
+        # The fill spreads from the start tile even if an object sits on it
+        seen = {first}
+        frontier = [first]
+        while frontier:
+            tx, ty = frontier.pop()
+            for neighbour in ((tx + 1, ty), (tx - 1, ty), (tx, ty + 1), (tx, ty - 1)):
+                nx, ny = neighbour
+                if (0 <= nx < world.grid_width and 0 <= ny < world.grid_height
+                        and neighbour not in blocked and neighbour not in seen):
+                    seen.add(neighbour)
+                    frontier.append(neighbour)
+        return seen - blocked
+
+    def is_open(self, x, y):
+        """Check if a footprint at a top-left position lies on reachable tiles."""
+        size = self.world.tile_size
+        far = self.footprint - 1
+        reachable = self.reachable
+        return ((int(x // size), int(y // size)) in reachable
+                and (int((x + far) // size), int(y // size)) in reachable
+                and (int(x // size), int((y + far) // size)) in reachable
+                and (int((x + far) // size), int((y + far) // size)) in reachable)
+
+    def sample_spots(self, tries=20):
+        """Bridson's Poisson-disk sampling over the open area of the bounds.
+
+        Seeded from the world layout, so the same world always gives the
+        same spots (a loaded save rebuilds them exactly) and the game's
+        random sequence is left alone.
+        """
+        world = self.world
+        layout = world.map_bytes()
+        layout += repr(sorted((obj.x, obj.y) for obj in world.objects)).encode()
+        rng = random.Random(zlib.crc32(layout))
+
+        bounds = self.bounds
+        radius = self.spacing
+        radius_sq = radius * radius
+        grid = {}  # Background grid, one spot per cell of radius / sqrt(2)
+        cell = radius / math.sqrt(2)
+
+        def fits(x, y):
+            if not (bounds.left <= x < bounds.right and bounds.top <= y < bounds.bottom):
+                return False
+            if not self.is_open(x, y):
+                return False
+            gx, gy = int(x // cell), int(y // cell)
+            for nx in range(gx - 2, gx + 3):
+                for ny in range(gy - 2, gy + 3):
+                    other = grid.get((nx, ny))
+                    if other and (other[0] - x) ** 2 + (other[1] - y) ** 2 < radius_sq:
+                        return False
+            return True
+
+        spots = []
+        active = []
+        # Seed from open tiles in a fixed order so disconnected pockets of the
+        # bounds still get covered
+        size = world.tile_size
+        for tx, ty in sorted(self.reachable, key=lambda tile: (tile[1], tile[0])):
+            x, y = tx * size, ty * size
+            if not fits(x, y):
+                continue
+            grid[(int(x // cell), int(y // cell))] = (x, y)
+            spots.append((x, y))
+            active.append((x, y))
+
+            while active:
+                index = rng.randrange(len(active))
+                ax, ay = active[index]
+                for _ in range(tries):
+                    angle = rng.uniform(0, math.tau)
+                    distance = rng.uniform(radius, 2 * radius)
+                    px = ax + math.cos(angle) * distance
+                    py = ay + math.sin(angle) * distance
+                    if fits(px, py):
+                        grid[(int(px // cell), int(py // cell))] = (px, py)
+                        spots.append((px, py))
+                        active.append((px, py))
+                        break
+                else:
+                    active[index] = active[-1]
+                    active.pop()
+
+        return [(int(x), int(y)) for x, y in spots]
+
+    def update_zone(self, x, y):
+        """Move the safe zone; only spots near its old or new place change."""
+        if self.zone == (x, y):
+            return
+        inside = set(self.spot_grid.query_radius(x, y, self.safe_radius))
+        self.free |= self.zone_spots - inside
+        self.free -= inside
+        self.zone_spots = inside
+        self.zone = (x, y)
+
+    def sample(self, player_pos, occupied=None, min_distance=0, max_distance=None):
+        """A free spot for a pickup, or None if every spot is excluded.
+
+        Spots must be outside the safe zone, between min_distance and
+        max_distance of the player (no player: any spot), and (given an
+        ``occupied(x, y)`` check) not already taken. A few random tries are
+        made first, then one pass over the spots in a fixed order, so the
+        cost is bounded. Draws from the placer's rng, so seeded runs stay
+        repeatable.
+        """
+        if not self.spots:
+            return None
+        if player_pos is None:
+            free = range(len(self.spots))
+            px = py = min_sq = 0
+            max_sq = math.inf
+        else:
+            self.update_zone(*player_pos)
+            free = self.free
+            px, py = player_pos
+            min_sq = min_distance * min_distance
+            max_sq = max_distance * max_distance if max_distance is not None else math.inf
+
+        def usable(index):
+            if index not in free:
+                return False
+            x, y = self.spots[index]
+            if not min_sq <= (x - px) ** 2 + (y - py) ** 2 <= max_sq:
+                return False
+            return occupied is None or not occupied(x, y)
+
+        for _ in range(self.attempts):
+            index = self.rng.randrange(len(self.spots))
+            if usable(index):
+                return self.spots[index]
+
+        candidates = [index for index in sorted(free) if usable(index)]
+        if not candidates:
+            return None
+        return self.spots[candidates[self.rng.randrange(len(candidates))]]
+
+    def snap(self, x, y):
+        """A position for a pickup dropped at (x, y): unchanged if it is on
+        reachable ground, otherwise the nearest spot."""
+        if self.is_open(x, y) or not self.spots:
+            return x, y
+        radius = self.spacing * 2
+        while True:
+            nearby = self.spot_grid.query_radius(x, y, radius)
+            if nearby or radius > max(self.bounds.width, self.bounds.height) * 2:
+                break
+            radius *= 2
+        if not nearby:
+            return x, y
+        index = min(nearby, key=lambda i: (self.spots[i][0] - x) ** 2 + (self.spots[i][1] - y) ** 2)
+        return self.spots[index]
@@ -2,14 +2,27 @@ import pygame
 
 from effects import GameEffects
 from enemy import Enemy
+from ecs import EntityStore
+import simclock
 
 # Handles player animations, movement, and actions.
 
+# Facing direction -> unit vector
+DIRECTION_VECTORS = {
+    "right": (1, 0),
+    "left": (-1, 0),
+    "up": (0, -1),
+    "down": (0, 1)
+}
+
 # player.py
 import pygame
 
 class Player:
-    def __init__(self, sprite_sheet, x, y, speed=5):
+    def __init__(self, sprite_sheet, x, y, speed=5, entities=None, clock=None):
+        # Game clock that cooldowns and invincibility run on
+        self.clock = clock if clock is not None else simclock.SimClock()
+        
         # Position and movement
         self.x = x
         self.y = y
@@ -33,14 +46,19 @@ class Player:
         # Timers
         self.attack_start_time = 0
         self.attack_duration = 300  # milliseconds
+        self.melee_range = 60  # pixels from the player's centre
+        self.melee_arc = 90  # degrees, centred on the facing direction
+        self.melee_knockback = 20  # pixels
         self.invincibility_timer = 0
         self.invincibility_duration = 1000  # milliseconds
-        self.last_projectile_time = 0
+        self.invincibility_end = None  # Game-clock timer that ends invincibility
         self.projectile_cooldown = 500  # milliseconds
+        self.last_projectile_time = -self.projectile_cooldown  # Ready to fire at once
+        self.hack_ready_time = 0  # Game-clock ms when the hack tool recharges
         
-        # Projectiles
-        self.projectiles = []
-        self.projectile_speed = 7
+        # Projectiles live in the shared entity store
+        self.entities = entities if entities is not None else EntityStore()
+        self.projectile_speed = 420  # pixels per second
         
         # Animation
         self.sprite_width = 48
@@ -78,7 +96,7 @@ class Player:
                 "code_fragments": 4,
                 "energy_cores": 4,
                 "data_shards": 2,
-                "stats": {"range": 100, "cooldown": 5}
+                "stats": {"range": 100, "cooldown": 5, "damage": 25, "knockback": 40}
             }
         }
         
@@ -210,11 +228,7 @@ class Player:
 
     def animate(self, moving, keys, enemies):
         """Update player animation and handle actions."""
-        current_time = pygame.time.get_ticks()
-        
-        # Update invincibility
-        if self.is_invincible and current_time - self.invincibility_timer >= self.invincibility_duration:
-            self.is_invincible = False
+        current_time = self.clock.get_ticks()
         
         # Handle attack input
         if keys[pygame.K_SPACE] and not self.attacking:
@@ -272,9 +286,6 @@ class Player:
             else:  # down or default
                 self.sprite = self.walk_down[0]
         
-        # Update projectiles
-        self.update_projectiles(enemies)
-        
         return self.sprite
 
     def fire_projectile(self):
@@ -283,54 +294,21 @@ class Player:
         center_x = self.x + self.width // 2
         center_y = self.y + self.height // 2
         
+        # Convert facing direction into a velocity
+        dir_x, dir_y = DIRECTION_VECTORS.get(self.direction, (0, 1))
+        
         # Create projectile
-        self.projectiles.append({
-            "x": center_x,
-            "y": center_y,
-            "dir": self.direction,
-            "width": 5,
-            "height": 5
-        })
+        self.entities.spawn("projectile",
+                            x=center_x,
+                            y=center_y,
+                            vx=dir_x * self.projectile_speed,
+                            vy=dir_y * self.projectile_speed,
+                            width=5,
+                            height=5)
         
         # Play sound
         self.effects.play_hit_sound()
 
-    def update_projectiles(self, enemies):
-        """Update projectile positions and check for collisions."""
-        # Get screen dimensions
-        screen = pygame.display.get_surface()
-        screen_width = screen.get_width()
-        screen_height = screen.get_height()
-        
-        # Update each projectile
-        for projectile in self.projectiles[:]:
-            # Move projectile
-            if projectile["dir"] == "right":
-                projectile["x"] += self.projectile_speed
-            elif projectile["dir"] == "left":
-                projectile["x"] -= self.projectile_speed
-            elif projectile["dir"] == "up":
-                projectile["y"] -= self.projectile_speed
-            elif projectile["dir"] == "down":
-                projectile["y"] += self.projectile_speed
-            
-            # Check if out of bounds
-            if (projectile["x"] < 0 or
-                projectile["x"] > screen_width or
-                projectile["y"] < 0 or
-                projectile["y"] > screen_height):
-                # Remove projectile
-                self.projectiles.remove(projectile)
-                continue
-            
-            # Check collisions with enemies
-            for enemy in enemies[:]:
-                if enemy.collides_with(projectile):
-                    # Remove projectile
-                    if projectile in self.projectiles:
-                        self.projectiles.remove(projectile)
-                    break
-
     def decrease_health(self, amount):
         """Decrease player health if not invincible."""
         if not self.is_invincible:
@@ -346,13 +324,28 @@ class Player:
                 self.health = max(0, self.health - amount)
                 
                 # Become invincible briefly
-                self.is_invincible = True
-                self.invincibility_timer = pygame.time.get_ticks()
+                self.make_invincible()
                 
                 return True  # Damage was dealt
                 
         return False  # No damage was dealt
 
+    def make_invincible(self, duration=None):
+        """Become invincible for ``duration`` ms (default: the current
+        invincibility duration); a timer on the game clock ends it."""
+        if duration is not None:
+            self.invincibility_duration = duration
+        self.is_invincible = True
+        self.invincibility_timer = self.clock.get_ticks()
+        self.clock.cancel(self.invincibility_end)
+        self.invincibility_end = self.clock.at(self.invincibility_timer + self.invincibility_duration,
+                                               self.end_invincibility)
+
+    def end_invincibility(self):
+        """Invincibility timer callback."""
+        self.is_invincible = False
+        self.invincibility_end = None
+
     def can_craft(self, item_name):
         """Check if player has enough resources to craft an item."""
         if item_name not in self.crafting_recipes:
@@ -432,12 +425,13 @@ class Player:
         return 10  # Base damage if no weapon equipped
 
     def use_tool(self):
-        """Use the currently equipped tool."""
+        """Use the currently equipped tool; False if there is none or it is
+        recharging."""
         print(f"DEBUG: Player.use_tool called")
         
         if not self.equipped_tool:
             print("DEBUG: No tool equipped")
-            return
+            return False
         
         print(f"DEBUG: Using tool: {self.equipped_tool['name']}")
             
@@ -457,9 +451,13 @@ class Player:
                 self.equipped_tool = None
                 print("DEBUG: Tool broke and was removed")
         elif self.equipped_tool["name"] == "hack_tool":
-            # Apply hack effect (e.g., temporarily disable nearby enemies)
+            # The blast on nearby enemies is applied by the game
             hack_range = self.equipped_tool["stats"]["range"]
             cooldown = self.equipped_tool["stats"]["cooldown"]
+            now = self.clock.get_ticks()
+            if now < self.hack_ready_time:
+                return False
+            self.hack_ready_time = now + cooldown * 1000
             
             # Temporary effect - increases energy
             self.energy = min(self.max_energy, self.energy + 20)
@@ -478,9 +476,7 @@ class Player:
             speed_boost = self.equipped_tool["stats"]["speed"]
             
             # Temporary effect - provides temporary invincibility
-            self.is_invincible = True
-            self.invincibility_timer = pygame.time.get_ticks()
-            self.invincibility_duration = 2000  # 2 seconds of invincibility
+            self.make_invincible(2000)  # 2 seconds of invincibility
             
             print(f"DEBUG: Used energy_sword with damage {damage_boost}, invincibility activated")
             
@@ -491,4 +487,4 @@ class Player:
                 self.crafted_items.remove(self.equipped_tool)
                 self.equipped_tool = None
                 print("DEBUG: Tool broke and was removed")
-
+        return True
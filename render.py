@@ -0,0 +1,57 @@
+# render.py
+# Batched sprite drawing. During a frame, drawing code submits (surface,
+# position) pairs to named layers; flush() draws each layer, in order, with a
+# single Surface.blits call. Submitting a sprite is a list append, so the
+# per-sprite Python cost stays small with hundreds of entities on screen.
+import pygame
+
+
+class SpriteBatch:
+    """Per-layer lists of (surface, position) pairs flushed with blits()."""
+
+    def __init__(self, layers):
+        self.order = tuple(layers)
+        self.layers = {name: [] for name in self.order}
+
+    def layer(self, name):
+        """The list a layer collects into, for code that appends in bulk."""
+        return self.layers[name]
+
+    def submit(self, layer, surface, position):
+        """Queue one sprite on a layer."""
+        self.layers[layer].append((surface, position))
+
+    def count(self):
+        """Sprites queued across every layer."""
+        return sum(len(sprites) for sprites in self.layers.values())
+
+    def flush(self, target):
+        """Draw every layer in order onto a surface, then empty them."""
+        for name in self.order:
+            sprites = self.layers[name]
+            if sprites:
+                target.blits(sprites, False)
+                sprites.clear()
+
+
+class HealthBarSprites:
+    """Pre-rendered health bars, one per whole pixel of fill.
+
+    A bar for any health value is a lookup instead of two draw.rect calls,
+    and it can go through a SpriteBatch like any other sprite.
+    """
+
+    def __init__(self, width, height, back_color, fill_color):
+        self.width = width
+        self.bars = []
+        for filled in range(width + 1):
+            bar = pygame.Surface((width, height))
+            bar.fill(back_color)
+            if filled:
+                bar.fill(fill_color, (0, 0, filled, height))
+            self.bars.append(bar)
+
+    def get(self, health, max_health):
+        """The bar for a health value."""
+        fraction = health / max_health if max_health > 0 else 0.0
+        return self.bars[int(self.width * max(0.0, min(1.0, fraction)))]
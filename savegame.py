@@ -0,0 +1,402 @@
+# savegame.py
+# Quick-save and quick-load of a whole run in a compact binary format. The
+# main thread only copies the live state (packed ECS columns are copied as
+# arrays, everything else as tuples); a writer thread packs the copy with
+# struct/array and swaps it in with a temp file plus an atomic rename.
+import atexit
+import os
+import struct
+import threading
+from array import array
+
+from ecs import ARCHETYPES
+from enemy import Enemy
+from leaderboard import DIFFICULTIES
+from world import WorldGenerator
+from worldObject import WorldObject
+
+MAGIC = b"CBSV"
+VERSION = 6
+
+HEADER = struct.Struct("<4sH")
+# score, survival time, wave, enemies to spawn, enemies queued to arrive,
+# wave and power-up timer due
+# times (game-clock ms, -1: not armed), power-up timer armed first, game
+# clock (ms), difficulty, next entity id, AI scheduler tick and serial
+GAME = struct.Struct("<qdHhHdd?dBIqq")
+# x, y, speed, direction, health, max health, energy, max energy, shield,
+# damage, attacking, invincible, attack start, invincibility timer and
+# duration, last projectile time, hack tool recharge time
+PLAYER = struct.Struct("<iiiBddddddBBddddd")
+# x, y, last x, last y, speed, health, max health, damage, attack cooldown,
+# state, last attack time, frame index, frame counter, next and last AI
+# update tick (-1: never updated), weight (enemies merged into an elite)
+ENEMY = struct.Struct("<dddddddddBdBBqqB")
+RNG = struct.Struct("<BH")  # random module state version, word count
+GAUSS = struct.Struct("<?d")  # random.gauss cache
+WORLD = struct.Struct("<HHH")  # grid width, grid height, tile size
+WORLD_OBJECT = struct.Struct("<hhB")
+INVENTORY = struct.Struct("<3I")
+CRAFTED_ITEM = struct.Struct("<Bh")  # recipe index, durability
+EQUIPPED = struct.Struct("<bb")  # crafted item index of tool, weapon (-1: none)
+COUNT = struct.Struct("<I")
+SMALL_COUNT = struct.Struct("<B")
+
+DIRECTIONS = ("down", "up", "left", "right")
+ENEMY_STATES = ("idle", "chase", "attack")
+OBJECT_TYPES = ("console", "crate", "terminal", "debris")
+RESOURCE_NAMES = ("code_fragments", "energy_cores", "data_shards")
+
+
+def snapshot(game):
+    """Copy everything a save needs from a running game.
+
+    Cheap enough for the frame path: the result shares nothing mutable with
+    the game, so the writer thread can encode it while play goes on.
+    """
+    player = game.player
+    world = game.world_generator
+    recipes = list(player.crafting_recipes)
+    crafted = [(recipes.index(item["name"]), item["durability"]) for item in player.crafted_items]
+
+    def item_index(item):
+        return player.crafted_items.index(item) if item in player.crafted_items else -1
+
+    # Timers firing at the same time fire in the order they were armed
+    wave_timer, power_up_timer = game.wave_timer, game.power_up_timer
+    power_up_first = (wave_timer is not None and power_up_timer is not None
+                      and power_up_timer.seq < wave_timer.seq)
+
+    return {
+        "game": (int(game.score), game.survival_time, game.wave_number, game.enemies_to_spawn,
+                 game.wave_spawner.arrivals, timer_due(wave_timer), timer_due(power_up_timer), power_up_first,
+                 game.clock.ms, DIFFICULTIES.index(game.difficulty),
+                 game.entities.next_id, game.ai_scheduler.tick, game.ai_scheduler.serial),
+        "rng": game.rng.getstate(),
+        "world": (world.grid_width, world.grid_height, world.tile_size,
+                  world.map_bytes(),
+                  [(obj.x, obj.y, OBJECT_TYPES.index(obj.type)) for obj in world.objects]),
+        "player": (player.x, player.y, player.speed, DIRECTIONS.index(player.direction),
+                   player.health, player.max_health, player.energy, player.max_energy,
+                   player.shield, getattr(player, "damage", 10), player.attacking,
+                   player.is_invincible, player.attack_start_time, player.invincibility_timer,
+                   player.invincibility_duration, player.last_projectile_time,
+                   player.hack_ready_time),
+        "inventory": [player.inventory.get(name, 0) for name in RESOURCE_NAMES],
+        "crafted": crafted,
+        "equipped": (item_index(player.equipped_tool), item_index(player.equipped_weapon)),
+        "enemies": [(enemy.x, enemy.y, enemy.last_x, enemy.last_y, enemy.speed, enemy.health,
+                     enemy.max_health, enemy.damage, enemy.attack_cooldown,
+                     ENEMY_STATES.index(enemy.state), enemy.last_attack_time,
+                     enemy.frame_index, enemy.frame_counter, enemy.next_update_tick,
+                     -1 if enemy.last_update_tick is None else enemy.last_update_tick,
+                     enemy.weight)
+                    for enemy in game.enemies if enemy.active],
+        "entities": {name: (archetype.entity_ids[:],
+                            [column[:] for column in archetype.columns.values()])
+                     for name, archetype in game.entities.archetypes.items()},
+    }
+
+
+def timer_due(timer):
+    """When a game-clock timer fires, or -1 if there is none."""
+    return timer.due if timer is not None else -1.0
+
+
+def encode(state):
+    """Pack a snapshot into bytes."""
+    parts = [HEADER.pack(MAGIC, VERSION), GAME.pack(*state["game"])]
+
+    version, internal, gauss = state["rng"]
+    parts.append(RNG.pack(version, len(internal)))
+    parts.append(array("I", internal).tobytes())
+    parts.append(GAUSS.pack(gauss is not None, gauss or 0.0))
+
+    # Map as a bitmap, one bit per cell, row-major
+    width, height, tile_size, cells, objects = state["world"]
+    bits = bytearray((len(cells) + 7) // 8)
+    for index, cell in enumerate(cells):
+        if cell:
+            bits[index >> 3] |= 1 << (index & 7)
+    parts.append(WORLD.pack(width, height, tile_size))
+    parts.append(bytes(bits))
+    parts.append(COUNT.pack(len(objects)))
+    parts.extend(WORLD_OBJECT.pack(*obj) for obj in objects)
+
+    parts.append(PLAYER.pack(*state["player"]))
+    parts.append(INVENTORY.pack(*state["inventory"]))
+    parts.append(SMALL_COUNT.pack(len(state["crafted"])))
+    parts.extend(CRAFTED_ITEM.pack(*item) for item in state["crafted"])
+    parts.append(EQUIPPED.pack(*state["equipped"]))
+
+    parts.append(COUNT.pack(len(state["enemies"])))
+    parts.extend(ENEMY.pack(*enemy) for enemy in state["enemies"])
+
+    # ECS archetypes: row count, entity ids, then each column as raw bytes
+    for name in ARCHETYPES:
+        entity_ids, columns = state["entities"][name]
+        parts.append(COUNT.pack(len(entity_ids)))
+        parts.append(entity_ids.tobytes())
+        parts.extend(column.tobytes() for column in columns)
+    return b"".join(parts)
+
+
+class Reader:
+    """Sequential reads from a save buffer."""
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def unpack(self, packer):
+        values = packer.unpack_from(self.data, self.offset)
+        self.offset += packer.size
+        return values
+
+    def take(self, size):
+        chunk = self.data[self.offset:self.offset + size]
+        if len(chunk) != size:
+            raise ValueError("save file is truncated")
+        self.offset += size
+        return chunk
+
+    def array(self, typecode, count):
+        values = array(typecode)
+        values.frombytes(self.take(count * values.itemsize))
+        return values
+
+
+def decode(data, archetypes):
+    """Unpack bytes written by encode; raises ValueError on a bad file."""
+    reader = Reader(data)
+    try:
+        magic, version = reader.unpack(HEADER)
+        if magic != MAGIC:
+            raise ValueError("not a CodeBreak save")
+        if version != VERSION:
+            raise ValueError(f"save version {version} is not supported")
+        state = {"game": reader.unpack(GAME)}
+
+        rng_version, length = reader.unpack(RNG)
+        internal = tuple(reader.array("I", length))
+        has_gauss, gauss = reader.unpack(GAUSS)
+        state["rng"] = (rng_version, internal, gauss if has_gauss else None)
+
+        width, height, tile_size = reader.unpack(WORLD)
+        bits = reader.take((width * height + 7) // 8)
+        cells = [(bits[index >> 3] >> (index & 7)) & 1 for index in range(width * height)]
+        (object_count,) = reader.unpack(COUNT)
+        objects = [reader.unpack(WORLD_OBJECT) for _ in range(object_count)]
+        state["world"] = (width, height, tile_size, cells, objects)
+
+        state["player"] = reader.unpack(PLAYER)
+        state["inventory"] = reader.unpack(INVENTORY)
+        (crafted_count,) = reader.unpack(SMALL_COUNT)
+        state["crafted"] = [reader.unpack(CRAFTED_ITEM) for _ in range(crafted_count)]
+        state["equipped"] = reader.unpack(EQUIPPED)
+
+        (enemy_count,) = reader.unpack(COUNT)
+        state["enemies"] = list(ENEMY.iter_unpack(reader.take(enemy_count * ENEMY.size)))
+
+        entities = {}
+        for name in ARCHETYPES:
+            (count,) = reader.unpack(COUNT)
+            entity_ids = reader.array("I", count)
+            columns = [reader.array(column.typecode, count)
+                       for column in archetypes[name].columns.values()]
+            entities[name] = (entity_ids, columns)
+        state["entities"] = entities
+    except struct.error:
+        raise ValueError("save file is truncated")
+    return state
+
+
+def restore(game, state):
+    """Replace the game's run with a decoded save."""
+    (game.score, game.survival_time, game.wave_number, game.enemies_to_spawn,
+     game.wave_spawner.arrivals, wave_due, power_up_due, power_up_first,
+     clock_ms, difficulty, next_id, game.ai_scheduler.tick, game.ai_scheduler.serial) = state["game"]
+    game.clock.ms = clock_ms
+    
+    # Timers belong to the run being replaced; the saved ones are re-armed
+    # below, at the same due times
+    game.clock.timers.clear()
+    arm = [(wave_due, "wave_timer", game.wave_timer_due),
+           (power_up_due, "power_up_timer", game.power_up_timer_due)]
+    if power_up_first:
+        arm.reverse()
+    for due, name, callback in arm:
+        setattr(game, name, game.clock.at(due, callback) if due >= 0 else None)
+    game.difficulty = DIFFICULTIES[difficulty]  # The run's, not the player's preference
+    game.load_sprites()
+
+    # World layout comes from the save, not from the generator
+    width, height, tile_size, cells, objects = state["world"]
+    world = WorldGenerator(width * tile_size, height * tile_size, tile_size, generate=False)
+    world.map = [cells[row * width:(row + 1) * width] for row in range(height)]
+    world.objects = [WorldObject(x, y, OBJECT_TYPES[kind]) for x, y, kind in objects]
+    game.set_world(world)
+
+    # Player: starting recipes (balance-scaled), then the saved stats
+    values = state["player"]
+    player = game.create_player(values[0], values[1])
+    (player.x, player.y, player.speed, direction, player.health, player.max_health,
+     player.energy, player.max_energy, player.shield, player.damage, attacking, invincible,
+     player.attack_start_time, player.invincibility_timer, player.invincibility_duration,
+     player.last_projectile_time, player.hack_ready_time) = values
+    player.direction = DIRECTIONS[direction]
+    player.attacking = bool(attacking)
+    player.is_invincible = bool(invincible)
+    if player.is_invincible:
+        player.invincibility_end = game.clock.at(player.invincibility_timer + player.invincibility_duration,
+                                                 player.end_invincibility)
+    player.inventory = dict(zip(RESOURCE_NAMES, state["inventory"]))
+    recipes = list(player.crafting_recipes)
+    player.crafted_items = [{"name": recipes[recipe],
+                             "stats": player.crafting_recipes[recipes[recipe]]["stats"].copy(),
+                             "durability": durability}
+                            for recipe, durability in state["crafted"]]
+    tool, weapon = state["equipped"]
+    player.equipped_tool = player.crafted_items[tool] if tool >= 0 else None
+    player.equipped_weapon = player.crafted_items[weapon] if weapon >= 0 else None
+    game.player = player
+    game.allies = []
+
+    enemies = []
+    for (x, y, last_x, last_y, speed, health, max_health, damage, attack_cooldown, enemy_state,
+         last_attack_time, frame_index, frame_counter, next_update_tick,
+         last_update_tick, weight) in state["enemies"]:
+        enemy = Enemy(game.enemy_sprite_sheet, x, y, clock=game.clock)
+        enemy.last_x, enemy.last_y = last_x, last_y
+        enemy.speed, enemy.damage, enemy.attack_cooldown = speed, damage, attack_cooldown
+        enemy.health, enemy.max_health = health, max_health
+        enemy.state = ENEMY_STATES[enemy_state]
+        enemy.last_attack_time = last_attack_time
+        if (last_attack_time + attack_cooldown) * 1000.0 > clock_ms:
+            enemy.start_attack_cooldown()
+        enemy.frame_index, enemy.frame_counter = frame_index, frame_counter
+        enemy.next_update_tick = next_update_tick
+        enemy.last_update_tick = None if last_update_tick < 0 else last_update_tick
+        enemy.weight = weight
+        enemies.append(enemy)
+    game.enemies = enemies
+    game.combat.invalidate()
+
+    # Entity store: swap the saved columns in and rebuild the indexes
+    store = game.entities
+    for name, (entity_ids, columns) in state["entities"].items():
+        archetype = store.archetypes[name]
+        archetype.entity_ids = entity_ids
+        for field, column in zip(list(archetype.columns), columns):
+            archetype.columns[field] = column
+        if archetype.has("lifetime"):
+            for entity_id, born, duration in zip(entity_ids, archetype.columns["born"],
+                                                 archetype.columns["duration"]):
+                game.clock.at(born + duration * 1000.0, store.despawn, entity_id,
+                              name=f"expire {name}")
+    store.reindex()
+    store.next_id = next_id
+
+    game.effects_list = []
+    game.show_crafting = False
+    game.screen_shake_duration = 0
+    game.camera_offset_x = game.camera_offset_y = 0
+
+    # Last, so nothing above disturbs the restored sequence
+    game.rng.setstate(state["rng"])
+
+
+def load(game, path):
+    """Read a save file into a running game; False if there is none or it
+    cannot be read."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        print(f"Error loading save: {e}")
+        return False
+
+    try:
+        state = decode(data, game.entities.archetypes)
+    except (ValueError, IndexError) as e:
+        print(f"Error loading save {path}: {e}")
+        return False
+    restore(game, state)
+    return True
+
+
+class SaveWriter:
+    """Writes snapshots on a background thread.
+
+    Only the newest pending snapshot is kept, so saving faster than the disk
+    can write just skips the stale ones. ``flush`` (also registered with
+    atexit) writes anything still pending on the calling thread.
+    """
+
+    def __init__(self, path="quicksave.sav"):
+        self.path = path
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()  # One writer at a time
+        self._pending = None
+        self._closed = False
+        self._thread = None
+        atexit.register(self.close)
+
+    def save(self, state):
+        """Queue a snapshot for writing and return immediately."""
+        with self._condition:
+            self._pending = state
+            self._condition.notify()
+        if self._thread is None and not self._closed:
+            self._thread = threading.Thread(target=self._run, name="save-writer", daemon=True)
+            self._thread.start()
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def flush(self):
+        """Write a pending snapshot now, on the calling thread, or wait for
+        the one being written; the file is current when this returns."""
+        with self._write_lock:
+            with self._condition:
+                state, self._pending = self._pending, None
+            if state is not None:
+                self._write(state)
+
+    def close(self):
+        """Stop the writer thread and write anything still pending."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _run(self):
+        """Writer thread body."""
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+            with self._write_lock:
+                with self._condition:
+                    state, self._pending = self._pending, None
+                if state is not None:  # flush may have written it already
+                    self._write(state)
+
+    def _write(self, state):
+        """Atomically replace the save file (caller holds the write lock)."""
+        temp_path = f"{self.path}.tmp"
+        try:
+            data = encode(state)
+            with open(temp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"Error saving game: {e}")
@@ -0,0 +1,185 @@
+# settings_store.py
+# Player settings kept in memory and persisted off the frame path. Changes are
+# coalesced and written by a background thread once they stop arriving, using
+# a temp file plus an atomic rename so a crash never leaves a torn file.
+import atexit
+import json
+import os
+import threading
+
+# Every persisted setting: default value plus a validator that returns the
+# cleaned value or raises ValueError
+SETTINGS_SCHEMA = {
+    "sound_volume": (0.7, "volume"),
+    "music_volume": (0.5, "volume"),
+    "screen_shake": (True, "bool"),
+    "show_damage": (True, "bool"),
+    "difficulty": ("Normal", ("Easy", "Normal", "Hard")),
+}
+
+
+def validate_setting(key, value):
+    """Return a cleaned value for a setting, or raise ValueError."""
+    if key not in SETTINGS_SCHEMA:
+        raise ValueError(f"Unknown setting '{key}'")
+
+    _, rule = SETTINGS_SCHEMA[key]
+    if rule == "volume":
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Setting '{key}' must be a number, got {value!r}")
+        return max(0.0, min(1.0, float(value)))
+    if rule == "bool":
+        if not isinstance(value, bool):
+            raise ValueError(f"Setting '{key}' must be true or false, got {value!r}")
+        return value
+    if value not in rule:
+        raise ValueError(f"Setting '{key}' must be one of {', '.join(rule)}, got {value!r}")
+    return value
+
+
+class SettingsStore:
+    """Dict-like settings with debounced, atomic, background persistence.
+
+    Reads and writes only touch memory. A writer thread saves the latest
+    snapshot once no change has arrived for ``quiet_period`` seconds, and
+    ``flush`` (also registered with atexit) saves anything still pending.
+    With ``path=None`` settings live in memory only (e.g. headless runs).
+    """
+
+    def __init__(self, path="settings.json", quiet_period=0.5):
+        self.path = path
+        self.quiet_period = quiet_period
+        self.values = {key: default for key, (default, _) in SETTINGS_SCHEMA.items()}
+
+        # Bumped on every change; the writer compares it with the saved one
+        self.version = 0
+        self.saved_version = 0
+
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()  # One writer at a time
+        self._closed = False
+        self._thread = None
+
+        self.load()
+        atexit.register(self.flush)
+
+    # Mapping access
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    def __setitem__(self, key, value):
+        value = validate_setting(key, value)
+        with self._condition:
+            if self.values.get(key) == value:
+                return
+            self.values[key] = value
+            self.version += 1
+            self._condition.notify()
+        self._ensure_writer()
+
+    def __contains__(self, key):
+        return key in self.values
+
+    def get(self, key, default=None):
+        """Read a setting, with a fallback for keys that are not set."""
+        return self.values.get(key, default)
+
+    def items(self):
+        """Return (key, value) pairs of every setting."""
+        return self.values.items()
+
+    def snapshot(self):
+        """Return a copy of every setting."""
+        with self._condition:
+            return dict(self.values)
+
+    # Persistence
+
+    def load(self):
+        """Load settings from disk, keeping defaults for bad or missing keys."""
+        if self.path is None:
+            return
+        try:
+            if not os.path.exists(self.path):
+                return
+            with open(self.path, "r") as f:
+                loaded = json.load(f)
+        except Exception as e:
+            print(f"Error loading settings: {e}")
+            return
+
+        if not isinstance(loaded, dict):
+            print(f"Error loading settings: {self.path} does not hold an object")
+            return
+
+        for key, value in loaded.items():
+            try:
+                self.values[key] = validate_setting(key, value)
+            except ValueError as e:
+                print(f"Warning: Ignoring setting from {self.path}: {e}")
+
+    def flush(self):
+        """Write pending changes now, on the calling thread."""
+        with self._condition:
+            if self.saved_version == self.version or self.path is None:
+                return
+            version = self.version
+            values = dict(self.values)
+        self._write(values, version)
+
+    def close(self):
+        """Flush pending changes and stop the writer thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _ensure_writer(self):
+        """Start the writer thread on the first change."""
+        if self._thread is None and not self._closed and self.path is not None:
+            self._thread = threading.Thread(target=self._run, name="settings-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Writer thread body: save once changes have been quiet for a while."""
+        while True:
+            with self._condition:
+                while self.saved_version == self.version and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+
+                # Restart the quiet period every time another change arrives
+                version = self.version
+                while not self._closed:
+                    self._condition.wait(self.quiet_period)
+                    if self.version == version:
+                        break
+                    version = self.version
+                if self._closed:
+                    return
+                values = dict(self.values)
+
+            self._write(values, version)
+
+    def _write(self, values, version):
+        """Atomically replace the settings file with a snapshot."""
+        with self._write_lock:
+            # A newer snapshot may already have been written by flush
+            if version <= self.saved_version:
+                return
+            temp_path = f"{self.path}.tmp"
+            try:
+                with open(temp_path, "w") as f:
+                    json.dump(values, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.path)
+            except Exception as e:
+                # Not retried in a loop; the next change tries again
+                print(f"Error saving settings: {e}")
+            with self._condition:
+                self.saved_version = max(self.saved_version, version)
@@ -0,0 +1,139 @@
+# simclock.py
+# Game-time clock. Gameplay timers (attack and projectile cooldowns,
+# invincibility, animation frames) read this instead of pygame.time.get_ticks,
+# so they advance with simulated time: they stop while the game is paused and
+# keep up when headless runs step the simulation faster than real time.
+#
+# Cooldowns and expirations are scheduled on the clock's timer queue rather
+# than polled every frame: a timer costs nothing until it fires, and since
+# the queue runs on game time it pauses along with the game.
+#
+# Every Game owns its clock (game.clock), and the players and enemies it
+# creates schedule on that one, so several games can run in one process.
+import heapq
+
+
+class Timer:
+    """One scheduled callback; keep it to cancel it with TimerQueue.cancel."""
+
+    __slots__ = ("due", "seq", "name", "callback", "args", "cancelled")
+
+    def __init__(self, due, seq, name, callback, args):
+        self.due = due  # Clock time (ms) it fires at
+        self.seq = seq  # Keeps timers due at the same time in schedule order
+        self.name = name
+        self.callback = callback
+        self.args = args
+        self.cancelled = False  # Also set once it has fired
+
+    def __lt__(self, other):
+        return (self.due, self.seq) < (other.due, other.seq)
+
+
+class TimerQueue:
+    """Min-heap of timers on game time.
+
+    Cancelled timers stay in the heap until they reach the top (or until
+    they make up most of it), so cancelling is O(1).
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.seq = 0
+        self.cancelled = 0  # Cancelled timers still in the heap
+
+        # For the debug overlay
+        self.fired = 0  # Timers fired by the last run_due
+        self.fired_total = 0
+
+    def __len__(self):
+        return len(self.heap) - self.cancelled
+
+    def schedule(self, due, callback, *args, name=None):
+        """Call ``callback(*args)`` once the clock reaches ``due`` ms."""
+        self.seq += 1
+        timer = Timer(due, self.seq, name or getattr(callback, "__name__", "timer"),
+                      callback, args)
+        heapq.heappush(self.heap, timer)
+        return timer
+
+    def cancel(self, timer):
+        """Cancel a timer from this queue; None, or a timer that already
+        fired, is ignored."""
+        if timer is not None and not timer.cancelled:
+            timer.cancelled = True
+            self.cancelled += 1
+            if self.cancelled > 64 and self.cancelled * 2 > len(self.heap):
+                self.compact()
+
+    def compact(self):
+        """Drop cancelled timers from the heap."""
+        self.heap = [timer for timer in self.heap if not timer.cancelled]
+        heapq.heapify(self.heap)
+        self.cancelled = 0
+
+    def run_due(self, now):
+        """Fire every timer due at or before ``now`` ms, earliest first.
+
+        Callbacks may schedule more timers; ones already due fire in the
+        same call.
+        """
+        heap = self.heap
+        fired = 0
+        while heap and heap[0].due <= now:
+            timer = heapq.heappop(heap)
+            if timer.cancelled:
+                self.cancelled -= 1
+                continue
+            timer.cancelled = True  # Fired: cancelling it later changes nothing
+            timer.callback(*timer.args)
+            fired += 1
+        self.fired = fired
+        self.fired_total += fired
+        return fired
+
+    def pending(self, limit=None):
+        """The live timers, soonest first (for inspection)."""
+        timers = sorted(timer for timer in self.heap if not timer.cancelled)
+        return timers if limit is None else timers[:limit]
+
+    def clear(self):
+        """Drop every timer (e.g. when a run ends or is replaced)."""
+        for timer in self.heap:
+            timer.cancelled = True
+        self.heap = []
+        self.cancelled = 0
+
+
+class SimClock:
+    """Milliseconds of simulated time, advanced by the gameplay update."""
+
+    def __init__(self):
+        self.ms = 0.0
+        self.timers = TimerQueue()
+
+    def advance(self, dt):
+        """Move the clock forward by dt seconds, firing timers that come due."""
+        self.ms += dt * 1000.0
+        self.timers.run_due(self.ms)
+
+    def reset(self):
+        """Start again from zero (e.g. for a new seeded session)."""
+        self.ms = 0.0
+        self.timers.clear()
+
+    def get_ticks(self):
+        """Whole milliseconds, like pygame.time.get_ticks."""
+        return int(self.ms)
+
+    def after(self, seconds, callback, *args, name=None):
+        """Call ``callback(*args)`` once ``seconds`` of game time have passed."""
+        return self.timers.schedule(self.ms + seconds * 1000.0, callback, *args, name=name)
+
+    def at(self, ms, callback, *args, name=None):
+        """Call ``callback(*args)`` when the clock reaches ``ms``."""
+        return self.timers.schedule(ms, callback, *args, name=name)
+
+    def cancel(self, timer):
+        """Cancel a timer returned by after() or at(); None is ignored."""
+        self.timers.cancel(timer)
@@ -0,0 +1,210 @@
+# simulate.py
+# Balance sweeps from the command line. Every combination of the swept values
+# is played for --runs seeded headless sessions, fanned out over a process pool
+# so every core is busy, and the survival-time and score distributions of each
+# combination are reported side by side. Each combination uses the same seeds,
+# so differences between rows come from the balance change, not from luck.
+#
+#   python simulate.py --runs 500 --difficulty Easy Normal Hard
+#   python simulate.py --wave-factor 0.05 0.1 0.15 --craft-cost-scale 0.75 1 --json sweep.json
+import argparse
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from leaderboard import DIFFICULTIES
+
+# One headless Game per worker process, reused for every session it plays
+_game = None
+
+
+def init_worker():
+    """Process pool initializer: build the worker's headless game."""
+    global _game
+    # Asset paths are relative to the game directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    import headless
+    _game = headless.create_game()
+
+
+def run_batch(index, config, seeds, max_time):
+    """Play a batch of seeds for one configuration (runs in a worker)."""
+    import headless
+    results = [headless.run_session(_game, seed, config["difficulty"], config["balance"],
+                                    max_time=max_time)
+               for seed in seeds]
+    return index, results
+
+
+def parse_weights(text):
+    """Parse "0.5,0.3,0.2" into a weight tuple (one weight per resource type)."""
+    try:
+        weights = tuple(float(part) for part in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"weights must be numbers, got '{text}'")
+    if len(weights) != 3 or min(weights) < 0 or sum(weights) <= 0:
+        raise argparse.ArgumentTypeError(
+            f"need three non-negative weights (code fragments, energy cores, data shards), got '{text}'")
+    return weights
+
+
+def build_configs(args):
+    """Expand the swept arguments into every combination to simulate."""
+    sweeps = {
+        "wave_factor": args.wave_factor,
+        "wave_speed_factor": args.wave_speed_factor,
+        "resource_weights": args.resource_weights,
+        "drop_weights": args.drop_weights,
+        "drop_chance": args.drop_chance,
+        "craft_cost_scale": args.craft_cost_scale,
+        "map_style": args.map_style,
+    }
+    swept = {key: values for key, values in sweeps.items() if values}
+
+    configs = []
+    for difficulty in args.difficulty:
+        for combination in itertools.product(*swept.values()):
+            balance = dict(zip(swept, combination))
+            label = " ".join([difficulty] + [f"{key}={format_value(value)}"
+                                             for key, value in balance.items()])
+            configs.append({"label": label, "difficulty": difficulty, "balance": balance})
+    return configs
+
+
+def format_value(value):
+    if isinstance(value, tuple):
+        return ",".join(f"{v:g}" for v in value)
+    if isinstance(value, str):
+        return value
+    return f"{value:g}"
+
+
+def distribution(values):
+    """Summary statistics of a list of numbers."""
+    values = sorted(values)
+    if len(values) > 1:
+        deciles = statistics.quantiles(values, n=10, method="inclusive")
+        p10, p90 = deciles[0], deciles[-1]
+    else:
+        p10 = p90 = values[0]
+    return {
+        "mean": statistics.fmean(values),
+        "stdev": statistics.stdev(values) if len(values) > 1 else 0.0,
+        "min": values[0],
+        "p10": p10,
+        "median": statistics.median(values),
+        "p90": p90,
+        "max": values[-1],
+    }
+
+
+def summarize(results):
+    """Aggregate the session results of one configuration."""
+    return {
+        "runs": len(results),
+        "defeat_rate": sum(result["defeated"] for result in results) / len(results),
+        "survival_time": distribution([result["survival_time"] for result in results]),
+        "score": distribution([result["score"] for result in results]),
+        "wave": distribution([result["wave"] for result in results]),
+    }
+
+
+def print_report(configs, summaries, elapsed, sessions):
+    """Print one row per configuration."""
+    width = max(len(config["label"]) for config in configs)
+    header = (f"{'configuration':<{width}}  {'runs':>5}  {'died':>5}  "
+              f"{'time p10/med/p90 (s)':>22}  {'score p10/med/p90':>24}  {'wave':>5}")
+    print(header)
+    print("-" * len(header))
+    for config, summary in zip(configs, summaries):
+        times = summary["survival_time"]
+        scores = summary["score"]
+        print(f"{config['label']:<{width}}  {summary['runs']:>5}  "
+              f"{summary['defeat_rate']:>5.0%}  "
+              f"{times['p10']:>6.0f} /{times['median']:>6.0f} /{times['p90']:>6.0f}  "
+              f"{scores['p10']:>7.0f} /{scores['median']:>7.0f} /{scores['p90']:>7.0f}  "
+              f"{summary['wave']['mean']:>5.1f}")
+    print(f"\n{sessions} sessions in {elapsed:.1f}s ({sessions / elapsed:.1f} sessions/s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless balance sweeps.")
+    parser.add_argument("--runs", type=int, default=100,
+                        help="sessions per configuration (default 100)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="first seed; configurations share seeds seed..seed+runs-1")
+    parser.add_argument("--max-time", type=float, default=600.0,
+                        help="stop a session that survives this many game seconds")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: one per core)")
+    parser.add_argument("--chunk", type=int, default=10,
+                        help="sessions per task sent to a worker")
+    parser.add_argument("--json", metavar="PATH",
+                        help="also write the summaries and every session result as JSON")
+
+    sweep = parser.add_argument_group("sweeps (every combination is simulated)")
+    sweep.add_argument("--difficulty", nargs="+", choices=DIFFICULTIES, default=["Normal"])
+    sweep.add_argument("--wave-factor", nargs="+", type=float,
+                       help="enemy health gained per wave (default 0.1)")
+    sweep.add_argument("--wave-speed-factor", nargs="+", type=float,
+                       help="enemy speed gained per wave (default 0.05)")
+    sweep.add_argument("--resource-weights", nargs="+", type=parse_weights,
+                       help="world spawn weights, e.g. 0.5,0.3,0.2")
+    sweep.add_argument("--drop-weights", nargs="+", type=parse_weights,
+                       help="enemy drop weights, e.g. 0.6,0.3,0.1")
+    sweep.add_argument("--drop-chance", nargs="+", type=float,
+                       help="chance a defeated enemy drops a resource (default 0.7)")
+    sweep.add_argument("--craft-cost-scale", nargs="+", type=float,
+                       help="multiplier on every crafting cost (default 1)")
+    sweep.add_argument("--map-style", nargs="+", choices=("scatter", "caves"),
+                       help="arena layout (default scatter; caves needs numpy)")
+    args = parser.parse_args(argv)
+
+    if args.runs < 1 or args.chunk < 1 or args.workers < 1:
+        parser.error("--runs, --chunk and --workers must be at least 1")
+
+    configs = build_configs(args)
+    seeds = list(range(args.seed, args.seed + args.runs))
+    results = [[] for _ in configs]
+    total = len(configs) * len(seeds)
+    print(f"Simulating {len(configs)} configuration(s) x {len(seeds)} seeds "
+          f"on {args.workers} worker(s)...")
+
+    started = time.perf_counter()
+    done = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker) as pool:
+        futures = [pool.submit(run_batch, index, config, seeds[start:start + args.chunk],
+                               args.max_time)
+                   for index, config in enumerate(configs)
+                   for start in range(0, len(seeds), args.chunk)]
+        try:
+            for future in as_completed(futures):
+                index, batch = future.result()
+                results[index].extend(batch)
+                done += len(batch)
+                print(f"\r{done}/{total} sessions", end="", file=sys.stderr, flush=True)
+        except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    print(file=sys.stderr)
+    elapsed = time.perf_counter() - started
+
+    for batch in results:
+        batch.sort(key=lambda result: result["seed"])
+    summaries = [summarize(batch) for batch in results]
+    print_report(configs, summaries, elapsed, total)
+
+    if args.json:
+        report = [{**config, "summary": summary, "results": batch}
+                  for config, summary, batch in zip(configs, summaries, results)]
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# spatial.py
+# Uniform-grid proximity index. Keys (entity ids) are bucketed by the cell
+# their position falls in, so a radius query only looks at the few cells the
+# circle overlaps and its cost follows local density, not the total count.
+
+
+class SpatialGrid:
+    """Hash grid of keyed points with radius and rectangle queries."""
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}  # (cell x, cell y) -> {key: (x, y)}
+        self.entries = {}  # key -> cell
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def cell_of(self, x, y):
+        """The cell a point falls in."""
+        size = self.cell_size
+        return (int(x // size), int(y // size))
+
+    def insert(self, key, x, y):
+        """Add a key at a position (or move it there if already present)."""
+        if key in self.entries:
+            self.remove(key)
+        cell = self.cell_of(x, y)
+        bucket = self.cells.get(cell)
+        if bucket is None:
+            bucket = self.cells[cell] = {}
+        bucket[key] = (x, y)
+        self.entries[key] = cell
+
+    def move(self, key, x, y):
+        """Update a key's position; only changing cells touches the buckets."""
+        cell = self.entries[key]
+        new_cell = self.cell_of(x, y)
+        if new_cell == cell:
+            self.cells[cell][key] = (x, y)
+        else:
+            self.remove(key)
+            self.insert(key, x, y)
+
+    def remove(self, key):
+        """Drop a key; unknown keys are ignored."""
+        cell = self.entries.pop(key, None)
+        if cell is None:
+            return
+        bucket = self.cells[cell]
+        del bucket[key]
+        if not bucket:
+            del self.cells[cell]
+
+    def clear(self):
+        """Drop every key."""
+        self.cells = {}
+        self.entries = {}
+
+    def load(self, points):
+        """Replace the contents with (key, x, y) points, in one pass."""
+        size = self.cell_size
+        cells = {}
+        entries = {}
+        for key, x, y in points:
+            cell = (int(x // size), int(y // size))
+            bucket = cells.get(cell)
+            if bucket is None:
+                bucket = cells[cell] = {}
+            bucket[key] = (x, y)
+            entries[key] = cell
+        self.cells = cells
+        self.entries = entries
+
+    def query_radius(self, x, y, radius):
+        """Keys within radius of a point, in ascending key order."""
+        size = self.cell_size
+        radius_sq = radius * radius
+        min_cx, max_cx = int((x - radius) // size), int((x + radius) // size)
+        min_cy, max_cy = int((y - radius) // size), int((y + radius) // size)
+
+        found = []
+        cells = self.cells
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    for key, (px, py) in bucket.items():
+                        if (px - x) ** 2 + (py - y) ** 2 < radius_sq:
+                            found.append(key)
+        found.sort()  # Independent of insertion history, for repeatable runs
+        return found
+
+    def query_rect(self, left, top, right, bottom):
+        """Keys inside a rectangle (edges included), in ascending key order."""
+        size = self.cell_size
+        found = []
+        cells = self.cells
+        for cx in range(int(left // size), int(right // size) + 1):
+            for cy in range(int(top // size), int(bottom // size) + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    for key, (px, py) in bucket.items():
+                        if left <= px <= right and top <= py <= bottom:
+                            found.append(key)
+        found.sort()
+        return found
+
+    def occupied(self, x, y):
+        """Check if the cell containing a point holds any key."""
+        return self.cell_of(x, y) in self.cells
@@ -0,0 +1,60 @@
+# Seeded headless runs must play out the same way no matter what ran before
+# them on the same Game (simulate.py reuses one Game per worker) or what other
+# Games in the process do (a VectorEnv worker holds several environments).
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # Assets are loaded relative to the repository root
+
+import headless  # noqa: E402
+
+
+def test_same_seed_twice_on_one_game():
+    game = headless.create_game()
+    seeds = range(4)
+    first = [headless.run_session(game, seed, max_time=60) for seed in seeds]
+    second = [headless.run_session(game, seed, max_time=60) for seed in seeds]
+    assert first == second
+
+
+def trajectory(env, actions):
+    """Observation, reward and done flags after each action."""
+    return [(observation.tobytes(), reward, terminated, truncated)
+            for observation, reward, terminated, truncated, _ in map(env.step, actions)]
+
+
+def test_interleaved_envs_match_solo_runs():
+    pytest.importorskip("numpy")
+    import env
+
+    picks = random.Random(0)
+    actions = [picks.randrange(env.ACTION_COUNT) for _ in range(600)]
+    half = len(actions) // 2
+
+    solo = env.CodebreakEnv()
+    solo.reset(1)
+    solo_a = trajectory(solo, actions)
+    solo.reset(2)
+    solo_b = trajectory(solo, actions[:half])
+    solo.reset(3)
+    solo_c = trajectory(solo, actions[half:])
+
+    # B is reset halfway through A's episode, which must not disturb A
+    a, b = env.CodebreakEnv(), env.CodebreakEnv()
+    a.reset(1)
+    b.reset(2)
+    mixed_a, mixed_b, mixed_c = [], [], []
+    for step, action in enumerate(actions):
+        if step == half:
+            b.reset(3)
+        mixed_a += trajectory(a, [action])
+        (mixed_b if step < half else mixed_c).extend(trajectory(b, [action]))
+
+    assert mixed_a == solo_a
+    assert mixed_b == solo_b
+    assert mixed_c == solo_c
@@ -0,0 +1,268 @@
+# ui.py
+# Helpers for drawing menu screens from cached surfaces, and the retained
+# widget tree the menu controls live in.
+import pygame
+
+
+class CachedLayer:
+    """A surface built on demand and reused until its key changes.
+
+    ``build`` is called with no arguments and returns a Surface. Screens pass
+    a key derived from the data the layer shows (a version counter, a board
+    selection, ...) so the layer is rebuilt exactly when that data changes.
+    """
+
+    def __init__(self, build):
+        self.build = build
+        self.key = None
+        self.surface = None
+        self.rect = None  # Part of the surface that has visible pixels
+
+    def get(self, key=None):
+        """Return the layer, rebuilding it if the key changed."""
+        if self.surface is None or key != self.key:
+            self.surface = self.build()
+            self.key = key
+            # Transparent layers only need their visible area blitted
+            if self.surface.get_flags() & pygame.SRCALPHA:
+                self.rect = self.surface.get_bounding_rect()
+            else:
+                self.rect = self.surface.get_rect()
+        return self.surface
+
+    def draw(self, target, key=None):
+        """Blit the (possibly rebuilt) layer onto a target at the origin."""
+        surface = self.get(key)
+        target.blit(surface, self.rect.topleft, self.rect)
+
+    def invalidate(self):
+        """Force a rebuild on the next get."""
+        self.surface = None
+
+
+class Widget:
+    """Base class for retained UI controls.
+
+    Subclasses implement ``render(font, state)``, returning a surface and the
+    screen position of its top-left corner. Renders are cached per
+    ``cache_key()`` and only thrown away by ``mark_dirty`` (e.g. when a value
+    changes), so switching between hover and normal costs nothing after the
+    first time. ``rect`` is the hit area a WidgetTree indexes.
+    """
+
+    # Non-interactive widgets are drawn but never hit-tested
+    interactive = True
+
+    def __init__(self, rect):
+        self.rect = pygame.Rect(rect)
+        self.hovered = False
+        self.tree = None
+        self.renders = {}
+
+    def state(self):
+        """Visual state: "normal", "hover" or "active"."""
+        return "hover" if self.hovered else "normal"
+
+    def cache_key(self):
+        """Key for the render cache; widgets that look the same in several
+        states can return a coarser key to share one render."""
+        return self.state()
+
+    def hit_rect(self):
+        """Area that receives mouse events."""
+        return self.rect
+
+    def rendered(self, font):
+        """Return the cached (surface, topleft) render for the current state."""
+        key = (self.cache_key(), font)
+        render = self.renders.get(key)
+        if render is None:
+            render = self.renders[key] = self.render(font, self.state())
+        return render
+
+    def render(self, font, state):
+        raise NotImplementedError
+
+    def draw(self, surface, font):
+        """Blit the cached render onto a surface."""
+        surface.blit(*self.rendered(font))
+
+    def mark_dirty(self):
+        """Drop cached renders after the widget's content changed."""
+        self.renders.clear()
+        self.request_redraw()
+
+    def request_redraw(self):
+        """Ask the owning tree to recompose without dropping renders."""
+        if self.tree is not None:
+            self.tree.dirty = True
+
+    def update(self, mouse_pos):
+        """Track hover for a widget used outside a tree."""
+        hovered = self.hit_rect().collidepoint(mouse_pos)
+        if hovered != self.hovered:
+            self.hovered = hovered
+            self.request_redraw()
+
+    def on_mouse_move(self, mouse_pos):
+        """Called by the tree for the widget under (or capturing) the mouse."""
+
+    def handle_event(self, event):
+        """Handle a mouse event that hit this widget; True if consumed."""
+        return False
+
+    def blur(self):
+        """Called when a click lands outside a focused widget."""
+
+    def capture(self):
+        """Receive every mouse event until released (e.g. while dragging)."""
+        if self.tree is not None:
+            self.tree.captured = self
+
+    def release(self):
+        if self.tree is not None and self.tree.captured is self:
+            self.tree.captured = None
+
+    def focus(self):
+        """Be told via blur() when the next click lands elsewhere."""
+        if self.tree is not None:
+            self.tree.focused = self
+
+    def reindex(self):
+        """Re-register the hit area after it changed size."""
+        if self.tree is not None:
+            self.tree.index(self)
+
+
+class Label(Widget):
+    """Static text drawn with its own font."""
+
+    interactive = False
+
+    def __init__(self, pos, text, font, color, anchor="topleft"):
+        super().__init__((pos[0], pos[1], 0, 0))
+        self.pos = pos
+        self.text = text
+        self.font = font
+        self.color = color
+        self.anchor = anchor
+
+    def cache_key(self):
+        return "normal"
+
+    def set_text(self, text):
+        """Change the text; only re-renders if it actually changed."""
+        if text != self.text:
+            self.text = text
+            self.mark_dirty()
+
+    def render(self, font, state):
+        surface = self.font.render(self.text, True, self.color)
+        return surface, surface.get_rect(**{self.anchor: self.pos}).topleft
+
+
+class WidgetTree:
+    """A retained set of widgets drawn from one composed surface.
+
+    Interactive widgets are bucketed into a grid by their hit rect, so a hit
+    test only looks at the widgets in the cell under the cursor. The composed
+    surface is rebuilt only when a widget asks for a redraw (content or hover
+    changed); otherwise drawing the whole tree is a single blit.
+    """
+
+    def __init__(self, widgets=(), font=None, cell_size=64):
+        self.font = font
+        self.cell_size = cell_size
+        self.widgets = []
+        self.cells = {}  # (column, row) -> widgets whose hit rect touches it
+        self.widget_cells = {}  # widget -> cells it is registered in
+
+        self.hovered = None
+        self.captured = None  # Gets all mouse input until released
+        self.focused = None  # Gets blur() when a click lands elsewhere
+
+        self.composed = None  # (surface, topleft)
+        self.dirty = True
+
+        for widget in widgets:
+            self.add(widget)
+
+    def add(self, widget):
+        """Add a widget on top of the existing ones."""
+        widget.tree = self
+        widget.z = len(self.widgets)
+        self.widgets.append(widget)
+        if widget.interactive:
+            self.index(widget)
+        self.dirty = True
+        return widget
+
+    def index(self, widget):
+        """(Re-)register a widget's hit rect in the grid."""
+        for cell in self.widget_cells.pop(widget, ()):
+            bucket = self.cells[cell]
+            bucket.remove(widget)
+            if not bucket:
+                del self.cells[cell]
+
+        rect = widget.hit_rect()
+        size = self.cell_size
+        cells = [(column, row)
+                 for column in range(rect.left // size, (rect.right - 1) // size + 1)
+                 for row in range(rect.top // size, (rect.bottom - 1) // size + 1)]
+        for cell in cells:
+            self.cells.setdefault(cell, []).append(widget)
+        self.widget_cells[widget] = cells
+
+    def hit_test(self, pos):
+        """Return the topmost interactive widget at a point, or None."""
+        bucket = self.cells.get((pos[0] // self.cell_size, pos[1] // self.cell_size))
+        if not bucket:
+            return None
+        hits = [widget for widget in bucket if widget.hit_rect().collidepoint(pos)]
+        return max(hits, key=lambda widget: widget.z) if hits else None
+
+    def update(self, mouse_pos):
+        """Update hover state and notify the widget under the mouse."""
+        target = self.captured or self.hit_test(mouse_pos)
+        if target is not self.hovered:
+            if self.hovered is not None:
+                self.hovered.hovered = False
+            if target is not None:
+                target.hovered = True
+            self.hovered = target
+            self.dirty = True
+        if target is not None:
+            target.on_mouse_move(mouse_pos)
+
+    def handle_event(self, event):
+        """Route a mouse event to the widget it hits; True if consumed."""
+        if event.type not in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+            return False
+
+        target = self.captured or self.hit_test(event.pos)
+        if event.type == pygame.MOUSEBUTTONDOWN and self.focused not in (None, target):
+            focused, self.focused = self.focused, None
+            focused.blur()
+        if target is None:
+            return False
+        return target.handle_event(event)
+
+    def compose(self):
+        """Blit every widget's cached render into one surface."""
+        renders = [widget.rendered(self.font) for widget in self.widgets]
+        rects = [surface.get_rect(topleft=pos) for surface, pos in renders]
+        bounds = rects[0].unionall(rects[1:])
+
+        surface = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        surface.blits([(render, (rect.x - bounds.x, rect.y - bounds.y))
+                       for (render, _), rect in zip(renders, rects)], False)
+        return surface, bounds.topleft
+
+    def draw(self, surface):
+        """Draw the tree, recomposing only if something changed."""
+        if self.dirty or self.composed is None:
+            self.composed = self.compose() if self.widgets else None
+            self.dirty = False
+        if self.composed is not None:
+            surface.blit(*self.composed)
@@ -0,0 +1,153 @@
+# visibility.py
+# Fog of war. What the player can see is worked out with symmetric recursive
+# shadowcasting over the world's tile grid: each quadrant around the player's
+# tile is scanned row by row, and a blocking tile splits the row's view cone
+# into the part before it (scanned deeper recursively) and the part after.
+# Slopes are kept as integer fractions, so there is no float error at tile
+# corners. The result is a bitmap of visible tiles that is only recomputed
+# when the player moves to another tile. The fog overlay is repainted one
+# tile at a time, for the tiles whose state changed.
+import pygame
+
+# Fog state of a tile -> overlay colour
+HIDDEN, EXPLORED, VISIBLE = 0, 1, 2
+FOG_COLORS = {
+    HIDDEN: (0, 0, 0, 235),
+    EXPLORED: (0, 0, 0, 150),
+    VISIBLE: (0, 0, 0, 0),
+}
+
+# (row direction, column direction) of each quadrant: north, east, south, west
+QUADRANTS = (((0, -1), (1, 0)), ((1, 0), (0, 1)), ((0, 1), (-1, 0)), ((-1, 0), (0, -1)))
+
+
+class Visibility:
+    """Tiles visible from the viewer's tile, cached between tile changes.
+
+    ``cells`` holds a ``width`` x ``height`` tile map as row-major bytes
+    where 1 blocks sight (see WorldGenerator.map_bytes). Tiles within
+    ``radius`` tiles of the viewer can be seen; tiles seen before stay
+    ``explored``.
+    """
+
+    def __init__(self, cells, width, height, tile_size, radius=10):
+        self.blocked = cells
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.radius = radius
+
+        self.visible = bytearray(self.width * self.height)  # Tile index -> 1 if seen now
+        self.explored = bytearray(self.width * self.height)
+        self.cells = set()  # Indexes of the visible tiles
+        self.origin = None  # Viewer tile of the last computation
+        self.changed = set()  # Tiles whose fog state changed since the fog was painted
+
+        # For the debug overlay
+        self.recomputes = 0
+
+    def update(self, x, y):
+        """Follow the viewer to a pixel position; True if the view changed."""
+        size = self.tile_size
+        origin = (int(x // size), int(y // size))
+        if origin == self.origin:
+            return False
+        self.origin = origin
+
+        cells = set()
+        if 0 <= origin[0] < self.width and 0 <= origin[1] < self.height:
+            cells.add(origin[1] * self.width + origin[0])
+            for quadrant in QUADRANTS:
+                self.scan(origin, quadrant, 1, (-1, 1), (1, 1), cells)
+
+        visible = self.visible
+        explored = self.explored
+        changed = self.cells ^ cells
+        for index in changed:
+            visible[index] ^= 1
+            explored[index] = 1
+        self.changed |= changed
+        self.cells = cells
+        self.recomputes += 1
+        return True
+
+    def scan(self, origin, quadrant, depth, start, end, cells):
+        """Reveal one row of a quadrant between two slopes (numerator,
+        denominator), recursing into the rows behind it."""
+        if depth > self.radius:
+            return
+        (row_x, row_y), (col_x, col_y) = quadrant
+        ox, oy = origin
+        blocked = self.blocked
+        width, height = self.width, self.height
+        radius_sq = self.radius * self.radius + self.radius  # Rounder edge
+
+        # Columns whose centres the cone covers; ties round towards the cone
+        min_col = (2 * depth * start[0] + start[1]) // (2 * start[1])
+        max_col = -((-(2 * depth * end[0] - end[1])) // (2 * end[1]))
+
+        previous = None  # Whether the previous tile blocked sight
+        for col in range(min_col, max_col + 1):
+            tx = ox + row_x * depth + col_x * col
+            ty = oy + row_y * depth + col_y * col
+            inside = 0 <= tx < width and 0 <= ty < height
+            wall = not inside or blocked[ty * width + tx] == 1
+
+            # Walls show whenever the cone touches them; floors only when
+            # their centre is in the cone, which keeps sight symmetric
+            if inside and depth * depth + col * col <= radius_sq:
+                if wall or (col * start[1] >= depth * start[0] and col * end[1] <= depth * end[0]):
+                    cells.add(ty * width + tx)
+
+            if previous and not wall:
+                start = (2 * col - 1, 2 * depth)
+            if previous is False and wall:
+                self.scan(origin, quadrant, depth + 1, start, (2 * col - 1, 2 * depth), cells)
+            previous = wall
+        if previous is False:
+            self.scan(origin, quadrant, depth + 1, start, end, cells)
+
+    def can_see(self, x, y):
+        """Check if the tile under a pixel position is visible."""
+        size = self.tile_size
+        tx, ty = int(x // size), int(y // size)
+        if 0 <= tx < self.width and 0 <= ty < self.height:
+            return self.visible[ty * self.width + tx] == 1
+        return False
+
+    def state(self, index):
+        """HIDDEN, EXPLORED or VISIBLE for a tile index."""
+        if self.visible[index]:
+            return VISIBLE
+        return EXPLORED if self.explored[index] else HIDDEN
+
+
+class FogLayer:
+    """Overlay darkening the tiles the player can't see, kept in step with a
+    Visibility by repainting only the tiles that changed."""
+
+    def __init__(self, visibility):
+        self.visibility = visibility
+        size = visibility.tile_size
+        self.surface = pygame.Surface((visibility.width * size, visibility.height * size),
+                                      pygame.SRCALPHA)
+        self.surface.fill(FOG_COLORS[HIDDEN])
+        visibility.changed.clear()
+
+        # Last paint's numbers, for the debug overlay
+        self.painted = 0
+
+    def draw(self, target):
+        """Repaint changed tiles, then darken a surface with the fog."""
+        visibility = self.visibility
+        changed = visibility.changed
+        if changed:
+            size = visibility.tile_size
+            width = visibility.width
+            fill = self.surface.fill
+            for index in changed:
+                fill(FOG_COLORS[visibility.state(index)],
+                     ((index % width) * size, (index // width) * size, size, size))
+            self.painted = len(changed)
+            changed.clear()
+        target.blit(self.surface, (0, 0))
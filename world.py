@@ -3,14 +3,19 @@ import random
 from worldObject import WorldObject
 
 class WorldGenerator:
-    def __init__(self, width, height, tile_size):
+    def __init__(self, width, height, tile_size, generate=True, style="scatter", rng=None):
+        # Random source for the layout (the game's; default: the random module)
+        self.rng = rng if rng is not None else random
+        
         # World dimensions
         self.width = width
         self.height = height
         self.tile_size = tile_size
         self.block_height = 32  # Actual 3D height of blocks
         
-        # Map representation
+        # Map representation: rows of cells, 1 = block. Cave maps keep the
+        # compact (rows, columns) uint8 array from mapgen, which indexes the
+        # same way (map[y][x]); map_bytes() flattens either kind.
         self.map = []
         self.objects = []
         
@@ -18,16 +23,25 @@ class WorldGenerator:
         self.grid_width = width // tile_size
         self.grid_height = height // tile_size
         
+        # Map style: "scatter" (random single blocks) or "caves" (mapgen.py,
+        # needs numpy)
+        self.style = style
+        
         # Appearance
         self.bg_color = (10, 10, 25)  # Dark blue background
         self.grid_color = (30, 30, 60)  # Slightly lighter grid lines
         
-        # Generate world
-        self.generate_map()
-        self.place_objects()
+        # Generate world (a loaded save fills in map and objects itself)
+        if generate:
+            self.generate_map()
+            self.place_objects()
 
     def generate_map(self):
         """Generate a grid-based map."""
+        if self.style == "caves":
+            self.generate_caves()
+            return
+
         # Initialize empty map
         self.map = [[0 for _ in range(self.grid_width)] for _ in range(self.grid_height)]
         
@@ -40,9 +54,22 @@ class WorldGenerator:
                 center_y = self.grid_height // 2
                 distance_from_center = ((x - center_x) ** 2 + (y - center_y) ** 2) ** 0.5
                 
-                if distance_from_center > 5 and random.random() < obstacle_chance:
+                if distance_from_center > 5 and self.rng.random() < obstacle_chance:
                     self.map[y][x] = 1
 
+    def generate_caves(self):
+        """Generate connected caves with the vectorized generator in mapgen.py."""
+        import mapgen  # Needs numpy, so only imported when caves are asked for
+
+        # Seeded from the layout's random source, so seeded runs stay repeatable
+        self.map = mapgen.generate(self.grid_width, self.grid_height, self.rng.getrandbits(32))
+
+    def map_bytes(self):
+        """The map as row-major bytes, one per cell (1 = block)."""
+        if hasattr(self.map, "tobytes"):  # uint8 array from mapgen
+            return self.map.tobytes()
+        return bytes(cell for row in self.map for cell in row)
+
     def place_objects(self):
         """Place objects in the world."""
         # Clear existing objects
@@ -53,16 +80,16 @@ class WorldGenerator:
         probabilities = [0.2, 0.5, 0.2, 0.1]  # Sum must be 1.0
         
         # Number of objects to place
-        num_objects = random.randint(10, 20)
+        num_objects = self.rng.randint(10, 20)
         
         # Place objects
         for _ in range(num_objects):
             # Random position
-            x = random.randint(1, self.grid_width - 2) * self.tile_size
-            y = random.randint(1, self.grid_height - 2) * self.tile_size
+            x = self.rng.randint(1, self.grid_width - 2) * self.tile_size
+            y = self.rng.randint(1, self.grid_height - 2) * self.tile_size
             
             # Random type
-            obj_type = random.choices(object_types, weights=probabilities, k=1)[0]
+            obj_type = self.rng.choices(object_types, weights=probabilities, k=1)[0]
             
             # Create object
             new_object = WorldObject(x, y, obj_type)